@@ -0,0 +1,264 @@
+"""Benchmark for the DB layer: connect-per-call vs pooled connections vs async readers/writer, FTS5 vs LIKE search,
+the job recommendation matcher and notification outbox throughput.
+
+Usage:
+    python bench_db.py [--ops 5000] [--users 1000] [--concurrency 32] [--jobs 100000] [--searches 200]
+                       [--students 200] [--notifications 5000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from threading import Lock
+
+import main
+
+legacy_lock = Lock()
+
+
+def legacy_db_execute(query, params=(), fetch=False, many=False):
+    """Old db_execute: global lock and a new connection for every statement"""
+    with legacy_lock:
+        conn = sqlite3.connect(main.DB_PATH, check_same_thread=False)
+        cur = conn.cursor()
+        if many:
+            cur.executemany(query, params)
+            conn.commit()
+            conn.close()
+            return None
+        cur.execute(query, params)
+        res = cur.fetchall() if fetch else None
+        conn.commit()
+        conn.close()
+        return res
+
+
+def seed(users: int):
+    now = datetime.now().isoformat()
+    main.db_execute(
+        "INSERT INTO users (user_id, user_type, language, created_at) VALUES (?, ?, ?, ?)",
+        [(uid, 'student', random.choice(list(main.LANGUAGES)), now) for uid in range(1, users + 1)],
+        many=True
+    )
+    main.db_execute(
+        """INSERT INTO students (user_id, fullname, phone, course, major, about, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        [(uid, f"Student {uid}", "+70000000000", "3", "CS", "", now) for uid in range(1, users + 1)],
+        many=True
+    )
+
+
+def button_press(execute, users: int):
+    """Typical click: language, type, profile lookup and one write"""
+    user_id = random.randint(1, users)
+    execute("SELECT language FROM users WHERE user_id = ?", (user_id,), fetch=True)
+    execute("SELECT user_type FROM users WHERE user_id = ?", (user_id,), fetch=True)
+    execute("SELECT id FROM students WHERE user_id = ?", (user_id,), fetch=True)
+    execute("UPDATE users SET language = language WHERE user_id = ?", (user_id,))
+    return 4
+
+
+def run(name: str, execute, ops: int, users: int) -> float:
+    done = 0
+    started = time.perf_counter()
+    while done < ops:
+        done += button_press(execute, users)
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed
+    print(f"{name:<20} {done:>8} ops  {elapsed:8.3f} s  {rate:12.1f} ops/s")
+    return rate
+
+
+async def async_button_press(users: int):
+    user_id = random.randint(1, users)
+    await main.db.fetch("SELECT language FROM users WHERE user_id = ?", (user_id,))
+    await main.db.fetch("SELECT user_type FROM users WHERE user_id = ?", (user_id,))
+    await main.db.fetch("SELECT id FROM students WHERE user_id = ?", (user_id,))
+    await main.db.execute("UPDATE users SET language = language WHERE user_id = ?", (user_id,))
+    return 4
+
+
+async def run_async(ops: int, users: int, concurrency: int) -> float:
+    """Many concurrent handlers on the reader pool + group-commit writer"""
+    per_worker = ops // concurrency
+
+    async def worker():
+        done = 0
+        while done < per_worker:
+            done += await async_button_press(users)
+        return done
+
+    started = time.perf_counter()
+    done = sum(await asyncio.gather(*(worker() for _ in range(concurrency))))
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed
+    print(f"{'async x' + str(concurrency):<20} {done:>8} ops  {elapsed:8.3f} s  {rate:12.1f} ops/s")
+    stats = main.db_writer.stats()
+    print(f"  writer: groups={stats['groups']} avg_group={stats['avg_group_size']:.1f} "
+          f"avg_wait={stats['avg_wait_ms']:.2f}ms max_wait={stats['max_wait_ms']:.2f}ms")
+    return rate
+
+
+# Job vocabulary with Zipf-like word frequencies: a few very common words and a long tail
+WORDS = ("python java sql intern junior senior backend frontend analyst designer marketing sales "
+         "remote office english kazakh russian excel data cloud mobile qa support manager teacher").split()
+WORDS += [f"term{i}" for i in range(5000)]
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+
+LIKE_SEARCH = """SELECT j.id, j.title, e.company_name, j.salary, j.created_at
+                 FROM jobs j JOIN employers e ON j.employer_id = e.id
+                 WHERE j.is_active = 1 AND (j.title LIKE ? OR j.description LIKE ? OR j.requirements LIKE ?)
+                 ORDER BY j.created_at DESC LIMIT ?"""
+
+
+def seed_jobs(jobs: int):
+    now = datetime.now().isoformat()
+    main.db_execute("INSERT INTO employers (user_id, company_name, contact_phone, created_at) VALUES (1, 'Acme', '+7', ?)",
+                    (now,))
+
+    def text(n):
+        return " ".join(random.choices(WORDS, WEIGHTS, k=n))
+
+    main.db_execute(
+        """INSERT INTO jobs (employer_id, title, description, salary, requirements, created_at, is_active)
+           VALUES (1, ?, ?, '100000', ?, ?, ?)""",
+        [(text(3), text(40), text(10), now, int(random.random() > 0.1)) for _ in range(jobs)],
+        many=True
+    )
+
+
+def run_search(searches: int):
+    """Latency of the same keyword queries through FTS5 (bm25) and a LIKE scan"""
+    queries = [" ".join(random.choices(WORDS, WEIGHTS, k=random.randint(1, 2))) for _ in range(searches)]
+
+    def measure(name, fn):
+        times = []
+        for q in queries:
+            started = time.perf_counter()
+            fn(q)
+            times.append((time.perf_counter() - started) * 1000)
+        times.sort()
+        p95 = times[int(len(times) * 0.95) - 1]
+        print(f"{name:<20} p50 {statistics.median(times):8.2f} ms  p95 {p95:8.2f} ms")
+
+    fts_query = main.HOT_QUERIES[[name for name, _, _ in main.HOT_QUERIES].index("job search")][1]
+
+    def fts(q):
+        return main.db_read(fts_query, (main.build_fts_query(q), main.SEARCH_RANK_WINDOW - 1, 11, 0))
+
+    measure("search fts5", fts)
+    measure("search like", lambda q: main.db_read(LIKE_SEARCH, (f"%{q}%",) * 3 + (11,)))
+
+    # The most common words are the worst case: bm25 walks all their matches for IDF
+    for q in ("python", "java", "python java"):
+        fts(q)
+        started = time.perf_counter()
+        for _ in range(20):
+            fts(q)
+        print(f"{'fts5 ' + repr(q):<20} avg {(time.perf_counter() - started) / 20 * 1000:8.2f} ms")
+
+
+def run_matching(students: int):
+    """Matcher build time, then one student scored against every active job"""
+    started = time.perf_counter()
+    main.job_matcher.load()
+    print(f"{'matcher load':<20} {main.job_matcher.active:>8} jobs {time.perf_counter() - started:8.3f} s")
+
+    times = []
+    for _ in range(students):
+        fields = main.student_fields(str(random.randint(1, 4)), " ".join(random.choices(WORDS, WEIGHTS, k=2)),
+                                     " ".join(random.choices(WORDS, WEIGHTS, k=30)))
+        started = time.perf_counter()
+        main.job_matcher.recommend(fields, 10)
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    print(f"{'recommend':<20} p50 {statistics.median(times):8.2f} ms  p95 {times[int(len(times) * 0.95) - 1]:8.2f} ms")
+
+    updates = 1000
+    started = time.perf_counter()
+    for job_id in range(1, updates + 1):
+        main.job_matcher.remove(job_id)
+        main.job_matcher.add(job_id, "python intern", "backend " * 40, "sql git")
+    print(f"{'remove+add':<20} {(time.perf_counter() - started) * 1000 / updates:8.3f} ms per job")
+
+
+class NullBot:
+    """Accepts every message instantly, so the outbox bench measures the outbox and not the network"""
+
+    async def send_message(self, **kwargs):
+        return True
+
+
+async def run_outbox(notifications: int, users: int):
+    """Queue status notifications in one write transaction, then time the worker pool draining them"""
+    now = datetime.now().isoformat()
+    first = main.db_read("SELECT COALESCE(MAX(id), 0) FROM applications")[0][0] + 1
+    main.db_execute(
+        "INSERT INTO applications (job_id, student_id, employer_id, applied_at, status) VALUES (?, ?, 1, ?, 'accepted')",
+        [(i % 1000 + 1, i % users + 1, now) for i in range(notifications)],
+        many=True
+    )
+    # Only the outbox is measured: no Telegram limits
+    main.message_scheduler.global_rate = main.message_scheduler.chat_rate = 1e9
+
+    def enqueue(cur):
+        for application_id in range(first, first + notifications):
+            main.enqueue_notification(cur, 'application_status', application_id, {'status': 'accepted'})
+
+    started = time.perf_counter()
+    await main.db.transaction(enqueue)
+    queued = time.perf_counter() - started
+    await main.notification_outbox.start(NullBot())
+    while main.notification_outbox.delivered + main.notification_outbox.dead < notifications:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await main.notification_outbox.stop()
+    await main.message_scheduler.close()
+
+    stats = main.notification_outbox.stats()
+    print(f"{'outbox':<20} {stats['delivered']:>8} sent {elapsed:8.3f} s  {stats['delivered'] / elapsed:12.1f} msg/s  "
+          f"(enqueue {queued * 1000:.0f} ms, batches {stats['batches']}, dead {stats['dead']})")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--notifications", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.DB_PATH = os.path.join(tmp, "bench.db")
+        main.db_pool.path = main.DB_PATH
+        main.init_db()
+        seed(args.users)
+
+        random.seed(1)
+        before = run("connect-per-call", legacy_db_execute, args.ops, args.users)
+        random.seed(1)
+        after = run("pooled", main.db_execute, args.ops, args.users)
+        print(f"speedup: {after / before:.1f}x")
+        random.seed(1)
+        asyncio.run(run_async(args.ops, args.users, args.concurrency))
+
+        seed_jobs(args.jobs)
+        random.seed(1)
+        run_search(args.searches)
+        random.seed(1)
+        run_matching(args.students)
+        asyncio.run(run_outbox(args.notifications, args.users))
+        main.db.close()
+        main.db_pool.close_all()
+
+
+if __name__ == "__main__":
+    main_bench()
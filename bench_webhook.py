@@ -0,0 +1,230 @@
+"""Update-to-reply latency of long polling vs the built-in webhook server, replaying updates against a local
+fake Bot API.
+
+Usage:
+    python bench_webhook.py [--updates updates.jsonl] [--users 200] [--rate 50] [--rtt 20] [--connections 4]
+                            [--mode both|polling|webhook]
+
+--updates is a file with one Update JSON object per line (e.g. the "result" items of getUpdates); without it
+every user sends /start. --rtt is the simulated network delay, in ms, of each Bot API call and of each
+webhook delivery. Each mode runs in its own process with a fresh database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+from telegram.request import BaseRequest
+
+import main
+
+SECRET = "bench-secret"
+
+
+class FakeBotAPI(BaseRequest):
+    """Bot API stand-in: serves queued updates to getUpdates and resolves a waiter on the first reply to a chat"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.updates = asyncio.Queue()
+        self.waiting = {}  # ('chat', id) / ('callback', id) -> futures, oldest first
+        self.message_id = 0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def expect(self, key) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.waiting.setdefault(key, deque()).append(future)
+        return future
+
+    def _reply_seen(self, key):
+        waiters = self.waiting.get(key)
+        while waiters:
+            future = waiters.popleft()
+            if not future.done():
+                future.set_result(time.perf_counter())
+                return
+
+    async def _get_updates(self, timeout: float) -> list:
+        try:
+            batch = [await asyncio.wait_for(self.updates.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while not self.updates.empty():
+            batch.append(self.updates.get_nowait())
+        await asyncio.sleep(self.rtt)
+        return batch
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        name = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+        if name == "getUpdates":
+            result = await self._get_updates(float(params.get("timeout") or 0.01))
+        else:
+            await asyncio.sleep(self.rtt)
+            if "callback_query_id" in params:
+                self._reply_seen(('callback', str(params["callback_query_id"])))
+            if "chat_id" in params:
+                self._reply_seen(('chat', int(params["chat_id"])))
+            if name == "getMe":
+                result = {'id': 1, 'is_bot': True, 'first_name': "bench", 'username': "bench_bot"}
+            elif name in ("sendMessage", "editMessageText"):
+                self.message_id += 1
+                result = {'message_id': int(params.get("message_id", self.message_id)), 'date': int(time.time()),
+                          'chat': {'id': int(params["chat_id"]), 'type': "private"}, 'text': params.get("text", "")}
+            else:
+                result = True
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
+
+
+def reply_key(update: dict):
+    """What the first reply to an update is addressed to"""
+    if "callback_query" in update:
+        return 'callback', str(update["callback_query"]["id"])
+    for kind in ("message", "edited_message"):
+        if kind in update:
+            return 'chat', update[kind]["chat"]["id"]
+    return None
+
+
+def load_updates(path: str, users: int) -> list:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            updates = [json.loads(line) for line in f if line.strip()]
+    else:
+        updates = []
+        for user_id in range(1, users + 1):
+            user = {'id': user_id, 'is_bot': False, 'first_name': f"User {user_id}", 'language_code': "ru"}
+            updates.append({'message': {
+                'message_id': 1, 'date': int(time.time()), 'chat': {'id': user_id, 'type': "private"},
+                'from': user, 'text': "/start", 'entities': [{'type': "bot_command", 'offset': 0, 'length': 6}]
+            }})
+    # The updater tracks offsets, so ids must increase in replay order
+    for update_id, update in enumerate(updates, 1):
+        update["update_id"] = update_id
+    return [update for update in updates if reply_key(update)]
+
+
+class WebhookClient:
+    """Keep-alive HTTP connections that POST updates like Telegram does"""
+
+    def __init__(self, port: int, connections: int):
+        self.port = port
+        self.connections = connections
+        self.pool = asyncio.Queue()
+
+    async def open(self):
+        for _ in range(self.connections):
+            self.pool.put_nowait(await asyncio.open_connection("127.0.0.1", self.port))
+
+    async def close(self):
+        while not self.pool.empty():
+            _, writer = self.pool.get_nowait()
+            writer.close()
+
+    async def post(self, path: str, update: dict) -> int:
+        body = json.dumps(update).encode()
+        reader, writer = await self.pool.get()
+        try:
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                f"X-Telegram-Bot-Api-Secret-Token: {SECRET}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+            length = int(head.lower().split("content-length:")[1].split("\r\n")[0])
+            await reader.readexactly(length)
+            return int(head.split(" ")[1])
+        finally:
+            self.pool.put_nowait((reader, writer))
+
+
+async def run_mode(mode: str, updates: list, rate: float, rtt: float, connections: int) -> list:
+    """Replay updates at a fixed rate and return update -> first reply latencies in ms"""
+    # Only the transport is measured: no Telegram send limits
+    main.message_scheduler.global_rate = main.message_scheduler.chat_rate = 1e9
+    api = FakeBotAPI(rtt)
+    app = main.build_application(api)
+    await app.initialize()
+    await app.post_init(app)
+    if mode == "polling":
+        await app.updater.start_polling(poll_interval=0, timeout=10)
+    else:
+        server = main.WebhookServer(app, "127.0.0.1", 0, main.WEBHOOK_PATH, SECRET, max(connections, 1),
+                                    main.WEBHOOK_MAX_BODY)
+        await server.start()
+        client = WebhookClient(server.port, connections)
+        await client.open()
+    await app.start()
+
+    async def deliver(update: dict, at: float) -> float:
+        await asyncio.sleep(max(0.0, at - time.perf_counter()))
+        replied = api.expect(reply_key(update))
+        started = time.perf_counter()
+        if mode == "polling":
+            api.updates.put_nowait(update)
+        else:
+            await asyncio.sleep(rtt)  # Telegram -> bot hop
+            await client.post(main.WEBHOOK_PATH, update)
+        return (await asyncio.wait_for(replied, 30) - started) * 1000
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(deliver(update, start + i / rate) for i, update in enumerate(updates)))
+
+    if mode == "polling":
+        await app.updater.stop()
+    else:
+        await client.close()
+        await server.stop()
+    await app.stop()
+    await app.post_stop(app)
+    await app.shutdown()
+    return latencies
+
+
+def report(mode: str, latencies: list):
+    latencies = sorted(latencies)
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(f"{mode:<10} {len(latencies):>6} updates  p50 {statistics.median(latencies):8.2f} ms  "
+          f"p95 {p95:8.2f} ms  max {latencies[-1]:8.2f} ms")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", default="")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50)
+    parser.add_argument("--rtt", type=float, default=20)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--mode", choices=("both", "polling", "webhook"), default="both")
+    args = parser.parse_args()
+
+    if args.mode == "both":
+        for mode in ("polling", "webhook"):
+            subprocess.run([sys.executable, __file__, *sys.argv[1:], "--mode", mode], check=True)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.DB_PATH = os.path.join(tmp, "bench.db")
+        main.db_pool.path = main.DB_PATH
+        main.BOT_TOKEN = main.BOT_TOKEN or "1:bench"
+        main.init_db()
+        updates = load_updates(args.updates, args.users)
+        latencies = asyncio.run(run_mode(args.mode, updates, args.rate, args.rtt / 1000, args.connections))
+        report(args.mode, latencies)
+        main.db.close()
+        main.db_pool.close_all()
+
+
+if __name__ == "__main__":
+    main_bench()
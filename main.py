@@ -1,24 +1,41 @@
 import os
+import re
 import logging
 import sqlite3
 from datetime import datetime, timedelta, time
 import io
+import json
 import asyncio
-from threading import Lock
+import random
+import queue
+import hmac
+import secrets
+import signal
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock, Thread, local
+from time import monotonic
 from enum import Enum
+from dataclasses import dataclass, replace
+from bisect import bisect_right, insort
+from collections import OrderedDict, deque
+from heapq import heappop, heappush
+from itertools import count
 import sys
+import zlib
 
+import numpy as np
 import pandas as pd
 
 from telegram import (
     Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup,
-    KeyboardButton, InputFile, Message, CallbackQuery
+    KeyboardButton, InputFile, Message, CallbackQuery, InlineQueryResultArticle, InputTextMessageContent
 )
 from telegram.ext import (
-    ApplicationBuilder, CommandHandler, CallbackQueryHandler, ContextTypes,
-    MessageHandler, filters, ConversationHandler
+    Application, ApplicationBuilder, CommandHandler, CallbackQueryHandler, ContextTypes,
+    MessageHandler, filters, ConversationHandler, TypeHandler, InlineQueryHandler, BaseUpdateProcessor
 )
-from telegram.error import TimedOut, NetworkError, RetryAfter
+from telegram.error import TimedOut, NetworkError, RetryAfter, Forbidden, BadRequest
+from telegram.helpers import escape_markdown
 
 
 # --- Load .env manually ---
@@ -57,6 +74,112 @@ if os.environ.get("ADMIN_IDS"):
 
 DB_PATH = os.environ.get("DB_PATH", "jobs_bot.db")
 
+# Webhook mode: set WEBHOOK_URL (public https base URL) to receive updates on a built-in HTTP server instead of polling
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_LISTEN = os.environ.get("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/telegram")
+# Checked against X-Telegram-Bot-Api-Secret-Token; a random one is generated per run when unset
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
+WEBHOOK_MAX_CONNECTIONS = int(os.environ.get("WEBHOOK_MAX_CONNECTIONS", "40"))
+WEBHOOK_MAX_BODY = int(os.environ.get("WEBHOOK_MAX_BODY", str(1024 * 1024)))
+WEBHOOK_READ_TIMEOUT = float(os.environ.get("WEBHOOK_READ_TIMEOUT", "30"))
+
+# SQLite tuning (cache_size in KiB, mmap_size in bytes)
+DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+# In-process cache of per-user profile facts (language, type, profile ids)
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "50000"))
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "600"))
+
+# Job browsing: jobs per keyboard page and how many pages the catalog keeps in memory
+JOBS_PAGE_SIZE = int(os.environ.get("JOBS_PAGE_SIZE", "10"))
+JOBS_CACHED_PAGES = int(os.environ.get("JOBS_CACHED_PAGES", "256"))
+
+# Applications per page in the employer's application lists
+APPS_PAGE_SIZE = int(os.environ.get("APPS_PAGE_SIZE", "10"))
+# "Reject pending older than N days" choices
+BULK_REJECT_AGE_DAYS = (7, 14, 30)
+
+# /list_students: rows per DB batch and entries per interactive page
+STUDENTS_BATCH_SIZE = int(os.environ.get("STUDENTS_BATCH_SIZE", "500"))
+STUDENTS_PAGE_SIZE = int(os.environ.get("STUDENTS_PAGE_SIZE", "10"))
+
+# Outbound message scheduler. Telegram allows about 30 messages/s per bot, 1/s per chat (short bursts are
+# tolerated) and 20/min per group; failed sends are retried with exponential backoff and jitter
+SEND_GLOBAL_RATE = float(os.environ.get("SEND_GLOBAL_RATE", "30"))
+SEND_CHAT_RATE = float(os.environ.get("SEND_CHAT_RATE", "1"))
+SEND_GROUP_RATE = float(os.environ.get("SEND_GROUP_RATE", str(20 / 60)))
+SEND_CHAT_BURST = int(os.environ.get("SEND_CHAT_BURST", "3"))
+# Requests in flight per chat: 1 keeps a chat's messages strictly in order, 2 lets a reply and a screen edit overlap
+SEND_CHAT_PARALLEL = int(os.environ.get("SEND_CHAT_PARALLEL", "2"))
+# Independent Bot API calls a handler runs at once (gather_bounded)
+HANDLER_CONCURRENCY = int(os.environ.get("HANDLER_CONCURRENCY", "4"))
+# Updates processed at once; one user's updates still run one at a time, in arrival order
+UPDATE_CONCURRENCY = int(os.environ.get("UPDATE_CONCURRENCY", "32"))
+SEND_MAX_RETRIES = int(os.environ.get("SEND_MAX_RETRIES", "5"))
+SEND_BACKOFF_BASE = float(os.environ.get("SEND_BACKOFF_BASE", "0.5"))
+SEND_BACKOFF_MAX = float(os.environ.get("SEND_BACKOFF_MAX", "30"))
+
+# Telegram message length limit (UTF-16 code units) and how much of a student's "about" a listing shows
+TELEGRAM_TEXT_LIMIT = 4096
+STUDENT_ABOUT_PREVIEW = 300
+
+# Salaries are parsed into numbers at write time; amounts without a currency are taken as this one.
+# Browse filter floors are monthly amounts in that currency
+DEFAULT_SALARY_CURRENCY = os.environ.get("DEFAULT_SALARY_CURRENCY", "KZT")
+SALARY_FILTERS = [100000, 150000, 300000]
+
+# Full-text job search: at most this many terms per query; bm25 ranks only the newest N matches.
+# bm25 itself walks every match of each term once per query (for IDF); the window bounds the rest, which keeps
+# common words in single-digit ms on 100k jobs (python bench_db.py)
+SEARCH_MAX_TERMS = 8
+SEARCH_RANK_WINDOW = int(os.environ.get("SEARCH_RANK_WINDOW", "500"))
+
+# Inline mode (@bot <keywords>): results per answer, Telegram-side cache_time, in-process result cache
+# and how long to wait for the next keystroke before querying the DB
+INLINE_PAGE_SIZE = int(os.environ.get("INLINE_PAGE_SIZE", "20"))
+INLINE_CACHE_TIME = int(os.environ.get("INLINE_CACHE_TIME", "30"))
+INLINE_CACHE_SIZE = int(os.environ.get("INLINE_CACHE_SIZE", "2000"))
+INLINE_CACHE_TTL = float(os.environ.get("INLINE_CACHE_TTL", "60"))
+INLINE_DEBOUNCE = float(os.environ.get("INLINE_DEBOUNCE", "0.3"))
+
+# Job recommendations: hashed feature space size, stem length for word forms and jobs shown
+MATCH_FEATURES = int(os.environ.get("MATCH_FEATURES", str(2 ** 18)))
+MATCH_STEM_LENGTH = 6
+RECOMMEND_LIMIT = int(os.environ.get("RECOMMEND_LIMIT", "10"))
+# Cached applicant fit scores per (job, student)
+FIT_CACHE_SIZE = int(os.environ.get("FIT_CACHE_SIZE", "100000"))
+FIT_CACHE_TTL = float(os.environ.get("FIT_CACHE_TTL", "3600"))
+
+# Notification outbox: delivery workers, rows claimed per batch, attempts before a row is dead-lettered,
+# retry backoff (seconds), how often idle workers look for due retries and how long sent rows are kept
+OUTBOX_WORKERS = int(os.environ.get("OUTBOX_WORKERS", "4"))
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE = float(os.environ.get("OUTBOX_BACKOFF_BASE", "5"))
+OUTBOX_BACKOFF_MAX = float(os.environ.get("OUTBOX_BACKOFF_MAX", "3600"))
+OUTBOX_POLL_INTERVAL = float(os.environ.get("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_RETENTION_DAYS = int(os.environ.get("OUTBOX_RETENTION_DAYS", "7"))
+
+# Employer digests: how often the JobQueue checks the buffer; intervals (minutes, 0 = every application) and sizes offered
+DIGEST_CHECK_INTERVAL = float(os.environ.get("DIGEST_CHECK_INTERVAL", "60"))
+DIGEST_INTERVALS = (0, 15, 60, 1440)
+DIGEST_SIZES = (10, 25, 50)
+
+# /broadcast: recipients per DB batch (also the resume checkpoint), sends in flight and progress edit interval
+BROADCAST_BATCH_SIZE = int(os.environ.get("BROADCAST_BATCH_SIZE", "100"))
+BROADCAST_CONCURRENCY = int(os.environ.get("BROADCAST_CONCURRENCY", "20"))
+BROADCAST_PROGRESS_INTERVAL = float(os.environ.get("BROADCAST_PROGRESS_INTERVAL", "3"))
+
+# Saved searches per user
+MAX_SAVED_SEARCHES = int(os.environ.get("MAX_SAVED_SEARCHES", "10"))
+
+# Reader threads (each with its own WAL connection) and the group commit size of the single writer
+DB_READERS = int(os.environ.get("DB_READERS", str(os.cpu_count() or 4)))
+DB_GROUP_COMMIT_MAX = int(os.environ.get("DB_GROUP_COMMIT_MAX", "64"))
+
 # Локализация
 LANGUAGES = {
     'ru': 'Русский',
@@ -363,6 +486,9 @@ TEXTS = {
 */view_applications* - просмотреть заявки
 */export_applications* - экспорт заявок в Excel
 */list_students* - список всех студентов
+*/db_stats* - статистика базы данных
+*/broadcast* - рассылка студентам (фильтры: course=, major=, lang=)
+*/digest* - уведомления о заявках: сразу или сводкой
 */help_admin* - показать это сообщение
 
 *Быстрые команды:*
@@ -375,6 +501,9 @@ TEXTS = {
 */view_applications* - view applications
 */export_applications* - export applications to Excel
 */list_students* - list all students
+*/db_stats* - database statistics
+*/broadcast* - message students (filters: course=, major=, lang=)
+*/digest* - application notifications: instant or digest
 */help_admin* - show this message
 
 *Quick commands:*
@@ -387,6 +516,9 @@ TEXTS = {
 */view_applications* - өтініштерді қарау
 */export_applications* - өтініштерді Excel-ге экспорттау
 */list_students* - барлық студенттердің тізімі
+*/db_stats* - дерекқор статистикасы
+*/broadcast* - студенттерге хабарлама тарату (сүзгілер: course=, major=, lang=)
+*/digest* - өтінімдер туралы хабарламалар: бірден немесе жиынтық
 */help_admin* - бұл хабарды көрсету
 
 *Жылдам командалар:*
@@ -447,6 +579,326 @@ TEXTS = {
         'ru': "✏️ Редактировать профиль",
         'en': "✏️ Edit profile",
         'kk': "✏️ Профильді өңдеу"
+    },
+    'prev_page': {
+        'ru': "⬅️ Предыдущие",
+        'en': "⬅️ Previous",
+        'kk': "⬅️ Алдыңғы"
+    },
+    'next_page': {
+        'ru': "Следующие ➡️",
+        'en': "Next ➡️",
+        'kk': "Келесі ➡️"
+    },
+    'filter_status': {
+        'ru': "📊 Статус: {value}",
+        'en': "📊 Status: {value}",
+        'kk': "📊 Статус: {value}"
+    },
+    'filter_period': {
+        'ru': "📅 Период: {value}",
+        'en': "📅 Period: {value}",
+        'kk': "📅 Кезең: {value}"
+    },
+    'filter_all': {
+        'ru': "все",
+        'en': "all",
+        'kk': "барлығы"
+    },
+    'period_days': {
+        'ru': "{days} дн.",
+        'en': "{days} d",
+        'kk': "{days} күн"
+    },
+    'clear_filters': {
+        'ru': "🧹 Сбросить фильтры",
+        'en': "🧹 Clear filters",
+        'kk': "🧹 Сүзгілерді тазалау"
+    },
+    'sort_order': {
+        'ru': "↕️ Порядок: {value}",
+        'en': "↕️ Order: {value}",
+        'kk': "↕️ Реті: {value}"
+    },
+    'sort_recent': {
+        'ru': "новые",
+        'en': "newest",
+        'kk': "жаңалары"
+    },
+    'sort_fit': {
+        'ru': "по соответствию",
+        'en': "best match",
+        'kk': "сәйкестігі бойынша"
+    },
+    'total': {
+        'ru': "Всего",
+        'en': "Total",
+        'kk': "Барлығы"
+    },
+    'select_applications': {
+        'ru': "☑️ Выбрать несколько",
+        'en': "☑️ Select several",
+        'kk': "☑️ Бірнешеуін таңдау"
+    },
+    'cancel_selection': {
+        'ru': "✖️ Отменить выбор",
+        'en': "✖️ Cancel selection",
+        'kk': "✖️ Таңдаудан бас тарту"
+    },
+    'accept_selected': {
+        'ru': "✅ Принять выбранные ({count})",
+        'en': "✅ Accept selected ({count})",
+        'kk': "✅ Таңдалғандарды қабылдау ({count})"
+    },
+    'reject_selected': {
+        'ru': "❌ Отклонить выбранные ({count})",
+        'en': "❌ Reject selected ({count})",
+        'kk': "❌ Таңдалғандарды қабылдамау ({count})"
+    },
+    'reject_all_pending': {
+        'ru': "❌ Отклонить все ожидающие",
+        'en': "❌ Reject all pending",
+        'kk': "❌ Күтудегілердің барлығын қабылдамау"
+    },
+    'reject_older': {
+        'ru': "🕰 Отклонить старые ожидающие",
+        'en': "🕰 Reject old pending",
+        'kk': "🕰 Ескі күтудегілерді қабылдамау"
+    },
+    'reject_older_days': {
+        'ru': "Старше {days} дн. ({count})",
+        'en': "Older than {days} days ({count})",
+        'kk': "{days} күннен ескі ({count})"
+    },
+    'reject_older_prompt': {
+        'ru': "Какие ожидающие заявки отклонить?",
+        'en': "Which pending applications should be rejected?",
+        'kk': "Қандай күтудегі өтінімдерді қабылдамау керек?"
+    },
+    'bulk_reject_confirm': {
+        'ru': "Отклонить ожидающих заявок: {count}? Студенты получат уведомления.",
+        'en': "Reject {count} pending applications? The students will be notified.",
+        'kk': "Күтудегі {count} өтінімді қабылдамау керек пе? Студенттер хабарлама алады."
+    },
+    'confirm_yes': {
+        'ru': "✅ Да",
+        'en': "✅ Yes",
+        'kk': "✅ Иә"
+    },
+    'bulk_updated': {
+        'ru': "✅ Обновлено заявок: {count}",
+        'en': "✅ Applications updated: {count}",
+        'kk': "✅ Жаңартылған өтінімдер: {count}"
+    },
+    'search_jobs': {
+        'ru': "🔎 Поиск по ключевым словам",
+        'en': "🔎 Search by keywords",
+        'kk': "🔎 Кілт сөздер бойынша іздеу"
+    },
+    'search_prompt': {
+        'ru': "🔎 Введите ключевые слова (например: python стажёр):",
+        'en': "🔎 Enter keywords (e.g. python intern):",
+        'kk': "🔎 Кілт сөздерді енгізіңіз (мысалы: python тағылымдамашы):"
+    },
+    'search_results': {
+        'ru': "🔎 Результаты по запросу «{query}»:",
+        'en': "🔎 Results for “{query}”:",
+        'kk': "🔎 «{query}» сұрауы бойынша нәтижелер:"
+    },
+    'search_capped': {
+        'ru': "ℹ️ Показаны лучшие совпадения среди {count} самых новых вакансий. Уточните запрос, чтобы найти более старые.",
+        'en': "ℹ️ Showing the best matches among the {count} newest jobs. Refine the query to reach older ones.",
+        'kk': "ℹ️ Ең жаңа {count} бос орынның ішіндегі ең сәйкес нәтижелер көрсетілген. Ескілерін табу үшін сұрауды нақтылаңыз."
+    },
+    'search_no_results': {
+        'ru': "📭 По запросу «{query}» ничего не найдено.",
+        'en': "📭 Nothing found for “{query}”.",
+        'kk': "📭 «{query}» сұрауы бойынша ештеңе табылмады."
+    },
+    'new_search': {
+        'ru': "🔎 Новый поиск",
+        'en': "🔎 New search",
+        'kk': "🔎 Жаңа іздеу"
+    },
+    'broadcast_usage': {
+        'ru': "Использование: /broadcast [course=3] [major=IT] [lang=ru] текст сообщения",
+        'en': "Usage: /broadcast [course=3] [major=IT] [lang=ru] message text",
+        'kk': "Қолданылуы: /broadcast [course=3] [major=IT] [lang=ru] хабарлама мәтіні"
+    },
+    'broadcast_no_recipients': {
+        'ru': "😔 Нет студентов, подходящих под фильтры",
+        'en': "😔 No students match these filters",
+        'kk': "😔 Сүзгілерге сәйкес студенттер жоқ"
+    },
+    'broadcast_preview': {
+        'ru': "📣 Рассылка #{id}\nПолучатели: {audience} ({total})\n\n{text}",
+        'en': "📣 Broadcast #{id}\nRecipients: {audience} ({total})\n\n{text}",
+        'kk': "📣 Тарату #{id}\nАлушылар: {audience} ({total})\n\n{text}"
+    },
+    'broadcast_all_students': {
+        'ru': "все студенты",
+        'en': "all students",
+        'kk': "барлық студенттер"
+    },
+    'broadcast_send': {
+        'ru': "▶️ Отправить",
+        'en': "▶️ Send",
+        'kk': "▶️ Жіберу"
+    },
+    'broadcast_stop': {
+        'ru': "⏹ Остановить",
+        'en': "⏹ Stop",
+        'kk': "⏹ Тоқтату"
+    },
+    'broadcast_progress': {
+        'ru': "📣 Рассылка #{id}: {status}\n✅ Отправлено: {sent} из {total}\n❌ Ошибок: {failed}\n⚡ {rate:.1f} сообщ./с",
+        'en': "📣 Broadcast #{id}: {status}\n✅ Sent: {sent} of {total}\n❌ Failed: {failed}\n⚡ {rate:.1f} msg/s",
+        'kk': "📣 Тарату #{id}: {status}\n✅ Жіберілді: {sent} / {total}\n❌ Қателер: {failed}\n⚡ {rate:.1f} хабар/с"
+    },
+    'broadcast_running': {
+        'ru': "идёт",
+        'en': "in progress",
+        'kk': "жүріп жатыр"
+    },
+    'broadcast_done': {
+        'ru': "завершена",
+        'en': "finished",
+        'kk': "аяқталды"
+    },
+    'broadcast_cancelled': {
+        'ru': "остановлена",
+        'en': "stopped",
+        'kk': "тоқтатылды"
+    },
+    'broadcast_failed': {
+        'ru': "прервана из-за ошибки",
+        'en': "aborted by an error",
+        'kk': "қатеге байланысты тоқтады"
+    },
+    'save_search': {
+        'ru': "🔔 Сохранить поиск",
+        'en': "🔔 Save search",
+        'kk': "🔔 Іздеуді сақтау"
+    },
+    'notify_new_jobs': {
+        'ru': "🔔 Сообщать о новых вакансиях",
+        'en': "🔔 Notify me about new jobs",
+        'kk': "🔔 Жаңа бос орындар туралы хабарлау"
+    },
+    'search_saved': {
+        'ru': "🔔 Поиск сохранён: {label}\nНовые подходящие вакансии придут сюда. Ниже можно задать минимальную зарплату.",
+        'en': "🔔 Search saved: {label}\nNew matching jobs will be sent here. You can set a minimum salary below.",
+        'kk': "🔔 Іздеу сақталды: {label}\nЖаңа сәйкес бос орындар осында жіберіледі. Төменде ең төменгі жалақыны орнатуға болады."
+    },
+    'save_search_usage': {
+        'ru': "Используйте: /save_search python стажёр",
+        'en': "Usage: /save_search python intern",
+        'kk': "Қолданылуы: /save_search python тағылымдамашы"
+    },
+    'saved_search_empty': {
+        'ru': "❌ Укажите ключевые слова или минимальную зарплату",
+        'en': "❌ Add keywords or a minimum salary",
+        'kk': "❌ Кілт сөздерді немесе ең төменгі жалақыны көрсетіңіз"
+    },
+    'saved_search_limit': {
+        'ru': "❌ Можно сохранить не больше {limit} поисков. Удалите лишние: /my_searches",
+        'en': "❌ You can save up to {limit} searches. Remove some: /my_searches",
+        'kk': "❌ {limit} іздеуден артық сақтауға болмайды. Артығын жойыңыз: /my_searches"
+    },
+    'my_searches': {
+        'ru': "🔔 Сохранённые поиски (нажмите, чтобы удалить):",
+        'en': "🔔 Saved searches (tap to delete):",
+        'kk': "🔔 Сақталған іздеулер (жою үшін басыңыз):"
+    },
+    'digest_settings': {
+        'ru': "🔔 Уведомления о заявках",
+        'en': "🔔 Application notifications",
+        'kk': "🔔 Өтінімдер туралы хабарламалар"
+    },
+    'digest_menu': {
+        'ru': "🔔 Уведомления о новых заявках: {mode}\n\nСводка приходит по расписанию или сразу, как наберётся выбранное число заявок.",
+        'en': "🔔 New application notifications: {mode}\n\nA digest is sent on schedule, or as soon as the chosen number of applications is reached.",
+        'kk': "🔔 Жаңа өтінімдер туралы хабарламалар: {mode}\n\nЖиынтық кесте бойынша немесе таңдалған өтінім саны жиналғанда бірден келеді."
+    },
+    'digest_instant': {
+        'ru': "сразу",
+        'en': "instantly",
+        'kk': "бірден"
+    },
+    'digest_every': {
+        'ru': "сводка каждые {interval} или по {size} заявок",
+        'en': "digest every {interval} or per {size} applications",
+        'kk': "әр {interval} сайын немесе {size} өтінім бойынша жиынтық"
+    },
+    'digest_minutes': {
+        'ru': "{count} мин",
+        'en': "{count} min",
+        'kk': "{count} мин"
+    },
+    'digest_hours': {
+        'ru': "{count} ч",
+        'en': "{count} h",
+        'kk': "{count} сағ"
+    },
+    'digest_size_button': {
+        'ru': "по {size}",
+        'en': "per {size}",
+        'kk': "{size} бойынша"
+    },
+    'digest_title': {
+        'ru': "📬 Новые заявки: {count}",
+        'en': "📬 New applications: {count}",
+        'kk': "📬 Жаңа өтінімдер: {count}"
+    },
+    'digest_more': {
+        'ru': "…и ещё {count}",
+        'en': "…and {count} more",
+        'kk': "…және тағы {count}"
+    },
+    'my_searches_button': {
+        'ru': "🔔 Мои сохранённые поиски",
+        'en': "🔔 My saved searches",
+        'kk': "🔔 Менің сақталған іздеулерім"
+    },
+    'no_saved_searches': {
+        'ru': "У вас нет сохранённых поисков. Сохраните поиск из результатов /search",
+        'en': "You have no saved searches. Save one from the /search results",
+        'kk': "Сақталған іздеулер жоқ. Іздеуді /search нәтижелерінен сақтаңыз"
+    },
+    'search_alert': {
+        'ru': "🔔 Новая вакансия по вашему поиску {label}",
+        'en': "🔔 New job for your saved search {label}",
+        'kk': "🔔 Сақталған іздеуіңіз бойынша жаңа бос орын {label}"
+    },
+    'any_salary': {
+        'ru': "💰 Любая",
+        'en': "💰 Any",
+        'kk': "💰 Кез келген"
+    },
+    'salary_from': {
+        'ru': "💰 Зарплата от {amount} {currency} в месяц",
+        'en': "💰 Salary from {amount} {currency} per month",
+        'kk': "💰 Айына {amount} {currency} бастап жалақы"
+    },
+    'recommended_jobs': {
+        'ru': "⭐ Рекомендовано для вас",
+        'en': "⭐ Recommended for you",
+        'kk': "⭐ Сізге ұсынылады"
+    },
+    'recommended_title': {
+        'ru': "⭐ Вакансии, которые лучше всего подходят вашему профилю:",
+        'en': "⭐ Jobs that best match your profile:",
+        'kk': "⭐ Профиліңізге ең сәйкес вакансиялар:"
+    },
+    'no_recommendations': {
+        'ru': "😔 Пока нет подходящих вакансий. Дополните раздел «О себе» или воспользуйтесь поиском.",
+        'en': "😔 No matching jobs yet. Add more to your \"About\" section or try the search.",
+        'kk': "😔 Әзірге сәйкес вакансиялар жоқ. «Өзіңіз туралы» бөлімін толықтырыңыз немесе іздеуді қолданыңыз."
+    },
+    'students_page_hint': {
+        'ru': "Постраничный просмотр: /list_students page",
+        'en': "Page by page: /list_students page",
+        'kk': "Беттер бойынша: /list_students page"
     }
 }
 
@@ -467,103 +919,1164 @@ logger = logging.getLogger(__name__)
 # Conversation states
 (SELECT_LANGUAGE, STUDENT_NAME, STUDENT_PHONE, STUDENT_COURSE,
  STUDENT_MAJOR, STUDENT_ABOUT, EMPLOYER_NAME, EMPLOYER_PHONE,
- JOB_TITLE, JOB_DESCRIPTION, JOB_SALARY, JOB_REQUIREMENTS) = range(12)
+ JOB_TITLE, JOB_DESCRIPTION, JOB_SALARY, JOB_REQUIREMENTS, SEARCH_QUERY) = range(13)
 
-db_lock = Lock()
+# ------------------ DB ------------------
+class ConnectionPool:
+    """Long-lived SQLite connections, one per thread"""
 
+    def __init__(self, path: str):
+        self.path = path
+        self._local = local()
+        self._lock = Lock()
+        self._connections = []
 
-# ------------------ DB ------------------
-def init_db():
-    with db_lock:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=DB_BUSY_TIMEOUT_MS / 1000)
         cur = conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+        cur.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        cur.close()
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Get connection bound to the current thread, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        """Close every pooled connection (on shutdown)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning("Error closing DB connection: %s", e)
+        self._local = local()
+
+
+db_pool = ConnectionPool(DB_PATH)
 
-        # Таблица пользователей (студенты и работодатели)
-        cur.execute("""CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER UNIQUE NOT NULL,
-                        user_type TEXT NOT NULL, -- 'student' or 'employer'
-                        language TEXT DEFAULT 'ru',
-                        created_at TEXT NOT NULL
-                    )""")
 
-        # Таблица студентов
-        cur.execute("""CREATE TABLE IF NOT EXISTS students (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER UNIQUE NOT NULL,
-                        fullname TEXT NOT NULL,
-                        phone TEXT NOT NULL,
-                        course TEXT NOT NULL,
-                        major TEXT NOT NULL,
-                        about TEXT,
-                        created_at TEXT NOT NULL,
-                        FOREIGN KEY(user_id) REFERENCES users(user_id)
-                    )""")
+def init_db():
+    conn = db_pool.connection()
+    cur = conn.cursor()
+
+    # Таблица пользователей (студенты и работодатели)
+    cur.execute("""CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER UNIQUE NOT NULL,
+                    user_type TEXT NOT NULL, -- 'student' or 'employer'
+                    language TEXT DEFAULT 'ru',
+                    created_at TEXT NOT NULL
+                )""")
+
+    # Таблица студентов
+    cur.execute("""CREATE TABLE IF NOT EXISTS students (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER UNIQUE NOT NULL,
+                    fullname TEXT NOT NULL,
+                    phone TEXT NOT NULL,
+                    course TEXT NOT NULL,
+                    major TEXT NOT NULL,
+                    about TEXT,
+                    created_at TEXT NOT NULL,
+                    FOREIGN KEY(user_id) REFERENCES users(user_id)
+                )""")
+
+    # Таблица работодателей
+    cur.execute("""CREATE TABLE IF NOT EXISTS employers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER UNIQUE NOT NULL,
+                    company_name TEXT NOT NULL,
+                    contact_phone TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    FOREIGN KEY(user_id) REFERENCES users(user_id)
+                )""")
+
+    # Таблица вакансий
+    cur.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    employer_id INTEGER NOT NULL,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    salary TEXT,
+                    requirements TEXT,
+                    created_at TEXT NOT NULL,
+                    is_active BOOLEAN DEFAULT 1,
+                    FOREIGN KEY(employer_id) REFERENCES employers(id)
+                )""")
+
+    # Таблица заявок
+    cur.execute("""CREATE TABLE IF NOT EXISTS applications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id INTEGER NOT NULL,
+                    student_id INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    applied_at TEXT NOT NULL,
+                    reviewed_at TEXT,
+                    employer_notes TEXT,
+                    FOREIGN KEY(job_id) REFERENCES jobs(id),
+                    FOREIGN KEY(student_id) REFERENCES students(id)
+                )""")
+
+    conn.commit()
+    cur.close()
+
+    apply_migrations(conn)
+
+
+def _write_statement(cur, query, params=(), many=False):
+    if many:
+        cur.executemany(query, params)
+        return None
+    cur.execute(query, params)
+    return cur.lastrowid
+
+
+class DBWriter:
+    """Single writer thread that commits queued writes in groups (group commit)"""
+
+    def __init__(self, pool: ConnectionPool, max_group: int):
+        self.pool = pool
+        self.max_group = max_group
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = Lock()
+        self._stats_lock = Lock()
+        self._writes = 0
+        self._failed = 0
+        self._groups = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def submit(self, fn) -> Future:
+        """Queue fn(cursor) to run inside the next group transaction"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((fn, future, monotonic()))
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        conn = self.pool.connection()
+        conn.isolation_level = None  # explicit BEGIN/COMMIT below
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            group = [item]
+            while len(group) < self.max_group:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                group.append(item)
+            self._commit_group(conn, group)
+
+    def _commit_group(self, conn: sqlite3.Connection, group: list):
+        cur = conn.cursor()
+        results = []
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            for fn, future, _ in group:
+                # Savepoint per write: one failing statement doesn't roll back the rest of the group
+                cur.execute("SAVEPOINT write")
+                try:
+                    results.append((future, fn(cur), None))
+                    cur.execute("RELEASE write")
+                except Exception as e:
+                    cur.execute("ROLLBACK TO write")
+                    cur.execute("RELEASE write")
+                    results.append((future, None, e))
+            cur.execute("COMMIT")
+        except Exception as e:
+            logger.error("Group commit failed: %s", e)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            results = [(future, None, e) for _, future, _ in group]
+        finally:
+            cur.close()
+
+        now = monotonic()
+        failed = 0
+        for future, result, error in results:
+            if error is not None:
+                failed += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        waits = [now - enqueued_at for _, _, enqueued_at in group]
+        with self._stats_lock:
+            self._writes += len(group)
+            self._failed += failed
+            self._groups += 1
+            self._total_wait += sum(waits)
+            self._max_wait = max(self._max_wait, max(waits))
+
+    def stats(self) -> dict:
+        """Queue depth, group commit and wait time counters"""
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'writes': self._writes,
+                'failed': self._failed,
+                'groups': self._groups,
+                'avg_group_size': self._writes / self._groups if self._groups else 0.0,
+                'avg_wait_ms': self._total_wait / self._writes * 1000 if self._writes else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+            }
+
+    def close(self):
+        """Flush queued writes and stop the writer thread (on shutdown)"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
 
-        # Таблица работодателей
-        cur.execute("""CREATE TABLE IF NOT EXISTS employers (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER UNIQUE NOT NULL,
-                        company_name TEXT NOT NULL,
-                        contact_phone TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        FOREIGN KEY(user_id) REFERENCES users(user_id)
-                    )""")
 
-        # Таблица вакансий
-        cur.execute("""CREATE TABLE IF NOT EXISTS jobs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        employer_id INTEGER NOT NULL,
-                        title TEXT NOT NULL,
-                        description TEXT NOT NULL,
-                        salary TEXT,
-                        requirements TEXT,
-                        created_at TEXT NOT NULL,
-                        is_active BOOLEAN DEFAULT 1,
-                        FOREIGN KEY(employer_id) REFERENCES employers(id)
-                    )""")
+db_writer = DBWriter(db_pool, DB_GROUP_COMMIT_MAX)
 
-        # Таблица заявок
-        cur.execute("""CREATE TABLE IF NOT EXISTS applications (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        job_id INTEGER NOT NULL,
-                        student_id INTEGER NOT NULL,
-                        status TEXT NOT NULL DEFAULT 'pending',
-                        applied_at TEXT NOT NULL,
-                        reviewed_at TEXT,
-                        employer_notes TEXT,
-                        FOREIGN KEY(job_id) REFERENCES jobs(id),
-                        FOREIGN KEY(student_id) REFERENCES students(id)
-                    )""")
 
-        conn.commit()
-        conn.close()
+def db_read(query, params=()):
+    """Run a SELECT on the calling thread's own connection (WAL readers don't block each other)"""
+    cur = db_pool.connection().cursor()
+    try:
+        cur.execute(query, params)
+        return cur.fetchall()
+    finally:
+        cur.close()
 
 
 def db_execute(query, params=(), fetch=False, many=False):
-    with db_lock:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    if fetch:
+        return db_read(query, params)
+    return db_writer.submit(lambda cur: _write_statement(cur, query, params, many)).result()
+
+
+class AsyncDB:
+    """Async DB API: reads run on a pool of reader threads, writes go through the group-commit writer"""
+
+    def __init__(self, readers: int, writer: DBWriter):
+        self.readers = readers
+        self.writer = writer
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="db-reader")
+        return self._executor
+
+    async def fetch(self, query, params=()) -> list:
+        """Run a SELECT and return all rows"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), db_read, query, params)
+
+    async def fetchone(self, query, params=()):
+        """Run a SELECT and return the first row or None"""
+        rows = await self.fetch(query, params)
+        return rows[0] if rows else None
+
+    async def execute(self, query, params=()) -> int:
+        """Run a write statement and return lastrowid"""
+        return await self.transaction(lambda cur: _write_statement(cur, query, params))
+
+    async def executemany(self, query, seq_of_params):
+        """Run a write statement for every parameter tuple"""
+        await self.transaction(lambda cur: _write_statement(cur, query, seq_of_params, many=True))
+
+    async def transaction(self, fn):
+        """Run fn(cursor) atomically on the writer and return its result"""
+        return await asyncio.wrap_future(self.writer.submit(fn))
+
+    def close(self):
+        """Stop the reader executor and flush the writer (on shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.writer.close()
+
+
+db = AsyncDB(DB_READERS, db_writer)
+
+
+# ------------------ Salary parsing ------------------
+# (code, markers) - a marker must not follow a letter, so "150000тг" and "$500" both match
+SALARY_CURRENCIES = [
+    ("KZT", ("₸", "тг", "тенге", "теңге", "kzt")),
+    ("RUB", ("₽", "руб", "rub")),
+    ("USD", ("$", "usd", "долл", "dollar")),
+    ("EUR", ("€", "eur", "евро")),
+]
+SALARY_PERIODS = [
+    ("hour", ("час", "сағ", "hour", "/h")),
+    ("day", ("день", "дней", "күн", "day")),
+    ("week", ("недел", "апта", "week")),
+    ("year", ("год", "жыл", "year", "annual")),
+]
+# "150 000", "1,500,000" (thousands groups) or "1.5"; then an optional multiplier that ends the word
+SALARY_NUMBER = re.compile(
+    r"(\d{1,3}(?:[ \u00a0\u202f.,]\d{3})+(?!\d)|\d+(?:[.,]\d+)?)"
+    r"(?:\s*(k|к|тыс|тысяч[а-я]*|thousands?|млн|mln|millions?)(?![^\W\d_]))?"
+)
+SALARY_UPPER_ONLY = re.compile(r"(?<![^\W\d_])(до|дейін|up to|max)(?![^\W\d_])")
+
+
+def find_marker(text: str, table: list) -> str:
+    for code, markers in table:
+        for marker in markers:
+            if re.search(r"(?<![^\W\d_])" + re.escape(marker), text):
+                return code
+    return None
+
+
+def parse_salary(text: str) -> tuple:
+    """Free-text salary -> (min, max, currency, period); all None when there is no amount.
+
+    "от 150 000 тг" -> (150000, None, 'KZT', 'month'), "100-150k" -> (100000, 150000, ...),
+    "до 300к" -> (None, 300000, ...), "$20/hour" -> (20, 20, 'USD', 'hour')
+    """
+    if not text:
+        return None, None, None, None
+    text = text.lower()
+
+    amounts = []
+    for number, suffix in SALARY_NUMBER.findall(text):
+        if re.fullmatch(r"\d{1,3}(?:[ \u00a0\u202f.,]\d{3})+", number):
+            value = float(re.sub(r"\D", "", number))
+        else:
+            value = float(number.replace(",", "."))
+        multiplier = 1000000 if suffix.startswith(("млн", "mln", "mil")) else 1000 if suffix else 1
+        amounts.append((value, multiplier))
+    amounts = [(value, multiplier) for value, multiplier in amounts if value > 0][:2]
+    if not amounts:
+        return None, None, None, None
+
+    # "100-150k": the multiplier written once applies to the whole range
+    if len(amounts) == 2 and amounts[0][1] == 1 and amounts[1][1] > 1 and amounts[0][0] < 1000:
+        amounts[0] = (amounts[0][0], amounts[1][1])
+    values = sorted(int(round(value * multiplier)) for value, multiplier in amounts)
+
+    if len(values) == 2:
+        low, high = values
+    elif SALARY_UPPER_ONLY.search(text):
+        low, high = None, values[0]
+    elif re.search(r"(?<![^\W\d_])(от|from|бастап|min)(?![^\W\d_])", text) or "+" in text:
+        low, high = values[0], None
+    else:
+        low = high = values[0]
+
+    currency = find_marker(text, SALARY_CURRENCIES) or DEFAULT_SALARY_CURRENCY
+    period = find_marker(text, SALARY_PERIODS) or "month"
+    return low, high, currency, period
+
+
+def backfill_salaries(cur: sqlite3.Cursor):
+    """Fill the parsed salary columns for jobs written before they existed"""
+    rows = cur.execute("SELECT id, salary FROM jobs WHERE salary IS NOT NULL AND salary_currency IS NULL").fetchall()
+    cur.executemany(
+        "UPDATE jobs SET salary_min = ?, salary_max = ?, salary_currency = ?, salary_period = ? WHERE id = ?",
+        [(*parse_salary(salary), job_id) for job_id, salary in rows]
+    )
+
+
+# ------------------ Migrations ------------------
+# (version, description, steps). Append only: never edit a migration that may already be applied.
+# A step is an SQL string or a callable taking a cursor; every step must be idempotent.
+MIGRATIONS = [
+    (1, "hot-path indexes for applications", [
+        "CREATE INDEX IF NOT EXISTS idx_applications_job_student ON applications(job_id, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_job_applied ON applications(job_id, applied_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_student_applied ON applications(student_id, applied_at)",
+    ]),
+    (2, "hot-path indexes for jobs and students", [
+        "CREATE INDEX IF NOT EXISTS idx_jobs_active_created ON jobs(is_active, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_employer_created ON jobs(employer_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_students_created ON students(created_at)",
+    ]),
+    (3, "applications.employer_id with list/filter indexes", [
+        lambda cur: add_column(cur, "applications", "employer_id", "INTEGER"),
+        """UPDATE applications SET employer_id = (SELECT employer_id FROM jobs WHERE jobs.id = applications.job_id)
+           WHERE employer_id IS NULL""",
+        "CREATE INDEX IF NOT EXISTS idx_applications_employer_applied ON applications(employer_id, applied_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_employer_status_applied "
+        "ON applications(employer_id, status, applied_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_job_status_applied ON applications(job_id, status, applied_at)",
+    ]),
+    (4, "full-text index over active jobs", [
+        # External-content FTS5 table: the text lives in jobs, the index holds only active jobs
+        """CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+               title, description, requirements,
+               content='jobs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+           )""",
+        # Title matches weigh most, then requirements, then description
+        "INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 3.0)')",
+        """CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs WHEN new.is_active = 1 BEGIN
+               INSERT INTO jobs_fts (rowid, title, description, requirements)
+               VALUES (new.id, new.title, new.description, new.requirements);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs WHEN old.is_active = 1 BEGIN
+               INSERT INTO jobs_fts (jobs_fts, rowid, title, description, requirements)
+               VALUES ('delete', old.id, old.title, old.description, old.requirements);
+           END""",
+        # Edits and is_active toggles: drop the old entry if it was indexed, add the new one if active
+        """CREATE TRIGGER IF NOT EXISTS jobs_fts_update
+               AFTER UPDATE OF title, description, requirements, is_active ON jobs BEGIN
+               INSERT INTO jobs_fts (jobs_fts, rowid, title, description, requirements)
+               SELECT 'delete', old.id, old.title, old.description, old.requirements WHERE old.is_active = 1;
+               INSERT INTO jobs_fts (rowid, title, description, requirements)
+               SELECT new.id, new.title, new.description, new.requirements WHERE new.is_active = 1;
+           END""",
+        """INSERT INTO jobs_fts (rowid, title, description, requirements)
+           SELECT id, title, description, requirements FROM jobs WHERE is_active = 1""",
+    ]),
+    (5, "parsed salary columns with a range filter index", [
+        lambda cur: add_column(cur, "jobs", "salary_min", "INTEGER"),
+        lambda cur: add_column(cur, "jobs", "salary_max", "INTEGER"),
+        lambda cur: add_column(cur, "jobs", "salary_currency", "TEXT"),
+        lambda cur: add_column(cur, "jobs", "salary_period", "TEXT"),
+        backfill_salaries,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_active_salary ON jobs(is_active, salary_min)",
+    ]),
+    (6, "saved searches for new job alerts", [
+        """CREATE TABLE IF NOT EXISTS saved_searches (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               user_id INTEGER NOT NULL,
+               query TEXT NOT NULL DEFAULT '',
+               min_salary INTEGER,
+               created_at TEXT NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_saved_searches_user ON saved_searches(user_id)",
+    ]),
+    (7, "transactional notification outbox", [
+        """CREATE TABLE IF NOT EXISTS notifications_outbox (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               chat_id INTEGER NOT NULL,
+               kind TEXT NOT NULL,
+               ref_id INTEGER,
+               payload TEXT,
+               status TEXT NOT NULL DEFAULT 'pending', -- pending / sending / sent / dead
+               attempts INTEGER NOT NULL DEFAULT 0,
+               next_attempt_at TEXT NOT NULL,
+               created_at TEXT NOT NULL,
+               sent_at TEXT,
+               last_error TEXT
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON notifications_outbox(status, next_attempt_at)",
+    ]),
+    (8, "resumable admin broadcasts", [
+        """CREATE TABLE IF NOT EXISTS broadcasts (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               admin_id INTEGER NOT NULL,
+               chat_id INTEGER NOT NULL,
+               message_id INTEGER, -- progress message, edited in place
+               text TEXT NOT NULL,
+               filters TEXT NOT NULL, -- JSON: course, major, lang
+               status TEXT NOT NULL DEFAULT 'draft', -- draft / running / done / cancelled / failed
+               cursor INTEGER NOT NULL DEFAULT 0, -- last students.id already handled
+               total INTEGER NOT NULL DEFAULT 0,
+               sent INTEGER NOT NULL DEFAULT 0,
+               failed INTEGER NOT NULL DEFAULT 0,
+               created_at TEXT NOT NULL,
+               finished_at TEXT
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_broadcasts_status ON broadcasts(status)",
+    ]),
+    (9, "employer application digests", [
+        # 0 minutes = a notification per application
+        lambda cur: add_column(cur, "employers", "digest_minutes", "INTEGER NOT NULL DEFAULT 0"),
+        lambda cur: add_column(cur, "employers", "digest_size", "INTEGER NOT NULL DEFAULT 25"),
+        """CREATE TABLE IF NOT EXISTS application_digest (
+               application_id INTEGER PRIMARY KEY,
+               employer_id INTEGER NOT NULL,
+               created_at TEXT NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_application_digest_employer ON application_digest(employer_id)",
+    ]),
+]
+
+# Hot queries checked by `migrate verify`: (name, query, sample params)
+HOT_QUERIES = [
+    ("active jobs", """SELECT j.id, j.title, e.company_name, j.salary, j.created_at
+                       FROM jobs j JOIN employers e ON j.employer_id = e.id
+                       WHERE j.is_active = 1 ORDER BY j.created_at DESC, j.id DESC LIMIT ?""", (11,)),
+    ("active jobs page", """SELECT j.id, j.title, e.company_name, j.salary, j.created_at
+                            FROM jobs j JOIN employers e ON j.employer_id = e.id
+                            WHERE j.is_active = 1 AND (j.created_at, j.id) < (?, ?)
+                            ORDER BY j.created_at DESC, j.id DESC LIMIT ?""", ("", 0, 11)),
+    ("employer jobs", """SELECT id, title, description, salary, requirements, created_at, is_active
+                         FROM jobs WHERE employer_id = ? ORDER BY created_at DESC""", (1,)),
+    ("already applied", "SELECT id FROM applications WHERE job_id = ? AND student_id = ?", (1, 1)),
+    ("student applications", """SELECT a.id, j.title, e.company_name, a.status, a.applied_at
+                                FROM applications a
+                                JOIN jobs j ON a.job_id = j.id
+                                JOIN employers e ON j.employer_id = e.id
+                                WHERE a.student_id = ? ORDER BY a.applied_at DESC""", (1,)),
+    ("employer applications", """SELECT a.id, s.fullname, j.title, a.status, a.applied_at
+                                 FROM applications a
+                                 JOIN students s ON a.student_id = s.id
+                                 JOIN jobs j ON a.job_id = j.id
+                                 WHERE j.employer_id = ? ORDER BY a.applied_at DESC""", (1,)),
+    ("job applications", """SELECT a.id, s.fullname, j.title, a.status, a.applied_at
+                            FROM applications a
+                            JOIN students s ON a.student_id = s.id
+                            JOIN jobs j ON a.job_id = j.id
+                            WHERE j.id = ? ORDER BY a.applied_at DESC""", (1,)),
+    ("job applications count", "SELECT COUNT(*) FROM applications WHERE job_id = ?", (1,)),
+    ("employer applications page", """SELECT a.id, s.fullname, j.title, a.status, a.applied_at
+                                      FROM applications a
+                                      JOIN students s ON a.student_id = s.id
+                                      JOIN jobs j ON a.job_id = j.id
+                                      WHERE a.employer_id = ? AND a.status = ? AND (a.applied_at, a.id) < (?, ?)
+                                      ORDER BY a.applied_at DESC, a.id DESC LIMIT ?""", (1, 'pending', '', 0, 11)),
+    ("application counts", """SELECT a.status, COUNT(*) FROM applications a
+                              WHERE a.employer_id = ? AND a.applied_at >= ? GROUP BY a.status""", (1, '')),
+    ("job application counts", """SELECT a.status, COUNT(*) FROM applications a
+                                  WHERE a.employer_id = ? AND a.job_id = ? GROUP BY a.status""", (1, 1)),
+    ("students page", """SELECT id, fullname, phone, course, major, about, created_at
+                         FROM students WHERE (created_at, id) < (?, ?)
+                         ORDER BY created_at DESC, id DESC LIMIT ?""", ("", 0, 501)),
+    ("job search", """SELECT j.id, j.title, e.company_name, j.salary, j.created_at,
+                             (SELECT 1 FROM jobs_fts WHERE jobs_fts MATCH ?1
+                              ORDER BY rowid DESC LIMIT 1 OFFSET ?2) AS capped
+                      FROM (SELECT rowid, bm25(jobs_fts, 10.0, 1.0, 3.0) AS score FROM jobs_fts
+                            WHERE jobs_fts MATCH ?1
+                              AND rowid >= coalesce((SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?1
+                                                     ORDER BY rowid DESC LIMIT 1 OFFSET ?2), 0)
+                            ORDER BY score LIMIT ?3 OFFSET ?4) f
+                      JOIN jobs j ON j.id = f.rowid
+                      JOIN employers e ON j.employer_id = e.id
+                      WHERE j.is_active = 1 ORDER BY f.score""", ('"python"', SEARCH_RANK_WINDOW - 1, 11, 0)),
+    ("active jobs by salary page", """SELECT j.id, j.title, e.company_name, j.salary, j.salary_min
+                                     FROM jobs j JOIN employers e ON j.employer_id = e.id
+                                     WHERE j.is_active = 1 AND j.salary_min >= ?
+                                       AND j.salary_currency = ? AND j.salary_period = 'month'
+                                       AND (j.salary_min, j.id) < (?, ?)
+                                     ORDER BY j.salary_min DESC, j.id DESC LIMIT ?""",
+     (150000, 'KZT', 10 ** 9, 0, 11)),
+    ("user saved searches", "SELECT id, query, min_salary FROM saved_searches WHERE user_id = ? ORDER BY id", (1,)),
+    ("outbox due", """SELECT id FROM notifications_outbox WHERE status = 'pending' AND next_attempt_at <= ?
+                      ORDER BY next_attempt_at, id LIMIT ?""", ("", 50)),
+    ("broadcast recipients", """SELECT s.id, s.user_id, s.major FROM students s JOIN users u ON u.user_id = s.user_id
+                                WHERE s.id > ? AND s.course = ? AND u.language = ? ORDER BY s.id LIMIT ?""",
+     (0, "3", "ru", 100)),
+    ("running broadcasts", "SELECT id FROM broadcasts WHERE status = 'running'", ()),
+]
+
+
+def add_column(cur: sqlite3.Cursor, table: str, column: str, declaration: str):
+    """Idempotent ALTER TABLE ... ADD COLUMN"""
+    columns = [row[1] for row in cur.execute(f"PRAGMA table_info({table})").fetchall()]
+    if column not in columns:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def get_applied_migrations(conn: sqlite3.Connection) -> dict:
+    """Applied migration versions -> applied_at"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not exists:
+        return {}
+    return dict(conn.execute("SELECT version, applied_at FROM schema_version").fetchall())
+
+
+def apply_migrations(conn: sqlite3.Connection) -> list:
+    """Apply pending migrations in order, each in its own transaction. Returns applied versions"""
+    conn.execute("""CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT NOT NULL,
+                        applied_at TEXT NOT NULL
+                    )""")
+    conn.commit()
+
+    applied = get_applied_migrations(conn)
+    done = []
+    for version, description, steps in MIGRATIONS:
+        if version in applied:
+            continue
         cur = conn.cursor()
-        if many:
-            cur.executemany(query, params)
+        try:
+            cur.execute("BEGIN")
+            for step in steps:
+                if callable(step):
+                    step(cur)
+                else:
+                    cur.execute(step)
+            cur.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().isoformat())
+            )
             conn.commit()
-            conn.close()
-            return None
-        cur.execute(query, params)
-        res = cur.fetchall() if fetch else None
-        conn.commit()
-        conn.close()
-        return res
+        except Exception:
+            conn.rollback()
+            logger.error("Migration %s (%s) failed", version, description)
+            raise
+        finally:
+            cur.close()
+        logger.info("Applied migration %s: %s", version, description)
+        done.append(version)
+    return done
+
+
+def find_table_scans(conn: sqlite3.Connection) -> list:
+    """EXPLAIN QUERY PLAN every hot query; return (name, plan detail) for full table scans"""
+    problems = []
+    for name, query, params in HOT_QUERIES:
+        subqueries = set()
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall():
+            detail = row[-1]
+            if detail.startswith(("CO-ROUTINE ", "MATERIALIZE ")):
+                subqueries.add(detail.split()[1])
+            # Virtual tables (FTS5) scan through their own index; subquery results are already bounded
+            elif (detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE INDEX" not in detail
+                  and detail.split()[1] not in subqueries):
+                problems.append((name, detail))
+    return problems
+
+
+def cli_migrate(argv: list) -> int:
+    """`python main.py migrate {status,apply,verify}`"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="main.py migrate", description="Schema migrations")
+    parser.add_argument("command", choices=["status", "apply", "verify"])
+    args = parser.parse_args(argv)
+
+    conn = db_pool.connection()
+    if args.command == "apply":
+        init_db()
+        print(f"Schema is at version {max(get_applied_migrations(conn), default=0)}")
+        return 0
+
+    applied = get_applied_migrations(conn)
+    pending = [version for version, _, _ in MIGRATIONS if version not in applied]
+
+    if args.command == "status":
+        for version, description, _ in MIGRATIONS:
+            state = f"applied {applied[version]}" if version in applied else "pending"
+            print(f"{version:>4}  {description:<45} {state}")
+        return 0
+
+    # verify
+    ok = True
+    if pending:
+        print(f"Pending migrations: {', '.join(map(str, pending))}")
+        ok = False
+    try:
+        scans = find_table_scans(conn)
+    except sqlite3.Error as e:
+        print(f"Cannot check query plans: {e}")
+        return 1
+    for name, detail in scans:
+        print(f"Full scan in '{name}': {detail}")
+        ok = False
+    if ok:
+        print(f"OK: schema at version {max(applied, default=0)}, {len(HOT_QUERIES)} hot queries use indexes")
+    return 0 if ok else 1
+
+
+# ------------------ Caching ------------------
+class TTLCache:
+    """Bounded LRU cache with per-entry TTL and hit/miss/eviction counters"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at < monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+# user_id -> UserContext snapshot; updated on every write of language/type/profile ids
+user_profile_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+class JobCatalog:
+    """Versioned in-memory cache of active-job pages shared by the browse handlers.
+
+    Pages are fetched with keyset cursors on (created_at, id), so any page costs one
+    indexed query regardless of its position. Any write that changes the set of
+    active jobs must call invalidate(); cached pages of older versions are dropped.
+    """
+
+    def __init__(self, page_size: int, max_pages: int):
+        self.page_size = page_size
+        self.version = 0
+        self.page_loads = 0
+        self.last_load_ms = 0.0
+        self._pages = TTLCache(max_pages, float("inf"))  # dropped explicitly by invalidate()
+
+    def invalidate(self):
+        self.version += 1
+        self._pages.clear()
+
+    async def page(self, direction: str = None, cursor: tuple = None, min_salary: int = None) -> tuple:
+        """(rows, has_prev, has_next); rows are (id, title, company_name, salary, key), where key is created_at,
+        or salary_min when filtering by a monthly salary floor (then the best paid jobs come first).
+
+        direction 'n' returns jobs after the cursor, 'p' jobs before it, None the first page.
+        """
+        key = (self.version, min_salary, direction, cursor)
+        cached = self._pages.get(key)
+        if cached is not None:
+            return cached
+
+        version = self.version
+        started = monotonic()
+        where = "WHERE j.is_active = 1 "
+        params = []
+        sort = "j.created_at"
+        if min_salary:
+            # Range scan on idx_jobs_active_salary, which also gives the order
+            where += "AND j.salary_min >= ? AND j.salary_currency = ? AND j.salary_period = 'month' "
+            params = [min_salary, DEFAULT_SALARY_CURRENCY]
+            sort = "j.salary_min"
+            if cursor:
+                cursor = (int(cursor[0]), cursor[1])
+        base = f"""SELECT j.id, j.title, e.company_name, j.salary, {sort}
+                   FROM jobs j
+                   JOIN employers e ON j.employer_id = e.id
+                   {where}"""
+        limit = self.page_size + 1
+        if direction == 'n':
+            rows = await db.fetch(
+                base + f"AND ({sort}, j.id) < (?, ?) ORDER BY {sort} DESC, j.id DESC LIMIT ?",
+                (*params, *cursor, limit)
+            )
+            result = (rows[:self.page_size], True, len(rows) > self.page_size)
+        elif direction == 'p':
+            rows = await db.fetch(
+                base + f"AND ({sort}, j.id) > (?, ?) ORDER BY {sort} ASC, j.id ASC LIMIT ?",
+                (*params, *cursor, limit)
+            )
+            result = (rows[:self.page_size][::-1], len(rows) > self.page_size, True)
+        else:
+            rows = await db.fetch(base + f"ORDER BY {sort} DESC, j.id DESC LIMIT ?", (*params, limit))
+            result = (rows[:self.page_size], False, len(rows) > self.page_size)
+
+        self.page_loads += 1
+        self.last_load_ms = (monotonic() - started) * 1000
+        # Don't cache a page that was read while a write invalidated the catalog
+        if version == self.version:
+            self._pages.set(key, result)
+        return result
+
+    def stats(self) -> dict:
+        pages = self._pages.stats()
+        return {
+            'version': self.version,
+            'cached_pages': pages['size'],
+            'hits': pages['hits'],
+            'page_loads': self.page_loads,
+            'last_load_ms': self.last_load_ms,
+        }
+
+
+job_catalog = JobCatalog(JOBS_PAGE_SIZE, JOBS_CACHED_PAGES)
+
+# (normalized query, language, offset, catalog version) -> (inline results, next_offset)
+inline_results_cache = TTLCache(INLINE_CACHE_SIZE, INLINE_CACHE_TTL)
+
+
+# ------------------ Recommendations ------------------
+def match_tokens(text: str) -> list:
+    """Lowercased words cut to MATCH_STEM_LENGTH chars - a cheap stemmer for ru/kk/en word forms"""
+    return [token[:MATCH_STEM_LENGTH] for token in re.findall(r"\w+", text.lower())
+            if len(token) > 1 or token.isdigit()]
+
+
+def hashed_vector(fields: list, dim: int) -> tuple:
+    """[(text, weight)] -> (indices, values): hashed sublinear term frequencies, L2-normalised"""
+    counts = {}
+    for text, weight in fields:
+        for token in match_tokens(str(text or "")):
+            bucket = zlib.crc32(token.encode()) % dim
+            counts[bucket] = counts.get(bucket, 0.0) + weight
+    indices = np.fromiter(counts.keys(), np.int32, len(counts))
+    values = 1 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+def job_fields(title: str, description: str, requirements: str) -> list:
+    return [(title, 3.0), (requirements, 2.0), (description, 1.0)]
+
+
+def student_fields(course: str, major: str, about: str) -> list:
+    return [(major, 3.0), (course, 1.0), (about, 1.0)]
+
+
+def grow(array: np.ndarray, size: int) -> np.ndarray:
+    """array with room for at least `size` rows (capacity doubles)"""
+    if len(array) >= size:
+        return array
+    grown = np.zeros((max(size, 2 * len(array)),) + array.shape[1:], array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class JobMatcher:
+    """Hashed TF vectors of active jobs kept as one CSR-like matrix (row ids, columns, values).
+
+    Document frequencies are counted per hash bucket and IDF is applied on the query side, so
+    adding or removing a job never rewrites other rows. Scoring a student against every job is
+    a single sparse matrix-vector product.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.df = np.zeros(self.dim, np.int32)
+        self.job_ids = np.zeros(0, np.int64)
+        self.alive = np.zeros(0, bool)
+        self.spans = np.zeros((0, 2), np.int64)  # row -> [start, end) in rows/indices/values
+        self.rows = np.zeros(0, np.int32)
+        self.indices = np.zeros(0, np.int32)
+        self.values = np.zeros(0, np.float32)
+        self.n_rows = 0
+        self.nnz = 0
+        self.active = 0
+        self._row_of = {}
+
+    def load(self):
+        """Rebuild from the active jobs in the DB"""
+        started = monotonic()
+        jobs = db_read("SELECT id, title, description, requirements FROM jobs WHERE is_active = 1")
+        vectors = [(job_id, *hashed_vector(job_fields(title, description, requirements), self.dim))
+                   for job_id, title, description, requirements in jobs]
+        with self._lock:
+            self.reset()
+            for job_id, indices, values in vectors:
+                self._append(job_id, indices, values)
+        logger.info("Job matcher: %s jobs, %s terms in %.0f ms", self.active, self.nnz, (monotonic() - started) * 1000)
+
+    def add(self, job_id: int, title: str, description: str, requirements: str):
+        """New or re-activated job; replaces the job's previous vector"""
+        indices, values = hashed_vector(job_fields(title, description, requirements), self.dim)
+        with self._lock:
+            self._drop(job_id)
+            self._append(job_id, indices, values)
+
+    def remove(self, job_id: int):
+        """Deactivated or deleted job"""
+        with self._lock:
+            self._drop(job_id)
+            if self.n_rows - self.active > max(1024, self.active):
+                self._compact()
+
+    def recommend(self, fields: list, limit: int, exclude: set = frozenset()) -> list:
+        """[(job_id, score)] of the best matching active jobs, best first"""
+        indices, values = hashed_vector(fields, self.dim)
+        with self._lock:
+            if not len(indices) or not self.active:
+                return []
+            idf = np.log((self.active + 1) / (self.df[indices] + 1)) + 1
+            query = np.zeros(self.dim, np.float32)
+            query[indices] = values * idf * idf
+
+            n, nnz = self.n_rows, self.nnz
+            scores = np.bincount(self.rows[:nnz], weights=self.values[:nnz] * query[self.indices[:nnz]], minlength=n)
+            scores[~self.alive[:n]] = 0
+            job_ids = self.job_ids[:n]
+            if exclude:
+                scores[np.isin(job_ids, list(exclude))] = 0
+
+            k = min(limit, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(job_ids[row]), float(scores[row])) for row in top if scores[row] > 0]
+
+    def score_profiles(self, fields: list, profiles: list) -> np.ndarray:
+        """Fit of every profile (student_fields lists) with one job's fields, in a single sparse product"""
+        scores = np.zeros(len(profiles), np.float32)
+        indices, values = hashed_vector(fields, self.dim)
+        if not len(indices) or not profiles:
+            return scores
+        with self._lock:
+            idf = np.log((self.active + 1) / (self.df[indices] + 1)) + 1
+        query = np.zeros(self.dim, np.float32)
+        query[indices] = values * idf * idf
+
+        # Profiles as CSR rows, scored the same way recommend() scores jobs
+        vectors = [hashed_vector(profile, self.dim) for profile in profiles]
+        rows = np.repeat(np.arange(len(profiles)), [len(profile_indices) for profile_indices, _ in vectors])
+        cols = np.concatenate([profile_indices for profile_indices, _ in vectors])
+        vals = np.concatenate([profile_values for _, profile_values in vectors])
+        scores[:] = np.bincount(rows, weights=vals * query[cols], minlength=len(profiles))
+        return scores
+
+    def stats(self) -> dict:
+        return {'jobs': self.active, 'rows': self.n_rows, 'terms': self.nnz}
+
+    def _append(self, job_id: int, indices: np.ndarray, values: np.ndarray):
+        row, start = self.n_rows, self.nnz
+        end = start + len(indices)
+        for name in ("job_ids", "alive", "spans"):
+            setattr(self, name, grow(getattr(self, name), row + 1))
+        for name in ("rows", "indices", "values"):
+            setattr(self, name, grow(getattr(self, name), end))
+
+        self.rows[start:end] = row
+        self.indices[start:end] = indices
+        self.values[start:end] = values
+        self.job_ids[row] = job_id
+        self.alive[row] = True
+        self.spans[row] = (start, end)
+        self.df[indices] += 1
+        self.n_rows, self.nnz = row + 1, end
+        self.active += 1
+        self._row_of[job_id] = row
+
+    def _drop(self, job_id: int):
+        row = self._row_of.pop(job_id, None)
+        if row is None:
+            return
+        start, end = self.spans[row]
+        self.df[self.indices[start:end]] -= 1
+        self.alive[row] = False
+        self.active -= 1
+
+    def _compact(self):
+        """Drop the rows of removed jobs"""
+        keep = np.flatnonzero(self.alive[:self.n_rows])
+        mask = self.alive[self.rows[:self.nnz]]
+        renumber = np.zeros(self.n_rows, np.int32)
+        renumber[keep] = np.arange(len(keep), dtype=np.int32)
+        lengths = self.spans[keep, 1] - self.spans[keep, 0]
+        ends = np.cumsum(lengths)
+
+        self.rows = renumber[self.rows[:self.nnz][mask]]
+        self.indices = self.indices[:self.nnz][mask]
+        self.values = self.values[:self.nnz][mask]
+        self.spans = np.stack([ends - lengths, ends], axis=1)
+        self.job_ids = self.job_ids[keep]
+        self.alive = np.ones(len(keep), bool)
+        self.n_rows, self.nnz = len(keep), len(self.indices)
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self.job_ids)}
+
+
+job_matcher = JobMatcher(MATCH_FEATURES)
+
+# (job_id, job version, student_id) -> fit score; bumping the job's version drops its scores
+fit_score_cache = TTLCache(FIT_CACHE_SIZE, FIT_CACHE_TTL)
+fit_job_versions = {}  # job_id -> version, for existing jobs changed since start
+
+
+def invalidate_job_scores(job_id: int):
+    """Forget cached applicant scores of a job that was changed or (de)activated"""
+    fit_job_versions[job_id] = fit_job_versions.get(job_id, 0) + 1
+
+
+def forget_job_scores(job_id: int):
+    """Drop a deleted job's version; job ids are AUTOINCREMENT, so its leftover scores are never read
+    again and age out of the bounded cache"""
+    fit_job_versions.pop(job_id, None)
+
+
+# ------------------ Saved Search Alerts ------------------
+class SavedSearchIndex:
+    """In-memory index of saved searches for matching newly posted jobs.
+
+    A job matches a keyword search when it contains all of the search's terms. Each search is filed
+    under its rarest term (the one the fewest searches share) and only checked against jobs that
+    contain that term, so common words like "developer" don't make every new job scan every search.
+    Searches with only a salary floor are kept sorted by floor and matched with a bisect.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.searches = {}  # id -> (user_id, terms, min_salary, query)
+        self.by_term = {}  # term -> {search ids}, for term rarity
+        self.by_anchor = {}  # rarest term of a search -> {search ids}
+        self.anchors = {}  # search id -> its anchor term
+        self.floors = []  # sorted (min_salary, id) of searches without keywords
+
+    def load(self):
+        """Rebuild from the saved_searches table"""
+        rows = db_read("SELECT id, user_id, query, min_salary FROM saved_searches")
+        with self._lock:
+            self.reset()
+            for row in rows:
+                self._add(*row, anchor=False)
+            # Anchor once every term count is known
+            for search_id, (_, terms, _, _) in self.searches.items():
+                if terms:
+                    self._anchor(search_id, terms)
+        logger.info("Saved searches: %s loaded", len(self.searches))
+
+    def add(self, search_id: int, user_id: int, query: str, min_salary: int = None):
+        """New search, or an existing one with a changed floor"""
+        with self._lock:
+            self._remove(search_id)
+            self._add(search_id, user_id, query, min_salary)
+
+    def remove(self, search_id: int, user_id: int = None):
+        """Drop a search; with user_id, only if that user owns it"""
+        with self._lock:
+            if user_id is None or self.searches.get(search_id, (None,))[0] == user_id:
+                self._remove(search_id)
+
+    def match(self, text: str, salary_min: int, currency: str, period: str) -> dict:
+        """user_id -> id of one saved search the new job satisfies"""
+        words = set(search_terms(text, limit=None))
+        # Same rule as the browse salary filter: a monthly salary in the default currency
+        salary = salary_min if currency == DEFAULT_SALARY_CURRENCY and period == 'month' else None
+        with self._lock:
+            matched = [search_id for word in words for search_id in self.by_anchor.get(word, ())
+                       if words.issuperset(self.searches[search_id][1])]
+            if salary is not None:
+                matched += [search_id for _, search_id in self.floors[:bisect_right(self.floors, (salary, float("inf")))]]
+
+            users = {}
+            for search_id in matched:
+                user_id, terms, min_salary, query = self.searches[search_id]
+                if terms and min_salary and (salary is None or salary < min_salary):
+                    continue
+                users.setdefault(user_id, search_id)
+            return users
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'searches': len(self.searches), 'terms': len(self.by_term), 'salary_only': len(self.floors)}
+
+    def _add(self, search_id: int, user_id: int, query: str, min_salary: int, anchor: bool = True):
+        terms = tuple(dict.fromkeys(search_terms(query)))
+        self.searches[search_id] = (user_id, terms, min_salary, query)
+        if terms:
+            for term in terms:
+                self.by_term.setdefault(term, set()).add(search_id)
+            if anchor:
+                self._anchor(search_id, terms)
+        elif min_salary:
+            insort(self.floors, (min_salary, search_id))
+
+    def _anchor(self, search_id: int, terms: tuple):
+        # Fewest searches first, then the longer (more specific) word
+        term = min(terms, key=lambda term: (len(self.by_term[term]), -len(term)))
+        self.anchors[search_id] = term
+        self.by_anchor.setdefault(term, set()).add(search_id)
+
+    def _remove(self, search_id: int):
+        search = self.searches.pop(search_id, None)
+        if search is None:
+            return
+        _, terms, min_salary, _ = search
+        for term in terms:
+            ids = self.by_term[term]
+            ids.discard(search_id)
+            if not ids:
+                del self.by_term[term]
+        anchor = self.anchors.pop(search_id, None)
+        if anchor is not None:
+            ids = self.by_anchor[anchor]
+            ids.discard(search_id)
+            if not ids:
+                del self.by_anchor[anchor]
+        if not terms and min_salary:
+            self.floors.remove((min_salary, search_id))
+
+
+saved_search_index = SavedSearchIndex()
+
+
+def match_job_alerts(text: str, salary_min: int, currency: str, period: str, author_id: int) -> list:
+    """Ids of the saved searches a new job should alert about, one per user other than its author"""
+    users = saved_search_index.match(text, salary_min, currency, period)
+    users.pop(author_id, None)
+    return list(users.values())
+
+
+def queue_job_alerts(cur, job_id: int, search_ids: list) -> int:
+    """Queue the alerts in the outbox inside the transaction that creates the job"""
+    if not search_ids:
+        return 0
+    queued = enqueue_notifications(cur, 'job_alert', search_ids, {'job_id': job_id})
+    logger.info("Job %s: %s saved search alerts queued", job_id, queued)
+    return queued
 
 
 # ------------------ Language & Text Utilities ------------------
-def get_user_language(user_id: int) -> str:
+async def get_user_language(user_id: int) -> str:
     """Get user's preferred language"""
-    result = db_execute(
-        "SELECT language FROM users WHERE user_id = ?",
-        (user_id,), fetch=True
-    )
-    return result[0][0] if result else 'ru'
+    return (await load_user_context(user_id)).language
 
 
 def get_text(key: str, language: str) -> str:
@@ -573,7 +2086,7 @@ def get_text(key: str, language: str) -> str:
 
 async def send_localized_message(context, chat_id, key, reply_markup=None, **format_kwargs):
     """Send message in user's language"""
-    language = get_user_language(chat_id)
+    language = await get_user_language(chat_id)
     text = get_text(key, language)
 
     if format_kwargs:
@@ -588,57 +2101,585 @@ def is_employer(user_id: int) -> bool:
     return user_id in admin_ids_set
 
 
-def get_user_type(user_id: int) -> str:
-    """Get user type (student/employer)"""
-    result = db_execute(
-        "SELECT user_type FROM users WHERE user_id = ?",
-        (user_id,), fetch=True
+@dataclass
+class UserContext:
+    """Everything handlers need to know about the current user, loaded once per update"""
+    user_id: int
+    language: str = 'ru'
+    user_type: str = None  # None until the user picked a language
+    student_id: int = None
+    employer_id: int = None
+
+    @property
+    def exists(self) -> bool:
+        return self.user_type is not None
+
+    @property
+    def is_registered(self) -> bool:
+        """Fully registered: has the profile matching user_type"""
+        if self.user_type == 'student':
+            return self.student_id is not None
+        if self.user_type == 'employer':
+            return self.employer_id is not None
+        return False
+
+
+async def load_user_context(user_id: int) -> UserContext:
+    """Resolve language, type and profile ids: from the cache or with a single query"""
+    cached = user_profile_cache.get(user_id)
+    if cached is not None:
+        return replace(cached)
+
+    row = await db.fetchone(
+        """SELECT u.user_type, u.language, s.id, e.id
+           FROM (SELECT ? AS user_id) q
+           LEFT JOIN users u ON u.user_id = q.user_id
+           LEFT JOIN students s ON s.user_id = q.user_id
+           LEFT JOIN employers e ON e.user_id = q.user_id""",
+        (user_id,)
     )
-    return result[0][0] if result else None
+    user_type, language, student_id, employer_id = row
+    user_ctx = UserContext(user_id=user_id, language=language or 'ru', user_type=user_type,
+                           student_id=student_id, employer_id=employer_id)
+    user_profile_cache.set(user_id, replace(user_ctx))
+    return user_ctx
+
+
+def remember_user_context(user_ctx: UserContext):
+    """Write-through: store the updated UserContext after changing the user's profile"""
+    user_profile_cache.set(user_ctx.user_id, replace(user_ctx))
+
+
+async def get_user_context(update: Update, context: ContextTypes.DEFAULT_TYPE) -> UserContext:
+    """UserContext of the update's user, loaded on first access and kept on context"""
+    user_ctx = getattr(context, "user_ctx", None)
+    if user_ctx is None:
+        user = update.effective_user
+        user_ctx = await load_user_context(user.id)
+        context.user_ctx = user_ctx
+    return user_ctx
+
+
+async def preload_user_context(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Runs before every handler group so the whole update shares one UserContext"""
+    if update.effective_user:
+        await get_user_context(update, context)
+
+
+# ------------------ Outbound Message Scheduler ------------------
+# Priority lanes: replies to the user's own action go first, then notifications to other users, then bulk sends
+PRIORITY_INTERACTIVE, PRIORITY_NOTIFICATION, PRIORITY_BULK = range(3)
+PRIORITY_NAMES = ("interactive", "notification", "bulk")
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `capacity` saved for bursts"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available; 0 if one is available now"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+@dataclass
+class SendRequest:
+    chat_id: int
+    call: object  # () -> awaitable Bot API call
+    future: asyncio.Future
+    priority: int
+    queued_at: float
+    attempts: int = 0
+    raise_errors: bool = False
+
+
+class ChatState:
+    """Send state of one chat: its token bucket and queued requests per priority lane"""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.queues = [deque() for _ in PRIORITY_NAMES]
+        self.scheduled = set()  # lanes whose ready heap holds an entry for this chat
+        self.in_flight = 0  # requests being sent, capped by chat_parallel
+        self.blocked_until = 0.0  # retry_after / backoff
+
+    def idle(self, now: float) -> bool:
+        return (not self.in_flight and not self.scheduled and not any(self.queues)
+                and self.blocked_until <= now and self.bucket.full(now))
+
+
+class MessageScheduler:
+    """Single dispatcher for outgoing Bot API calls, rate limited globally and per chat.
+
+    Each lane keeps a heap of (ready_at, seq, chat_id) for chats with queued requests; the dispatcher
+    takes the first ready chat of the highest lane, so a flood of bulk sends never delays replies.
+    A chat has at most chat_parallel requests in flight. RetryAfter blocks the chat for the time Telegram asks;
+    timeouts and network errors back off exponentially with jitter.
+    """
+
+    def __init__(self, global_rate: float, chat_rate: float, group_rate: float, burst: int, max_retries: int,
+                 chat_parallel: int = 1):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.burst = burst
+        self.chat_parallel = chat_parallel
+        self.max_retries = max_retries
+        self._loop = None
+        self._task = None
+
+    def _start(self):
+        """Start (or, under a new event loop, restart) the dispatcher"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not self._task.done():
+            return
+        self._loop = loop
+        self.global_bucket = TokenBucket(self.global_rate, self.global_rate)
+        self._chats = {}
+        self._ready = [[] for _ in PRIORITY_NAMES]
+        self._seq = count()
+        self._wakeup = asyncio.Event()
+        self._in_flight = set()
+        self.depth = [0] * len(PRIORITY_NAMES)
+        self.sent = self.retries = self.failed = 0
+        self.delays = deque(maxlen=1000)  # queue wait of the latest sends, seconds
+        self.max_delay = 0.0
+        self._task = loop.create_task(self._run())
+
+    async def submit(self, chat_id: int, call, priority: int = PRIORITY_INTERACTIVE, raise_errors: bool = False):
+        """Queue a Bot API call for the chat and wait for its result.
+
+        If it fails for good the result is None, or the last error is raised when raise_errors is set.
+        """
+        self._start()
+        state = self._chats.get(chat_id)
+        if state is None:
+            rate = self.group_rate if chat_id < 0 else self.chat_rate
+            state = self._chats[chat_id] = ChatState(TokenBucket(rate, self.burst))
+        request = SendRequest(chat_id, call, self._loop.create_future(), priority, monotonic(),
+                              raise_errors=raise_errors)
+        state.queues[priority].append(request)
+        self.depth[priority] += 1
+        self._schedule(chat_id, state, priority, monotonic())
+        self._wakeup.set()
+        return await request.future
+
+    def _schedule(self, chat_id: int, state: ChatState, lane: int, now: float):
+        if state.in_flight >= self.chat_parallel or lane in state.scheduled or not state.queues[lane]:
+            return
+        state.scheduled.add(lane)
+        heappush(self._ready[lane], (max(now, state.blocked_until), next(self._seq), chat_id))
+
+    def _next_request(self, now: float) -> tuple:
+        """(request, None) of the first ready chat by lane, or (None, seconds until one may be ready)"""
+        wait = None
+        for lane, heap in enumerate(self._ready):
+            while heap and heap[0][0] <= now:
+                _, _, chat_id = heappop(heap)
+                state = self._chats[chat_id]
+                state.scheduled.discard(lane)
+                if state.in_flight >= self.chat_parallel or not state.queues[lane]:
+                    continue  # rescheduled when one of the chat's sends finishes
+                if state.blocked_until > now:
+                    # A parallel send hit RetryAfter after this entry was pushed: wait it out
+                    state.scheduled.add(lane)
+                    heappush(heap, (state.blocked_until, next(self._seq), chat_id))
+                    continue
+                delay = state.bucket.wait_time(now)
+                if delay:
+                    state.scheduled.add(lane)
+                    heappush(heap, (now + delay, next(self._seq), chat_id))
+                    continue
+                state.bucket.take()
+                state.in_flight += 1
+                self.depth[lane] -= 1
+                request = state.queues[lane].popleft()
+                self._schedule(chat_id, state, lane, now)
+                return request, None
+            if heap:
+                wait = heap[0][0] - now if wait is None else min(wait, heap[0][0] - now)
+        return None, wait
+
+    async def _run(self):
+        last_cleanup = monotonic()
+        while True:
+            now = monotonic()
+            delay = self.global_bucket.wait_time(now)
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            request, wait = self._next_request(now)
+            if request is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.global_bucket.take()
+            task = asyncio.create_task(self._deliver(request))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+            if now - last_cleanup > 60:
+                # Forget chats that are back to a full bucket: a new ChatState is the same thing
+                for chat_id in [chat_id for chat_id, state in self._chats.items() if state.idle(now)]:
+                    del self._chats[chat_id]
+                last_cleanup = now
+
+    async def _deliver(self, request: SendRequest):
+        state = self._chats[request.chat_id]
+        started = monotonic()
+        retry_in = None
+        result = error = None
+        if not request.future.done():
+            try:
+                result = await request.call()
+            except RetryAfter as e:
+                error = e
+                retry_in = e.retry_after + random.uniform(0, 1)
+                logger.warning("Flood limit in chat %s: retry in %.1f s", request.chat_id, retry_in)
+            except BadRequest as e:
+                # Bad markup, chat not found etc.: retrying won't help (BadRequest is a NetworkError subclass)
+                error = e
+                logger.error("Send to %s failed: %s", request.chat_id, e)
+                self.failed += 1
+            except (TimedOut, NetworkError) as e:
+                error = e
+                retry_in = min(SEND_BACKOFF_MAX, SEND_BACKOFF_BASE * 2 ** request.attempts) * random.uniform(0.5, 1)
+                logger.warning("Send to %s failed: %s - retry in %.1f s", request.chat_id, e, retry_in)
+            except Exception as e:
+                error = e
+                logger.error("Send to %s failed: %s", request.chat_id, e)
+                self.failed += 1
+
+        if retry_in is not None and request.attempts < self.max_retries:
+            request.attempts += 1
+            self.retries += 1
+            state.queues[request.priority].appendleft(request)
+            self.depth[request.priority] += 1
+            state.blocked_until = monotonic() + retry_in
+        else:
+            if retry_in is not None:
+                logger.error("Giving up on a message to %s after %s attempts", request.chat_id, request.attempts + 1)
+                self.failed += 1
+            elif result is not None:
+                self.sent += 1
+                delay = started - request.queued_at
+                self.delays.append(delay)
+                self.max_delay = max(self.max_delay, delay)
+            if request.future.done():
+                pass
+            elif error is not None and request.raise_errors:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(result)
 
+        state.in_flight -= 1
+        now = monotonic()
+        for lane in range(len(PRIORITY_NAMES)):
+            self._schedule(request.chat_id, state, lane, now)
+        self._wakeup.set()
 
-def is_user_registered(user_id: int) -> bool:
-    """Check if user is fully registered"""
-    user_type = get_user_type(user_id)
-    if not user_type:
-        return False
+    async def close(self, timeout: float = 5.0):
+        """Let queued messages go out for up to `timeout` seconds, then stop the dispatcher"""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            return
+        deadline = monotonic() + timeout
+        while (any(self.depth) or self._in_flight) and monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._task.cancel()
+        await asyncio.gather(self._task, *self._in_flight, return_exceptions=True)
+        for state in self._chats.values():
+            for lane in state.queues:
+                for request in lane:
+                    if not request.future.done():
+                        request.future.set_result(None)
+        self._task = self._loop = None
+
+    def stats(self) -> dict:
+        if self._task is None:
+            return {'queued': dict.fromkeys(PRIORITY_NAMES, 0), 'in_flight': 0, 'sent': 0, 'retries': 0,
+                    'failed': 0, 'chats': 0, 'avg_delay_ms': 0.0, 'p95_delay_ms': 0.0, 'max_delay_ms': 0.0}
+        delays = sorted(self.delays)
+        return {
+            'queued': dict(zip(PRIORITY_NAMES, self.depth)),
+            'in_flight': len(self._in_flight),
+            'sent': self.sent,
+            'retries': self.retries,
+            'failed': self.failed,
+            'chats': len(self._chats),
+            'avg_delay_ms': sum(delays) / len(delays) * 1000 if delays else 0.0,
+            'p95_delay_ms': delays[int(len(delays) * 0.95) - 1] * 1000 if delays else 0.0,
+            'max_delay_ms': self.max_delay * 1000,
+        }
+
+
+message_scheduler = MessageScheduler(SEND_GLOBAL_RATE, SEND_CHAT_RATE, SEND_GROUP_RATE, SEND_CHAT_BURST,
+                                     SEND_MAX_RETRIES, SEND_CHAT_PARALLEL)
+
+
+# ------------------ Notification Outbox ------------------
+# kind -> query for the recipient's chat id by application id
+OUTBOX_RECIPIENTS = {
+    'new_application': """SELECT e.user_id FROM applications a
+                          JOIN employers e ON a.employer_id = e.id WHERE a.id = ?""",
+    'application_status': """SELECT s.user_id FROM applications a
+                             JOIN students s ON a.student_id = s.id WHERE a.id = ?""",
+    'application_digest': "SELECT user_id FROM employers WHERE id = ?",
+    'job_alert': "SELECT user_id FROM saved_searches WHERE id = ?",
+}
 
-    if user_type == 'student':
-        result = db_execute(
-            "SELECT id FROM students WHERE user_id = ?",
-            (user_id,), fetch=True
-        )
-    else:  # employer
-        result = db_execute(
-            "SELECT id FROM employers WHERE user_id = ?",
-            (user_id,), fetch=True
-        )
 
-    return bool(result)
+def enqueue_notification(cur, kind: str, ref_id: int, payload: dict = None) -> int:
+    """Queue a notification inside the caller's write transaction; it is rendered when delivered"""
+    return enqueue_notifications(cur, kind, [ref_id], payload)
 
 
-def get_employer_id(user_id: int) -> int:
-    """Get employer ID by user ID"""
-    result = db_execute(
-        "SELECT id FROM employers WHERE user_id = ?",
-        (user_id,), fetch=True
+def enqueue_notifications(cur, kind: str, ref_ids: list, payload: dict = None) -> int:
+    """Queue the same kind of notification for many rows with one prepared INSERT"""
+    now = datetime.now().isoformat()
+    payload = json.dumps(payload) if payload else None
+    cur.executemany(
+        f"""INSERT INTO notifications_outbox (chat_id, kind, ref_id, payload, next_attempt_at, created_at)
+            SELECT user_id, ?, ?, ?, ?, ? FROM ({OUTBOX_RECIPIENTS[kind]})""",
+        [(kind, ref_id, payload, now, now, ref_id) for ref_id in ref_ids]
     )
-    return result[0][0] if result else None
+    return cur.rowcount
 
 
-def has_student_profile(user_id: int) -> bool:
-    """Check if user has student profile"""
-    result = db_execute(
-        "SELECT id FROM students WHERE user_id = ?",
-        (user_id,), fetch=True
+def queue_new_application(cur, application_id: int) -> bool:
+    """Notify the employer about a new application now, or buffer it if they get digests.
+
+    True when the employer's buffer reached their digest size and should be flushed right away.
+    """
+    cur.execute(
+        """INSERT INTO application_digest (application_id, employer_id, created_at)
+           SELECT a.id, a.employer_id, ? FROM applications a JOIN employers e ON a.employer_id = e.id
+           WHERE a.id = ? AND e.digest_minutes > 0""",
+        (datetime.now().isoformat(), application_id)
     )
-    return bool(result)
+    if not cur.rowcount:
+        enqueue_notification(cur, 'new_application', application_id)
+        return False
+    buffered, size = cur.execute(
+        """SELECT COUNT(*), MAX(e.digest_size) FROM application_digest d JOIN employers e ON e.id = d.employer_id
+           WHERE d.employer_id = (SELECT employer_id FROM applications WHERE id = ?)""",
+        (application_id,)
+    ).fetchone()
+    return buffered >= size
+
+
+def take_due_digests(cur) -> int:
+    """Move each due buffer (interval passed, size reached or digests turned off) into one outbox row"""
+    now = datetime.now()
+    buffers = cur.execute(
+        """SELECT e.id, e.digest_minutes, e.digest_size, COUNT(*), MIN(d.created_at)
+           FROM application_digest d JOIN employers e ON e.id = d.employer_id GROUP BY e.id"""
+    ).fetchall()
+    due = [employer_id for employer_id, minutes, size, buffered, oldest in buffers
+           if buffered >= size or datetime.fromisoformat(oldest) <= now - timedelta(minutes=minutes)]
+    for employer_id in due:
+        applications = cur.execute(
+            "DELETE FROM application_digest WHERE employer_id = ? RETURNING application_id", (employer_id,)
+        ).fetchall()
+        enqueue_notification(cur, 'application_digest', employer_id,
+                             {'applications': sorted(application_id for application_id, in applications)})
+    return len(due)
+
+
+async def flush_application_digests(context: ContextTypes.DEFAULT_TYPE):
+    """JobQueue: hand due digests to the outbox"""
+    if await db.transaction(take_due_digests):
+        notification_outbox.wake()
+
+
+class NotificationOutbox:
+    """Delivers notifications_outbox rows with a pool of async workers.
+
+    A worker claims a batch of due rows (pending -> sending), sends them through the message
+    scheduler and records every outcome of the batch in one transaction. A row becomes 'sent'
+    only after Telegram accepted the message, so delivery is at-least-once: rows left in
+    'sending' by a crash go back to 'pending' at startup. Failed sends are retried with
+    exponential backoff; permanent errors and rows out of attempts are dead-lettered.
+    """
+
+    def __init__(self, workers: int, batch_size: int, max_attempts: int):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._tasks = []
+        self._wakeup = None
+        self._stopping = False
+        self.delivered = self.retried = self.dead = self.batches = 0
+        self.latencies = deque(maxlen=1000)  # created -> sent, seconds
+        self.recent = deque()  # monotonic time of each delivery in the last minute
+
+    async def start(self, bot):
+        requeued = await db.transaction(lambda cur: cur.execute(
+            "UPDATE notifications_outbox SET status = 'pending' WHERE status = 'sending'"
+        ).rowcount)
+        if requeued:
+            logger.info("Outbox: %s interrupted deliveries re-queued", requeued)
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(bot, number)) for number in range(self.workers)]
+
+    async def stop(self, timeout: float = 5.0):
+        """Let the workers finish their current batch, then cancel them"""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout) if self._tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self):
+        """Call after committing new rows so they go out without waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self, bot, number: int):
+        last_prune = 0.0
+        unrecorded = []  # outcomes whose bookkeeping failed; written before anything new is claimed
+        while not self._stopping:
+            self._wakeup.clear()
+            if unrecorded:
+                unrecorded = await self._record_batch(unrecorded)
+                if unrecorded:
+                    await asyncio.sleep(OUTBOX_POLL_INTERVAL)
+                continue
+            try:
+                rows = await db.transaction(self._claim)
+            except Exception:
+                logger.exception("Outbox claim failed")
+                rows = []
+            if rows:
+                results = await asyncio.gather(*(self._deliver(bot, row) for row in rows))
+                unrecorded = await self._record_batch(results)
+                continue
+
+            if number == 0 and monotonic() - last_prune > 3600:
+                cutoff = (datetime.now() - timedelta(days=OUTBOX_RETENTION_DAYS)).isoformat()
+                await db.execute("DELETE FROM notifications_outbox WHERE status = 'sent' AND sent_at < ?", (cutoff,))
+                last_prune = monotonic()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _claim(self, cur) -> list:
+        return cur.execute(
+            """UPDATE notifications_outbox SET status = 'sending'
+               WHERE id IN (SELECT id FROM notifications_outbox
+                            WHERE status = 'pending' AND next_attempt_at <= ?
+                            ORDER BY next_attempt_at, id LIMIT ?)
+               RETURNING id, chat_id, kind, ref_id, payload, attempts, created_at""",
+            (datetime.now().isoformat(), self.batch_size)
+        ).fetchall()
+
+    async def _deliver(self, bot, row) -> tuple:
+        """(row id, 'sent' | 'retry' | 'dead', attempts, error, created_at)"""
+        outbox_id, chat_id, kind, ref_id, payload, attempts, created_at = row
+        attempts += 1
+        try:
+            language = (await load_user_context(chat_id)).language
+            message = await NOTIFICATION_RENDERERS[kind](ref_id, json.loads(payload) if payload else {}, language)
+            if message is None:
+                return outbox_id, 'dead', attempts, "nothing to send: its subject no longer exists", created_at
+            await message_scheduler.submit(
+                chat_id, lambda: bot.send_message(chat_id=chat_id, **message), PRIORITY_NOTIFICATION, raise_errors=True
+            )
+            return outbox_id, 'sent', attempts, None, created_at
+        except (Forbidden, BadRequest) as e:
+            # Blocked bot, deleted chat, broken text: retrying won't help
+            return outbox_id, 'dead', attempts, str(e), created_at
+        except Exception as e:
+            outcome = 'retry' if attempts < self.max_attempts else 'dead'
+            return outbox_id, outcome, attempts, f"{type(e).__name__}: {e}", created_at
+
+    async def _record_batch(self, results: list) -> list:
+        """Write a batch's outcomes, then count them; returns the results again if the write failed"""
+        now = datetime.now()
+        try:
+            await db.transaction(lambda cur: self._record(cur, results, now))
+        except Exception:
+            # The rows stay 'sending' meanwhile, so nothing is claimed and sent twice
+            logger.exception("Outbox: recording %s outcomes failed, retrying", len(results))
+            return results
+        self._count(results, now)
+        return []
+
+    def _record(self, cur, results: list, now: datetime):
+        sent, retry, dead = [], [], []
+        for outbox_id, outcome, attempts, error, created_at in results:
+            if outcome == 'sent':
+                sent.append((attempts, now.isoformat(), outbox_id))
+            elif outcome == 'retry':
+                backoff = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1)
+                retry.append((attempts, (now + timedelta(seconds=backoff)).isoformat(), error, outbox_id))
+            else:
+                logger.warning("Outbox row %s dead-lettered: %s", outbox_id, error)
+                dead.append((attempts, error, outbox_id))
+        cur.executemany("UPDATE notifications_outbox SET status = 'sent', attempts = ?, sent_at = ? WHERE id = ?", sent)
+        cur.executemany("""UPDATE notifications_outbox SET status = 'pending', attempts = ?, next_attempt_at = ?,
+                           last_error = ? WHERE id = ?""", retry)
+        cur.executemany("UPDATE notifications_outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                        dead)
+
+    def _count(self, results: list, now: datetime):
+        """Stats of a recorded batch: only after its transaction committed"""
+        outcomes = [outcome for _, outcome, *_ in results]
+        for _, outcome, _, _, created_at in results:
+            if outcome == 'sent':
+                self.latencies.append((now - datetime.fromisoformat(created_at)).total_seconds())
+        self.batches += 1
+        self.delivered += outcomes.count('sent')
+        self.retried += outcomes.count('retry')
+        self.dead += outcomes.count('dead')
+        clock = monotonic()
+        self.recent.extend([clock] * outcomes.count('sent'))
+        while self.recent and self.recent[0] < clock - 60:
+            self.recent.popleft()
+
+    def stats(self) -> dict:
+        clock = monotonic()
+        while self.recent and self.recent[0] < clock - 60:
+            self.recent.popleft()
+        latencies = sorted(self.latencies)
+        return {
+            'workers': len(self._tasks),
+            'delivered': self.delivered,
+            'retried': self.retried,
+            'dead': self.dead,
+            'batches': self.batches,
+            'per_minute': len(self.recent),
+            'avg_latency_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            'p95_latency_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        }
+
+
+notification_outbox = NotificationOutbox(OUTBOX_WORKERS, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS)
 
 
 # ------------------ Async helpers ------------------
 async def safe_send_message(bot, chat_id: int = None, text: str = None, reply_markup=None,
-                            reply_to_message_id=None, parse_mode=None):
-    """Safe message sending with retry logic"""
+                            reply_to_message_id=None, parse_mode=None, priority: int = PRIORITY_INTERACTIVE):
+    """Send through the message scheduler (rate limits, retries); None if the message could not be sent"""
     if text is None:
         text = "\u200b"
 
@@ -650,18 +2691,116 @@ async def safe_send_message(bot, chat_id: int = None, text: str = None, reply_ma
     if parse_mode is not None:
         kwargs['parse_mode'] = parse_mode
 
-    try:
-        return await bot.send_message(**kwargs)
-    except (TimedOut, NetworkError, RetryAfter) as e:
-        logger.warning("send_message error: %s - retrying", e)
+    return await message_scheduler.submit(chat_id, lambda: bot.send_message(**kwargs), priority)
+
+
+async def gather_bounded(*calls, limit: int = HANDLER_CONCURRENCY) -> list:
+    """Await independent calls concurrently, at most `limit` at a time.
+
+    A failing call is logged and leaves None in its slot; the others still complete.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(call):
+        async with semaphore:
+            try:
+                return await call
+            except Exception:
+                logger.exception("Concurrent call failed")
+                return None
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+
+async def show_screen(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, reply_markup=None,
+                      parse_mode=None):
+    """Show a navigation screen in place of the one whose button was pressed.
+
+    Only the user's current screen is edited, never notifications or other messages. Nothing is sent if
+    the screen is unchanged; a new message is sent when there is nothing to edit or editing fails.
+    """
+    query = update.callback_query
+    chat_id = get_chat_id(query if query else update)
+    message = query.message if query else None
+
+    if message is not None and message.message_id == context.user_data.get("screen_message_id"):
+        if parse_mode is None and message.text == text and message.reply_markup == reply_markup:
+            return message
         try:
-            return await bot.send_message(**kwargs)
-        except Exception as e2:
-            logger.error("Second attempt failed: %s", e2)
-            return None
-    except Exception as e:
-        logger.error("Unexpected error: %s", e)
-        return None
+            return await message_scheduler.submit(chat_id, lambda: context.bot.edit_message_text(
+                chat_id=chat_id, message_id=message.message_id, text=text, reply_markup=reply_markup,
+                parse_mode=parse_mode
+            ), raise_errors=True)
+        except BadRequest as e:
+            if "not modified" in str(e):
+                return message
+            # Deleted, too old or not a text message: fall through to a new screen
+        except (TimedOut, NetworkError) as e:
+            logger.warning("Editing the screen in chat %s failed: %s - sending a new one", chat_id, e)
+
+    sent = await safe_send_message(context.bot, chat_id=chat_id, text=text, reply_markup=reply_markup,
+                                   parse_mode=parse_mode)
+    if sent is not None:
+        context.user_data["screen_message_id"] = sent.message_id
+    return sent
+
+
+def clear_flow_data(context: ContextTypes.DEFAULT_TYPE):
+    """Forget a finished flow's answers but keep the current screen, so the next button press edits it"""
+    screen_message_id = context.user_data.get("screen_message_id")
+    context.user_data.clear()
+    if screen_message_id is not None:
+        context.user_data["screen_message_id"] = screen_message_id
+
+
+def utf16_len(text: str) -> int:
+    """Length as Telegram counts it (UTF-16 code units)"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def markdown_bold(text: str) -> str:
+    """Bold in legacy Markdown; '*' can't be escaped inside an entity, so close and reopen around it"""
+    return "\\*".join(f"*{part}*" if part else "" for part in str(text).split("*"))
+
+
+async def chunk_messages(entries, header: str = "", limit: int = TELEGRAM_TEXT_LIMIT):
+    """Pack rendered entries from an async iterator into messages under the limit, breaking only between entries"""
+    text, size = header, utf16_len(header)
+    async for entry in entries:
+        entry_size = utf16_len(entry)
+        if text and size + entry_size > limit:
+            yield text
+            text, size = "", 0
+        text += entry
+        size += entry_size
+    if text:
+        yield text
+
+
+async def send_stream(bot, chat_id: int, messages, parse_mode=None, prefetch: int = 2) -> int:
+    """Send messages from an async iterator while the next ones are built; the scheduler paces them"""
+    pending = asyncio.Queue(maxsize=prefetch)
+
+    async def produce():
+        try:
+            async for text in messages:
+                await pending.put(text)
+        except Exception:
+            await pending.put(None)
+            raise
+        await pending.put(None)
+
+    producer = asyncio.create_task(produce())
+    sent = 0
+    try:
+        while (text := await pending.get()) is not None:
+            await safe_send_message(bot, chat_id=chat_id, text=text, parse_mode=parse_mode, priority=PRIORITY_BULK)
+            sent += 1
+    except BaseException:
+        producer.cancel()
+        raise
+    await producer
+    return sent
 
 
 def get_chat_id(update_or_query) -> int:
@@ -679,13 +2818,37 @@ def get_chat_id(update_or_query) -> int:
     return None
 
 
+def parse_page_cursor(data: str) -> tuple:
+    """'<prefix>:<n|p>:<created_at>:<id>' -> (direction, (created_at, id)); (None, None) for the first page"""
+    parts = data.split(":", 2)
+    if len(parts) < 3:
+        return None, None
+    created_at, row_id = parts[2].rsplit(":", 1)
+    return parts[1], (created_at, int(row_id))
+
+
+def build_page_nav(prefix: str, rows: list, has_prev: bool, has_next: bool, language: str,
+                   key=lambda row: (row[4], row[0])) -> list:
+    """Keyboard row with prev/next buttons carrying keyset cursors of the first/last row"""
+    nav = []
+    if has_prev and rows:
+        created_at, row_id = key(rows[0])
+        nav.append(InlineKeyboardButton(get_text('prev_page', language),
+                                        callback_data=f"{prefix}:p:{created_at}:{row_id}"))
+    if has_next and rows:
+        created_at, row_id = key(rows[-1])
+        nav.append(InlineKeyboardButton(get_text('next_page', language),
+                                        callback_data=f"{prefix}:n:{created_at}:{row_id}"))
+    return nav
+
+
 # ------------------ Language Change Handler ------------------
 async def callback_change_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle language change request"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
-    user_id = query.from_user.id
     chat_id = get_chat_id(query)
 
     # Show language selection
@@ -696,13 +2859,14 @@ async def callback_change_language(update: Update, context: ContextTypes.DEFAULT
     await safe_send_message(
         context.bot,
         chat_id=chat_id,
-        text=get_text('choose_language', get_user_language(user_id)),
+        text=get_text('choose_language', ctx.language),
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
 
 async def callback_set_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle language selection"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
@@ -713,23 +2877,21 @@ async def callback_set_language(update: Update, context: ContextTypes.DEFAULT_TY
     user_type = 'employer' if is_employer(user_id) else 'student'
 
     # Create or update user record
-    existing_user = db_execute(
-        "SELECT id FROM users WHERE user_id = ?",
-        (user_id,), fetch=True
-    )
-
-    if existing_user:
+    if ctx.exists:
         # Update existing user
-        db_execute(
+        await db.execute(
             "UPDATE users SET language = ? WHERE user_id = ?",
             (language_code, user_id)
         )
     else:
         # Create new user
-        db_execute(
+        await db.execute(
             "INSERT INTO users (user_id, user_type, language, created_at) VALUES (?, ?, ?, ?)",
             (user_id, user_type, language_code, datetime.now().isoformat())
         )
+        ctx.user_type = user_type
+    ctx.language = language_code
+    remember_user_context(ctx)
 
     # Send confirmation
     chat_id = get_chat_id(query)
@@ -738,7 +2900,7 @@ async def callback_set_language(update: Update, context: ContextTypes.DEFAULT_TY
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
 
     # Continue based on user type and registration status
-    if is_user_registered(user_id):
+    if ctx.is_registered:
         await show_main_menu(update, context, user_type)
     else:
         if user_type == 'student':
@@ -751,19 +2913,14 @@ async def callback_set_language(update: Update, context: ContextTypes.DEFAULT_TY
 # ------------------ Handlers ------------------
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start command with language selection"""
-    user_id = update.effective_user.id
-    context.user_data.clear()
+    ctx = await get_user_context(update, context)
+    clear_flow_data(context)
 
     # Check if user already exists
-    existing_user = db_execute(
-        "SELECT user_type, language FROM users WHERE user_id = ?",
-        (user_id,), fetch=True
-    )
-
-    if existing_user:
-        user_type, language = existing_user[0]
+    if ctx.exists:
+        user_type = ctx.user_type
         # User exists, show appropriate menu
-        if is_user_registered(user_id):
+        if ctx.is_registered:
             await show_main_menu(update, context, user_type)
             return
         else:
@@ -791,8 +2948,9 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def start_student_registration(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start student registration process"""
+    ctx = await get_user_context(update, context)
     chat_id = get_chat_id(update.callback_query if update.callback_query else update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('student_register', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -801,9 +2959,10 @@ async def start_student_registration(update: Update, context: ContextTypes.DEFAU
 
 # Student registration handlers
 async def student_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     context.user_data["student_fullname"] = update.message.text.strip()
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('enter_phone', language)
     kb = ReplyKeyboardMarkup([[KeyboardButton(get_text('share_contact', language), request_contact=True)]],
@@ -814,6 +2973,7 @@ async def student_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def student_phone(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     phone = None
     if update.message.contact:
         phone = update.message.contact.phone_number
@@ -822,7 +2982,7 @@ async def student_phone(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     context.user_data["student_phone"] = phone
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('enter_course', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -830,9 +2990,10 @@ async def student_phone(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def student_course(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     context.user_data["student_course"] = update.message.text.strip()
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('enter_major', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -840,9 +3001,10 @@ async def student_course(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def student_major(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     context.user_data["student_major"] = update.message.text.strip()
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('enter_about', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -854,24 +3016,27 @@ async def student_about(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
 
     # Save student data
-    db_execute(
+    ctx = await get_user_context(update, context)
+    ctx.student_id = await db.execute(
         """INSERT INTO students (user_id, fullname, phone, course, major, about, created_at) 
            VALUES (?, ?, ?, ?, ?, ?, ?)""",
         (user_id, context.user_data["student_fullname"], context.user_data["student_phone"],
          context.user_data["student_course"], context.user_data["student_major"],
          context.user_data["student_about"], datetime.now().isoformat())
     )
+    remember_user_context(ctx)
 
     await show_main_menu(update, context, 'student')
-    context.user_data.clear()
+    clear_flow_data(context)
     return ConversationHandler.END
 
 
 # Employer registration handlers - SIMPLIFIED VERSION
 async def start_employer_registration(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start employer registration process"""
+    ctx = await get_user_context(update, context)
     chat_id = get_chat_id(update.callback_query if update.callback_query else update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('employer_register', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -880,9 +3045,10 @@ async def start_employer_registration(update: Update, context: ContextTypes.DEFA
 
 async def employer_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle employer company name input"""
+    ctx = await get_user_context(update, context)
     context.user_data["company_name"] = update.message.text.strip()
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('company_name_saved', language)
     kb = ReplyKeyboardMarkup([[KeyboardButton(get_text('share_contact', language), request_contact=True)]],
@@ -894,6 +3060,7 @@ async def employer_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def employer_phone(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle employer phone input"""
+    ctx = await get_user_context(update, context)
     phone = None
     if update.message.contact:
         phone = update.message.contact.phone_number
@@ -903,34 +3070,36 @@ async def employer_phone(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
 
     # Save employer data
-    db_execute(
+    ctx.employer_id = await db.execute(
         """INSERT INTO employers (user_id, company_name, contact_phone, created_at) 
            VALUES (?, ?, ?, ?)""",
         (user_id, context.user_data["company_name"], phone, datetime.now().isoformat())
     )
+    remember_user_context(ctx)
 
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
 
     text = "✅ Профиль работодателя создан! Теперь вы можете создавать вакансии."
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
 
     await show_main_menu(update, context, 'employer')
-    context.user_data.clear()
+    clear_flow_data(context)
     return ConversationHandler.END
 
 
 async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, user_type: str):
     """Show main menu based on user type"""
-    chat_id = get_chat_id(update.callback_query if update.callback_query else update)
+    ctx = await get_user_context(update, context)
     user_id = update.effective_user.id if update.effective_user else update.callback_query.from_user.id
-    language = get_user_language(user_id)
+    language = ctx.language
 
     keyboard = []
 
     if user_type == 'student':
         keyboard = [
             [InlineKeyboardButton(get_text('browse_jobs', language), callback_data="browse_jobs")],
+            [InlineKeyboardButton(get_text('search_jobs', language), callback_data="search_jobs")],
+            [InlineKeyboardButton(get_text('recommended_jobs', language), callback_data="recommended_jobs")],
             [InlineKeyboardButton(get_text('my_applications', language), callback_data="my_applications")],
             [InlineKeyboardButton(get_text('profile', language), callback_data="student_profile")],
         ]
@@ -949,22 +3118,26 @@ async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, use
             [InlineKeyboardButton(get_text('my_jobs', language), callback_data="my_jobs")],
             [InlineKeyboardButton(get_text('view_applications', language), callback_data="view_applications")],
         ]
+        if ctx.employer_id is not None:
+            keyboard.append(
+                [InlineKeyboardButton(get_text('digest_settings', language), callback_data="digest_settings")])
 
         # Add student functionality for employers
-        if has_student_profile(user_id):
+        if ctx.student_id is not None:
             keyboard.append(
                 [InlineKeyboardButton(get_text('switch_to_student', language), callback_data="switch_to_student")])
         else:
             keyboard.append(
                 [InlineKeyboardButton(get_text('browse_jobs', language), callback_data="browse_jobs_as_employer")])
+            keyboard.append([InlineKeyboardButton(get_text('search_jobs', language), callback_data="search_jobs")])
 
         keyboard.append([InlineKeyboardButton(get_text('change_language', language), callback_data="change_language")])
 
         title = get_text('start_employer', language)
 
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
+    await show_screen(
+        update,
+        context,
         text=title,
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
@@ -973,12 +3146,12 @@ async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, use
 # Job creation handlers (employer side)
 async def callback_create_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start job creation process"""
-    user_id = update.callback_query.from_user.id
+    ctx = await get_user_context(update, context)
     chat_id = get_chat_id(update.callback_query)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     # Check if employer has profile
-    employer_id = get_employer_id(user_id)
+    employer_id = ctx.employer_id
 
     if not employer_id:
         # Start employer registration first
@@ -993,9 +3166,10 @@ async def callback_create_job(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 
 async def job_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     context.user_data["job_title"] = update.message.text.strip()
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('enter_job_description', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -1003,9 +3177,10 @@ async def job_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def job_description(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     context.user_data["job_description"] = update.message.text.strip()
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('enter_salary', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -1013,9 +3188,10 @@ async def job_description(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def job_salary(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     context.user_data["job_salary"] = update.message.text.strip()
     chat_id = get_chat_id(update)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = get_text('enter_requirements', language)
     await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -1023,60 +3199,120 @@ async def job_salary(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def job_requirements(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
     context.user_data["job_requirements"] = update.message.text.strip()
     user_id = update.effective_user.id
 
     # Get employer ID
-    employer_id = get_employer_id(user_id)
+    employer_id = ctx.employer_id
 
     if employer_id:
-        # Save job
-        db_execute(
-            """INSERT INTO jobs (employer_id, title, description, salary, requirements, created_at) 
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (employer_id, context.user_data["job_title"], context.user_data["job_description"],
-             context.user_data["job_salary"], context.user_data["job_requirements"],
-             datetime.now().isoformat())
+        # Save job; saved searches are matched in memory and their alerts queued in the same transaction
+        salary_min, salary_max, salary_currency, salary_period = parse_salary(context.user_data["job_salary"])
+        search_ids = match_job_alerts(
+            " ".join((context.user_data["job_title"], context.user_data["job_description"],
+                      context.user_data["job_requirements"])),
+            salary_min, salary_currency, salary_period, user_id
         )
 
+        def create_job(cur):
+            cur.execute(
+                """INSERT INTO jobs (employer_id, title, description, salary, requirements, created_at,
+                                     salary_min, salary_max, salary_currency, salary_period)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (employer_id, context.user_data["job_title"], context.user_data["job_description"],
+                 context.user_data["job_salary"], context.user_data["job_requirements"],
+                 datetime.now().isoformat(), salary_min, salary_max, salary_currency, salary_period)
+            )
+            job_id = cur.lastrowid
+            queue_job_alerts(cur, job_id, search_ids)
+            return job_id
+
+        job_id = await db.transaction(create_job)
+        job_catalog.invalidate()
+        job_matcher.add(job_id, context.user_data["job_title"], context.user_data["job_description"],
+                        context.user_data["job_requirements"])
+        if search_ids:
+            notification_outbox.wake()
+
         chat_id = get_chat_id(update)
-        language = get_user_language(chat_id)
+        language = ctx.language
 
         text = get_text('job_created', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
 
     await show_main_menu(update, context, 'employer')
-    context.user_data.clear()
+    clear_flow_data(context)
     return ConversationHandler.END
 
 
 # Job browsing and application handlers (student side)
+async def load_browse_page(context: ContextTypes.DEFAULT_TYPE, data: str) -> tuple:
+    """Browse callback data -> catalog page; '<prefix>_f:<floor>' sets the salary floor and starts over"""
+    prefix, _, value = data.partition(":")
+    if prefix.endswith("_f"):
+        context.user_data['salary_floor'] = int(value) or None
+        direction, cursor = None, None
+    else:
+        direction, cursor = parse_page_cursor(data)
+
+    floor = context.user_data.get('salary_floor')
+    jobs, has_prev, has_next = await job_catalog.page(direction, cursor, floor)
+    if not jobs and cursor:
+        # Cursor points past the current set of jobs (e.g. jobs were removed) - start over
+        jobs, has_prev, has_next = await job_catalog.page(min_salary=floor)
+    return jobs, has_prev, has_next
+
+
+def build_salary_filter_row(prefix: str, floor: int, language: str) -> list:
+    """Salary floor buttons for the browse lists; the active one is marked"""
+    row = [InlineKeyboardButton(f"{'✅ ' if value == floor else ''}≥{value // 1000}k",
+                                callback_data=f"{prefix}_f:{value}")
+           for value in SALARY_FILTERS]
+    if floor:
+        row.append(InlineKeyboardButton(get_text('any_salary', language), callback_data=f"{prefix}_f:0"))
+    return row
+
+
+def salary_floor_text(floor: int, language: str) -> str:
+    amount = f"{floor:,}".replace(",", " ")
+    return get_text('salary_from', language).format(amount=amount, currency=DEFAULT_SALARY_CURRENCY)
+
+
+def salary_filter_caption(context: ContextTypes.DEFAULT_TYPE, language: str) -> str:
+    floor = context.user_data.get('salary_floor')
+    if not floor:
+        return ""
+    return "\n" + salary_floor_text(floor, language)
+
+
 async def callback_browse_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show available jobs"""
+    ctx = await get_user_context(update, context)
     user_id = update.callback_query.from_user.id
-    chat_id = get_chat_id(update.callback_query)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     # Check if user has student profile (for applying to jobs)
-    has_profile = has_student_profile(user_id)
+    has_profile = ctx.student_id is not None
     is_employer_user = is_employer(user_id)
 
-    jobs = db_execute(
-        """SELECT j.id, j.title, e.company_name, j.salary, j.created_at 
-           FROM jobs j 
-           JOIN employers e ON j.employer_id = e.id 
-           WHERE j.is_active = 1 
-           ORDER BY j.created_at DESC""",
-        fetch=True
-    )
+    jobs, has_prev, has_next = await load_browse_page(context, update.callback_query.data)
+    floor = context.user_data.get('salary_floor')
 
     if not jobs:
-        text = get_text('no_jobs', language)
-        await safe_send_message(context.bot, chat_id=chat_id, text=text)
+        text = get_text('no_jobs', language) + salary_filter_caption(context, language)
+        reply_markup = None
+        if floor:
+            reply_markup = InlineKeyboardMarkup([
+                build_salary_filter_row("jobs_s", floor, language),
+                [InlineKeyboardButton(get_text('notify_new_jobs', language), callback_data="save_search:floor")],
+                [InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")]
+            ])
+        await show_screen(update, context, text=text, reply_markup=reply_markup)
         return
 
     # Add warning for employers browsing as students
-    text = get_text('available_jobs', language)
+    text = get_text('available_jobs', language) + salary_filter_caption(context, language)
     if is_employer_user and has_profile:
         text += f"\n\n{get_text('employer_as_student_warning', language)}"
 
@@ -1085,12 +3321,19 @@ async def callback_browse_jobs(update: Update, context: ContextTypes.DEFAULT_TYP
         button_text = f"{title} - {company}"
         keyboard.append([InlineKeyboardButton(button_text, callback_data=f"view_job:{job_id}")])
 
+    nav = build_page_nav("jobs_s", jobs, has_prev, has_next, language)
+    if nav:
+        keyboard.append(nav)
+    keyboard.append(build_salary_filter_row("jobs_s", floor, language))
+    if floor:
+        keyboard.append([InlineKeyboardButton(get_text('notify_new_jobs', language), callback_data="save_search:floor")])
+
     # Add back button
     keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
 
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
+    await show_screen(
+        update,
+        context,
         text=text,
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
@@ -1098,28 +3341,27 @@ async def callback_browse_jobs(update: Update, context: ContextTypes.DEFAULT_TYP
 
 async def callback_browse_jobs_as_employer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show available jobs for employers without student profile"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
-    user_id = query.from_user.id
-    chat_id = get_chat_id(query)
-    language = get_user_language(user_id)
-
-    jobs = db_execute(
-        """SELECT j.id, j.title, e.company_name, j.salary, j.created_at 
-           FROM jobs j 
-           JOIN employers e ON j.employer_id = e.id 
-           WHERE j.is_active = 1 
-           ORDER BY j.created_at DESC""",
-        fetch=True
-    )
+    language = ctx.language
+
+    jobs, has_prev, has_next = await load_browse_page(context, query.data)
+    floor = context.user_data.get('salary_floor')
 
     if not jobs:
-        text = get_text('no_jobs', language)
-        await safe_send_message(context.bot, chat_id=chat_id, text=text)
+        text = get_text('no_jobs', language) + salary_filter_caption(context, language)
+        reply_markup = None
+        if floor:
+            reply_markup = InlineKeyboardMarkup([
+                build_salary_filter_row("jobs_e", floor, language),
+                [InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")]
+            ])
+        await show_screen(update, context, text=text, reply_markup=reply_markup)
         return
 
-    text = get_text('available_jobs', language) + "\n\n"
+    text = get_text('available_jobs', language) + salary_filter_caption(context, language) + "\n\n"
     text += "ℹ️ Вы можете просматривать вакансии, но для подачи заявки необходимо заполнить профиль студента."
 
     keyboard = []
@@ -1127,46 +3369,65 @@ async def callback_browse_jobs_as_employer(update: Update, context: ContextTypes
         button_text = f"{title} - {company}"
         keyboard.append([InlineKeyboardButton(button_text, callback_data=f"view_job_info:{job_id}")])
 
+    nav = build_page_nav("jobs_e", jobs, has_prev, has_next, language)
+    if nav:
+        keyboard.append(nav)
+    keyboard.append(build_salary_filter_row("jobs_e", floor, language))
+
     keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
 
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
+    await show_screen(
+        update,
+        context,
         text=text,
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
 
+async def fetch_job_cards(job_ids: list) -> dict:
+    """job_id -> (title, description, salary, requirements, company_name, contact_phone), one query for all ids"""
+    if not job_ids:
+        return {}
+    rows = await db.fetch(
+        f"""SELECT j.id, j.title, j.description, j.salary, j.requirements, e.company_name, e.contact_phone
+            FROM jobs j
+            JOIN employers e ON j.employer_id = e.id
+            WHERE j.id IN ({", ".join("?" * len(job_ids))})""",
+        list(job_ids)
+    )
+    return {row[0]: row[1:] for row in rows}
+
+
+def format_job_card(job: tuple, language: str) -> str:
+    """Job details as Markdown, shared by the job views and inline results"""
+    title, description, salary, requirements, company, phone = job
+    text = f"{markdown_bold(title)}\n\n{escape_markdown(company)}\n\n{escape_markdown(description)}\n\n"
+    if salary:
+        text += f"💵 {get_text('salary', language)}: {escape_markdown(salary)}\n"
+    if requirements:
+        text += f"📋 {get_text('requirements', language)}: {escape_markdown(requirements)}\n"
+    text += f"📞 {get_text('contact', language)}: {escape_markdown(phone)}"
+    return text
+
+
 async def callback_view_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show job details for users with student profile"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     job_id = int(query.data.split(":")[1])
     user_id = query.from_user.id
 
-    job = db_execute(
-        """SELECT j.title, j.description, j.salary, j.requirements, e.company_name, e.contact_phone
-           FROM jobs j 
-           JOIN employers e ON j.employer_id = e.id 
-           WHERE j.id = ?""",
-        (job_id,), fetch=True
-    )
+    job = (await fetch_job_cards([job_id])).get(job_id)
 
     if job:
-        title, description, salary, requirements, company, phone = job[0]
-        chat_id = get_chat_id(query)
-        language = get_user_language(user_id)
+        language = ctx.language
 
         is_employer_user = is_employer(user_id)
-        has_profile = has_student_profile(user_id)
+        has_profile = ctx.student_id is not None
 
-        text = f"**{title}**\n\n{company}\n\n{description}\n\n"
-        if salary:
-            text += f"💵 {get_text('salary', language)}: {salary}\n"
-        if requirements:
-            text += f"📋 {get_text('requirements', language)}: {requirements}\n"
-        text += f"📞 {get_text('contact', language)}: {phone}"
+        text = format_job_card(job, language)
 
         # Add warning for employers
         if is_employer_user:
@@ -1182,9 +3443,9 @@ async def callback_view_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="browse_jobs")])
 
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
+        await show_screen(
+            update,
+            context,
             text=text,
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode="Markdown"
@@ -1193,31 +3454,17 @@ async def callback_view_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def callback_view_job_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show job details for employers without student profile (view only)"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     job_id = int(query.data.split(":")[1])
-    user_id = query.from_user.id
-    chat_id = get_chat_id(query)
-    language = get_user_language(user_id)
-
-    job = db_execute(
-        """SELECT j.title, j.description, j.salary, j.requirements, e.company_name, e.contact_phone
-           FROM jobs j 
-           JOIN employers e ON j.employer_id = e.id 
-           WHERE j.id = ?""",
-        (job_id,), fetch=True
-    )
+    language = ctx.language
 
-    if job:
-        title, description, salary, requirements, company, phone = job[0]
+    job = (await fetch_job_cards([job_id])).get(job_id)
 
-        text = f"**{title}**\n\n{company}\n\n{description}\n\n"
-        if salary:
-            text += f"💵 {get_text('salary', language)}: {salary}\n"
-        if requirements:
-            text += f"📋 {get_text('requirements', language)}: {requirements}\n"
-        text += f"📞 {get_text('contact', language)}: {phone}\n\n"
+    if job:
+        text = format_job_card(job, language) + "\n\n"
         text += "ℹ️ Для подачи заявки на эту вакансию необходимо заполнить профиль студента."
 
         keyboard = [
@@ -1225,9 +3472,9 @@ async def callback_view_job_info(update: Update, context: ContextTypes.DEFAULT_T
             [InlineKeyboardButton(get_text('back', language), callback_data="browse_jobs_as_employer")]
         ]
 
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
+        await show_screen(
+            update,
+            context,
             text=text,
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode="Markdown"
@@ -1236,64 +3483,63 @@ async def callback_view_job_info(update: Update, context: ContextTypes.DEFAULT_T
 
 async def callback_apply_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Apply for a job"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     job_id = int(query.data.split(":")[1])
     user_id = query.from_user.id
 
-    # Get student ID
-    student = db_execute(
-        "SELECT id FROM students WHERE user_id = ?", (user_id,), fetch=True
-    )
+    student_id = ctx.student_id
+    replies = []
 
-    if student:
-        student_id = student[0][0]
+    if student_id:
 
         # Check if already applied
-        existing = db_execute(
+        existing = await db.fetch(
             "SELECT id FROM applications WHERE job_id = ? AND student_id = ?",
-            (job_id, student_id), fetch=True
+            (job_id, student_id)
         )
 
         chat_id = get_chat_id(query)
-        language = get_user_language(user_id)
+        language = ctx.language
 
         if existing:
             text = get_text('already_applied', language)
-            await safe_send_message(context.bot, chat_id=chat_id, text=text)
         else:
-            # Create application
-            db_execute(
-                """INSERT INTO applications (job_id, student_id, applied_at, status) 
-                   VALUES (?, ?, ?, ?)""",
-                (job_id, student_id, datetime.now().isoformat(), ApplicationStatus.PENDING.value)
-            )
+            # Create application and the employer's notification (or digest entry) atomically
+            def create_application(cur):
+                cur.execute(
+                    """INSERT INTO applications (job_id, student_id, employer_id, applied_at, status) 
+                       SELECT id, ?, employer_id, ?, ? FROM jobs WHERE id = ?""",
+                    (student_id, datetime.now().isoformat(), ApplicationStatus.PENDING.value, job_id)
+                )
+                return cur.rowcount and queue_new_application(cur, cur.lastrowid)
+
+            if await db.transaction(create_application):
+                context.job_queue.run_once(flush_application_digests, 0)
+            notification_outbox.wake()
 
             text = get_text('application_submitted', language)
-            await safe_send_message(context.bot, chat_id=chat_id, text=text)
-
-            # Notify employer
-            await notify_employer_about_application(context, job_id, student_id)
+        replies.append(safe_send_message(context.bot, chat_id=chat_id, text=text))
 
-    await show_main_menu(update, context, 'student' if not is_employer(user_id) else 'employer')
+    # The confirmation and the menu don't depend on each other
+    await gather_bounded(*replies, show_main_menu(update, context, 'student' if not is_employer(user_id) else 'employer'))
 
 
-async def notify_employer_about_application(context: ContextTypes.DEFAULT_TYPE, job_id: int, student_id: int):
-    """Notify employer about new application"""
-    application_data = db_execute(
-        """SELECT s.fullname, s.course, s.major, s.about, s.phone, j.title, e.user_id
+async def render_new_application(application_id: int, payload: dict, language: str) -> dict:
+    """Outbox 'new_application': the employer's notice about a new application"""
+    application_data = await db.fetch(
+        """SELECT s.fullname, s.course, s.major, s.about, s.phone, j.title
            FROM applications a
            JOIN students s ON a.student_id = s.id
            JOIN jobs j ON a.job_id = j.id
-           JOIN employers e ON j.employer_id = e.id
-           WHERE a.job_id = ? AND a.student_id = ?""",
-        (job_id, student_id), fetch=True
+           WHERE a.id = ?""",
+        (application_id,)
     )
 
     if application_data:
-        fullname, course, major, about, phone, job_title, employer_user_id = application_data[0]
-        language = get_user_language(employer_user_id)
+        fullname, course, major, about, phone, job_title = application_data[0]
 
         text = (
             f"📨 {get_text('new_application', language)}\n\n"
@@ -1304,49 +3550,473 @@ async def notify_employer_about_application(context: ContextTypes.DEFAULT_TYPE,
             f"💼 {get_text('job', language)}: {job_title}\n"
             f"📝 {get_text('about_student', language)}: {about}"
         )
-
-        await safe_send_message(context.bot, chat_id=employer_user_id, text=text)
+        return {'text': text}
+    return None
 
 
-# ------------------ Student Applications and Profile Handlers ------------------
-async def callback_my_applications(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Show student's applications"""
-    query = update.callback_query
+async def render_application_status(application_id: int, payload: dict, language: str) -> dict:
+    """Outbox 'application_status': tell the student their application was accepted or rejected"""
+    application = await db.fetchone(
+        """SELECT j.title, e.company_name
+           FROM applications a
+           JOIN jobs j ON a.job_id = j.id
+           JOIN employers e ON j.employer_id = e.id
+           WHERE a.id = ?""",
+        (application_id,)
+    )
+    if application is None:
+        return None
+    job_title, company_name = application
+    key = 'application_accepted' if payload['status'] == ApplicationStatus.ACCEPTED.value else 'application_rejected'
+    return {'text': get_text(key, language).format(job=job_title, company=company_name)}
+
+
+async def render_application_digest(employer_id: int, payload: dict, language: str) -> dict:
+    """Outbox 'application_digest': the buffered applications in one message, grouped by job"""
+    applications = await db.fetch(
+        """SELECT a.job_id, j.title, s.fullname, s.course, s.major
+           FROM applications a
+           JOIN students s ON a.student_id = s.id
+           JOIN jobs j ON a.job_id = j.id
+           WHERE a.id IN (SELECT value FROM json_each(?))
+           ORDER BY a.job_id, a.applied_at""",
+        (json.dumps(payload['applications']),)
+    )
+    if not applications:
+        return None
+
+    text = get_text('digest_title', language).format(count=len(applications))
+    size = utf16_len(text)
+    limit = TELEGRAM_TEXT_LIMIT - 100  # room for the "...and N more" line
+    shown, previous_job = 0, None
+    for job_id, job_title, fullname, course, major in applications:
+        entry = f"\n👤 {fullname} — {major}, {course}"
+        if job_id != previous_job:
+            entry = f"\n\n💼 {job_title}{entry}"
+        if size + utf16_len(entry) > limit:
+            break
+        text += entry
+        size += utf16_len(entry)
+        shown, previous_job = shown + 1, job_id
+    if shown < len(applications):
+        text += "\n\n" + get_text('digest_more', language).format(count=len(applications) - shown)
+
+    keyboard = [[InlineKeyboardButton(get_text('view_applications', language), callback_data="view_applications")]]
+    return {'text': text, 'reply_markup': InlineKeyboardMarkup(keyboard)}
+
+
+async def render_job_alert(search_id: int, payload: dict, language: str) -> dict:
+    """Outbox 'job_alert': a new job matching the user's saved search"""
+    search = await db.fetchone("SELECT user_id, query, min_salary FROM saved_searches WHERE id = ?", (search_id,))
+    if search is None:
+        return None  # the search was deleted before the alert went out
+    user_id, query_text, min_salary = search
+    job_id = payload['job_id']
+    job = (await fetch_job_cards([job_id])).get(job_id)
+    if job is None:
+        return None
+    ctx = await load_user_context(user_id)
+
+    label = saved_search_label(query_text, min_salary, language)
+    text = f"{escape_markdown(get_text('search_alert', language).format(label=label))}\n\n{format_job_card(job, language)}"
+    view = "view_job" if ctx.student_id is not None or not is_employer(user_id) else "view_job_info"
+    keyboard = [
+        [InlineKeyboardButton(f"{job[0]} - {job[4]}", callback_data=f"{view}:{job_id}")],
+        [InlineKeyboardButton(get_text('my_searches_button', language), callback_data="my_searches")],
+    ]
+    return {'text': text, 'reply_markup': InlineKeyboardMarkup(keyboard), 'parse_mode': "Markdown"}
+
+
+# Outbox kind -> async (ref_id, payload, language) -> send_message kwargs, or None if moot
+NOTIFICATION_RENDERERS = {
+    'new_application': render_new_application,
+    'application_status': render_application_status,
+    'application_digest': render_application_digest,
+    'job_alert': render_job_alert,
+}
+
+
+# ------------------ Job Search ------------------
+def search_terms(text: str, limit: int = SEARCH_MAX_TERMS) -> list:
+    """Lowercased words of a query or job text, as the search matches them"""
+    return re.findall(r"\w+", text.lower())[:limit]
+
+
+def build_fts_query(text: str) -> str:
+    """User input -> FTS5 MATCH expression of quoted terms (implicit AND); '' if nothing to search"""
+    return " ".join(f'"{term}"' for term in search_terms(text))
+
+
+async def search_jobs(text: str, offset: int = 0, limit: int = JOBS_PAGE_SIZE) -> tuple:
+    """(rows, has_next, capped) of active jobs matching the text, best bm25 score first.
+
+    Only the newest SEARCH_RANK_WINDOW matches are ranked: ranking every match of a common word costs over
+    100 ms on 100k jobs, and bm25's own per-term IDF pass is what's left. The trade-off is that an older,
+    better match of a common word is not found; `capped` says the window cut matches off, so the screen
+    can suggest a narrower query. Rare words have fewer matches than the window and are ranked in full.
+    """
+    match = build_fts_query(text)
+    if not match:
+        return [], False, False
+    rows = await db.fetch(
+        """SELECT j.id, j.title, e.company_name, j.salary, j.created_at,
+                  (SELECT 1 FROM jobs_fts WHERE jobs_fts MATCH ?1
+                   ORDER BY rowid DESC LIMIT 1 OFFSET ?2) AS capped
+           FROM (SELECT rowid, bm25(jobs_fts, 10.0, 1.0, 3.0) AS score FROM jobs_fts
+                 WHERE jobs_fts MATCH ?1
+                   AND rowid >= coalesce((SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?1
+                                          ORDER BY rowid DESC LIMIT 1 OFFSET ?2), 0)
+                 ORDER BY score LIMIT ?3 OFFSET ?4) f
+           JOIN jobs j ON j.id = f.rowid
+           JOIN employers e ON j.employer_id = e.id
+           WHERE j.is_active = 1 ORDER BY f.score""",
+        (match, SEARCH_RANK_WINDOW - 1, limit + 1, offset)
+    )
+    capped = bool(rows and rows[0][5])
+    return [row[:5] for row in rows[:limit]], len(rows) > limit, capped
+
+
+async def show_search_results(update: Update, context: ContextTypes.DEFAULT_TYPE, offset: int = 0):
+    """Render one page of results for the query kept in user_data"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
+    query_text = context.user_data.get('search_query', "")
+
+    jobs, has_next, capped = await search_jobs(query_text, offset)
+    keyboard = []
+    if jobs:
+        text = get_text('search_results', language).format(query=query_text)
+        if capped:
+            text += "\n\n" + get_text('search_capped', language).format(count=SEARCH_RANK_WINDOW)
+        # Students open the full card with "apply", employers without a student profile the read-only one
+        view = "view_job" if ctx.student_id is not None or not is_employer(ctx.user_id) else "view_job_info"
+        for job_id, title, company, salary, created_at in jobs:
+            keyboard.append([InlineKeyboardButton(f"{title} - {company}", callback_data=f"{view}:{job_id}")])
+
+        nav = []
+        if offset > 0:
+            nav.append(InlineKeyboardButton(get_text('prev_page', language),
+                                            callback_data=f"search:{max(offset - JOBS_PAGE_SIZE, 0)}"))
+        if has_next:
+            nav.append(InlineKeyboardButton(get_text('next_page', language),
+                                            callback_data=f"search:{offset + JOBS_PAGE_SIZE}"))
+        if nav:
+            keyboard.append(nav)
+    else:
+        text = get_text('search_no_results', language).format(query=query_text)
+
+    if search_terms(query_text):
+        keyboard.append([InlineKeyboardButton(get_text('save_search', language), callback_data="save_search:query")])
+    keyboard.append([InlineKeyboardButton(get_text('new_search', language), callback_data="search_jobs")])
+    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
+
+    await show_screen(
+        update,
+        context,
+        text=text,
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+
+async def cmd_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/search <terms> shows results right away; bare /search asks for keywords"""
+    ctx = await get_user_context(update, context)
+    if not context.args:
+        await safe_send_message(context.bot, chat_id=get_chat_id(update), text=get_text('search_prompt', ctx.language))
+        return SEARCH_QUERY
+
+    context.user_data['search_query'] = " ".join(context.args)
+    await show_search_results(update, context)
+    return ConversationHandler.END
+
+
+async def callback_search_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Search button: ask for keywords"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
     await query.answer()
 
-    user_id = query.from_user.id
-    chat_id = get_chat_id(query)
-    language = get_user_language(user_id)
+    await safe_send_message(context.bot, chat_id=get_chat_id(query), text=get_text('search_prompt', ctx.language))
+    return SEARCH_QUERY
+
+
+async def search_query_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Keywords typed after the prompt"""
+    context.user_data['search_query'] = update.message.text.strip()
+    await show_search_results(update, context)
+    return ConversationHandler.END
+
+
+async def callback_search_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Next/previous page of search results"""
+    query = update.callback_query
+    await query.answer()
+
+    offset = int(query.data.split(":")[1])
+    await show_search_results(update, context, offset)
+
+
+def saved_search_label(query: str, min_salary: int, language: str) -> str:
+    parts = [f"«{query}»"] if query else []
+    if min_salary:
+        parts.append(salary_floor_text(min_salary, language))
+    return " · ".join(parts)
+
+
+async def save_search(update: Update, context: ContextTypes.DEFAULT_TYPE, query_text: str, min_salary: int = None):
+    """Store a saved search and confirm it with salary floor buttons"""
+    ctx = await get_user_context(update, context)
+    chat_id = get_chat_id(update.callback_query if update.callback_query else update)
+    language = ctx.language
+
+    query_text = " ".join(search_terms(query_text))
+    if not query_text and not min_salary:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('saved_search_empty', language))
+        return
+    count = await db.fetchone("SELECT COUNT(*) FROM saved_searches WHERE user_id = ?", (ctx.user_id,))
+    if count[0] >= MAX_SAVED_SEARCHES:
+        text = get_text('saved_search_limit', language).format(limit=MAX_SAVED_SEARCHES)
+        await safe_send_message(context.bot, chat_id=chat_id, text=text)
+        return
 
-    # Get student ID
-    student = db_execute(
-        "SELECT id FROM students WHERE user_id = ?", (user_id,), fetch=True
+    search_id = await db.execute(
+        "INSERT INTO saved_searches (user_id, query, min_salary, created_at) VALUES (?, ?, ?, ?)",
+        (ctx.user_id, query_text, min_salary, datetime.now().isoformat())
     )
+    saved_search_index.add(search_id, ctx.user_id, query_text, min_salary)
+    await show_saved_search(context, chat_id, language, search_id, query_text, min_salary)
 
-    if not student:
+
+async def show_saved_search(context: ContextTypes.DEFAULT_TYPE, chat_id: int, language: str,
+                            search_id: int, query_text: str, min_salary: int):
+    text = get_text('search_saved', language).format(label=saved_search_label(query_text, min_salary, language))
+    keyboard = [
+        build_salary_filter_row(f"saved_{search_id}", min_salary, language),
+        [InlineKeyboardButton(get_text('my_searches_button', language), callback_data="my_searches")],
+        [InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")],
+    ]
+    await safe_send_message(context.bot, chat_id=chat_id, text=text, reply_markup=InlineKeyboardMarkup(keyboard))
+
+
+async def cmd_save_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/save_search <keywords>: get new matching jobs as messages"""
+    ctx = await get_user_context(update, context)
+    if not context.args:
+        await safe_send_message(context.bot, chat_id=get_chat_id(update),
+                                text=get_text('save_search_usage', ctx.language))
+        return
+    await save_search(update, context, " ".join(context.args))
+
+
+async def callback_save_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Save the current search results' keywords, or the browse list's salary floor"""
+    query = update.callback_query
+    await query.answer()
+
+    if query.data == "save_search:query":
+        await save_search(update, context, context.user_data.get('search_query', ""))
+    else:
+        await save_search(update, context, "", context.user_data.get('salary_floor'))
+
+
+async def callback_saved_search_floor(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Salary floor button under a saved search: saved_<id>_f:<floor>"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+
+    prefix, _, value = query.data.partition(":")
+    search_id = int(prefix.split("_")[1])
+    min_salary = int(value) or None
+    language = ctx.language
+
+    search = await db.fetchone("SELECT query FROM saved_searches WHERE id = ? AND user_id = ?", (search_id, ctx.user_id))
+    if not search:
+        await callback_my_searches(update, context)
+        return
+    if not search[0] and not min_salary:
+        await safe_send_message(context.bot, chat_id=get_chat_id(query), text=get_text('saved_search_empty', language))
+        return
+
+    await db.execute("UPDATE saved_searches SET min_salary = ? WHERE id = ?", (min_salary, search_id))
+    saved_search_index.add(search_id, ctx.user_id, search[0], min_salary)
+    await show_saved_search(context, get_chat_id(query), language, search_id, search[0], min_salary)
+
+
+async def show_my_searches(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    ctx = await get_user_context(update, context)
+    chat_id = get_chat_id(update.callback_query if update.callback_query else update)
+    language = ctx.language
+
+    searches = await db.fetch(
+        "SELECT id, query, min_salary FROM saved_searches WHERE user_id = ? ORDER BY id", (ctx.user_id,)
+    )
+    if not searches:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('no_saved_searches', language))
+        return
+
+    keyboard = [[InlineKeyboardButton(f"🗑 {saved_search_label(query_text, min_salary, language)}",
+                                      callback_data=f"del_search:{search_id}")]
+                for search_id, query_text, min_salary in searches]
+    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
+    await show_screen(update, context, text=get_text('my_searches', language),
+                      reply_markup=InlineKeyboardMarkup(keyboard))
+
+
+async def cmd_my_searches(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_my_searches(update, context)
+
+
+async def callback_my_searches(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.callback_query.answer()
+    await show_my_searches(update, context)
+
+
+async def callback_delete_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Remove a saved search and show the rest"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+
+    search_id = int(query.data.split(":")[1])
+    await db.execute("DELETE FROM saved_searches WHERE id = ? AND user_id = ?", (search_id, ctx.user_id))
+    saved_search_index.remove(search_id, ctx.user_id)
+    await show_my_searches(update, context)
+
+
+# user_id -> id of the user's latest inline query, for debouncing keystrokes
+inline_pending = {}
+
+
+async def build_inline_results(normalized: str, language: str, offset: int) -> tuple:
+    """(results, next_offset) for one inline answer: ranked matches, or the newest jobs for an empty query"""
+    if normalized:
+        jobs, has_next, _ = await search_jobs(normalized, offset, INLINE_PAGE_SIZE)
+    else:
+        jobs, _, _ = await job_catalog.page()
+        has_next = False
+
+    cards = await fetch_job_cards([row[0] for row in jobs])
+    results = []
+    for job_id, title, company, salary, created_at in jobs:
+        job = cards.get(job_id)
+        if job is None:
+            continue
+        results.append(InlineQueryResultArticle(
+            id=str(job_id),
+            title=title,
+            description=f"{company} · {salary}" if salary else company,
+            input_message_content=InputTextMessageContent(format_job_card(job, language), parse_mode="Markdown")
+        ))
+    return results, str(offset + INLINE_PAGE_SIZE) if has_next else ""
+
+
+async def inline_query_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """@bot <keywords> in any chat: job cards from the search index"""
+    ctx = await get_user_context(update, context)
+    inline_query = update.inline_query
+    user_id = inline_query.from_user.id
+
+    # Inline mode is open to anyone: strangers get their Telegram client language when we support it
+    language = ctx.language
+    if not ctx.exists and inline_query.from_user.language_code in LANGUAGES:
+        language = inline_query.from_user.language_code
+
+    normalized = " ".join(re.findall(r"\w+", inline_query.query.lower())[:SEARCH_MAX_TERMS])
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    key = (normalized, language, offset, job_catalog.version)
+
+    cached = inline_results_cache.get(key)
+    if cached is None:
+        # Queries arrive on every keystroke: only the latest one after a pause reaches the DB
+        inline_pending[user_id] = inline_query.id
+        await asyncio.sleep(INLINE_DEBOUNCE)
+        if inline_pending.get(user_id) != inline_query.id:
+            return
+        del inline_pending[user_id]
+        cached = await build_inline_results(normalized, language, offset)
+        inline_results_cache.set(key, cached)
+
+    results, next_offset = cached
+    try:
+        await inline_query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=True, next_offset=next_offset)
+    except Exception as e:
+        logger.warning("answer_inline_query failed: %s", e)
+
+
+async def callback_recommended_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Active jobs ranked by fit with the student's major, course and about"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+
+    language = ctx.language
+
+    if ctx.student_id is None:
         text = "Сначала заполните профиль студента."
-        await safe_send_message(context.bot, chat_id=chat_id, text=text)
+        keyboard = [[InlineKeyboardButton("📝 Заполнить профиль", callback_data="start_student_registration")]]
+        await show_screen(update, context, text=text, reply_markup=InlineKeyboardMarkup(keyboard))
         return
 
-    student_id = student[0][0]
+    student = await db.fetch("SELECT course, major, about FROM students WHERE id = ?", (ctx.student_id,))
+    applied = await db.fetch("SELECT job_id FROM applications WHERE student_id = ?", (ctx.student_id,))
+
+    # Scoring holds the matcher lock for a few ms of NumPy work - keep it off the event loop
+    matches = await asyncio.get_running_loop().run_in_executor(
+        None, job_matcher.recommend, student_fields(*student[0]), RECOMMEND_LIMIT, {row[0] for row in applied}
+    )
+    cards = await fetch_job_cards([job_id for job_id, score in matches])
+
+    keyboard = []
+    for job_id, score in matches:
+        if job_id in cards:
+            title, description, salary, requirements, company, phone = cards[job_id]
+            keyboard.append([InlineKeyboardButton(f"{title} - {company}", callback_data=f"view_job:{job_id}")])
+    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
+
+    text = get_text('recommended_title' if len(keyboard) > 1 else 'no_recommendations', language)
+    await show_screen(
+        update,
+        context,
+        text=text,
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+
+# ------------------ Student Applications and Profile Handlers ------------------
+async def callback_my_applications(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show student's applications"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+
+    chat_id = get_chat_id(query)
+    language = ctx.language
+
+    student_id = ctx.student_id
+
+    if not student_id:
+        text = "Сначала заполните профиль студента."
+        await safe_send_message(context.bot, chat_id=chat_id, text=text)
+        return
 
     # Get applications
-    applications = db_execute(
+    applications = await db.fetch(
         """SELECT a.id, j.title, e.company_name, a.status, a.applied_at
            FROM applications a
            JOIN jobs j ON a.job_id = j.id
            JOIN employers e ON j.employer_id = e.id
            WHERE a.student_id = ?
            ORDER BY a.applied_at DESC""",
-        (student_id,), fetch=True
+        (student_id,)
     )
 
     if not applications:
         text = get_text('no_applications', language)
         keyboard = [[InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")]]
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
+        await show_screen(
+            update,
+            context,
             text=text,
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
@@ -1364,9 +4034,9 @@ async def callback_my_applications(update: Update, context: ContextTypes.DEFAULT
 
     keyboard = [[InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")]]
 
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
+    await show_screen(
+        update,
+        context,
         text=text,
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode="Markdown"
@@ -1375,25 +4045,25 @@ async def callback_my_applications(update: Update, context: ContextTypes.DEFAULT
 
 async def callback_student_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show student profile"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     user_id = query.from_user.id
-    chat_id = get_chat_id(query)
-    language = get_user_language(user_id)
+    language = ctx.language
 
     # Get student data
-    student = db_execute(
+    student = await db.fetch(
         "SELECT fullname, phone, course, major, about FROM students WHERE user_id = ?",
-        (user_id,), fetch=True
+        (user_id,)
     )
 
     if not student:
         text = "Сначала заполните профиль студента."
         keyboard = [[InlineKeyboardButton("📝 Заполнить профиль", callback_data="start_student_registration")]]
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
+        await show_screen(
+            update,
+            context,
             text=text,
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
@@ -1414,9 +4084,9 @@ async def callback_student_profile(update: Update, context: ContextTypes.DEFAULT
         [InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")]
     ]
 
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
+    await show_screen(
+        update,
+        context,
         text=text,
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
@@ -1424,11 +4094,12 @@ async def callback_student_profile(update: Update, context: ContextTypes.DEFAULT
 
 async def callback_edit_student_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start student profile editing"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     chat_id = get_chat_id(query)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
     text = "Редактирование профиля временно недоступно. Для изменения данных обратитесь к администратору."
     keyboard = [[InlineKeyboardButton(get_text('back', language), callback_data="student_profile")]]
@@ -1442,83 +4113,298 @@ async def callback_edit_student_profile(update: Update, context: ContextTypes.DE
 
 
 # Application management (employer side)
-async def callback_view_applications(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Show applications to employer"""
-    user_id = update.callback_query.from_user.id
+# Filter values cycled by the filter buttons; None means "all"
+APPLICATION_STATUS_FILTERS = [None] + [status.value for status in ApplicationStatus]
+APPLICATION_PERIOD_FILTERS = [None, 1, 7, 30]
+
+
+def get_application_filters(context: ContextTypes.DEFAULT_TYPE) -> dict:
+    """Employer's current application list filters (status, job_id, days) and order, kept in user_data"""
+    return context.user_data.setdefault("app_filters", {'status': None, 'job_id': None, 'days': None, 'sort': 'recent'})
+
+
+def build_application_filter_sql(employer_id: int, filters: dict) -> tuple:
+    where = ["a.employer_id = ?"]
+    params = [employer_id]
+    if filters['job_id']:
+        where.append("a.job_id = ?")
+        params.append(filters['job_id'])
+    if filters['status']:
+        where.append("a.status = ?")
+        params.append(filters['status'])
+    if filters['days']:
+        where.append("a.applied_at >= ?")
+        params.append((datetime.now() - timedelta(days=filters['days'])).isoformat())
+    return where, params
+
+
+async def fetch_applications_page(employer_id: int, filters: dict, direction: str = None,
+                                  cursor: tuple = None) -> tuple:
+    """(rows, has_prev, has_next) of (id, fullname, job_title, status, applied_at), keyset on (applied_at, id)"""
+    where, params = build_application_filter_sql(employer_id, filters)
+    order = "DESC"
+    if direction == 'n':
+        where.append("(a.applied_at, a.id) < (?, ?)")
+        params.extend(cursor)
+    elif direction == 'p':
+        where.append("(a.applied_at, a.id) > (?, ?)")
+        params.extend(cursor)
+        order = "ASC"
+
+    rows = await db.fetch(
+        f"""SELECT a.id, s.fullname, j.title, a.status, a.applied_at
+            FROM applications a
+            JOIN students s ON a.student_id = s.id
+            JOIN jobs j ON a.job_id = j.id
+            WHERE {" AND ".join(where)}
+            ORDER BY a.applied_at {order}, a.id {order}
+            LIMIT ?""",
+        (*params, APPS_PAGE_SIZE + 1)
+    )
+    more = len(rows) > APPS_PAGE_SIZE
+    rows = rows[:APPS_PAGE_SIZE]
+    if direction == 'p':
+        return rows[::-1], more, True
+    return rows, direction == 'n', more
+
+
+async def count_applications(employer_id: int, filters: dict) -> dict:
+    """status -> count for the current filters, from an index-only aggregate"""
+    where, params = build_application_filter_sql(employer_id, {**filters, 'status': None})
+    rows = await db.fetch(
+        f"SELECT a.status, COUNT(*) FROM applications a WHERE {' AND '.join(where)} GROUP BY a.status",
+        params
+    )
+    return dict(rows)
+
+
+async def rank_applications(employer_id: int, filters: dict) -> list:
+    """All applications to the filtered job as (id, fullname, job_title, status, applied_at), best fit first"""
+    where, params = build_application_filter_sql(employer_id, filters)
+    rows = await db.fetch(
+        f"""SELECT a.id, s.fullname, j.title, a.status, a.applied_at, s.id, s.course, s.major, s.about
+            FROM applications a
+            JOIN students s ON a.student_id = s.id
+            JOIN jobs j ON a.job_id = j.id
+            WHERE {" AND ".join(where)}
+            ORDER BY a.applied_at DESC, a.id DESC""",
+        params
+    )
+    job_id = filters['job_id']
+    version = fit_job_versions.get(job_id, 0)
+    scores = {}
+    missing = {}
+    for row in rows:
+        score = fit_score_cache.get((job_id, version, row[5]))
+        if score is None:
+            missing[row[5]] = student_fields(*row[6:9])
+        else:
+            scores[row[5]] = score
+
+    if missing:
+        job = await db.fetchone("SELECT title, description, requirements FROM jobs WHERE id = ?", (job_id,))
+        fresh = await asyncio.get_running_loop().run_in_executor(
+            None, job_matcher.score_profiles, job_fields(*job), list(missing.values())
+        )
+        for student_id, score in zip(missing, fresh.tolist()):
+            scores[student_id] = score
+            fit_score_cache.set((job_id, version, student_id), score)
+
+    # sorted() is stable: equally good applicants stay newest first
+    return [row[:5] for row in sorted(rows, key=lambda row: -scores[row[5]])]
+
 
-    employer_id = get_employer_id(user_id)
+async def show_applications_page(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                 direction: str = None, cursor: tuple = None, offset: int = 0):
+    """Render one page of the employer's applications with filter buttons and a status summary.
+
+    A single job's applicants can be ordered by profile fit; those pages go by offset (apps_r:<offset>).
+    """
+    ctx = await get_user_context(update, context)
+    chat_id = get_chat_id(update.callback_query)
+    language = ctx.language
+
+    employer_id = ctx.employer_id
     if not employer_id:
-        chat_id = get_chat_id(update.callback_query)
-        language = get_user_language(chat_id)
         text = get_text('no_employer_profile', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    applications = db_execute(
-        """SELECT a.id, s.fullname, j.title, a.status, a.applied_at
-           FROM applications a
-           JOIN students s ON a.student_id = s.id
-           JOIN jobs j ON a.job_id = j.id
-           WHERE j.employer_id = ?
-           ORDER BY a.applied_at DESC""",
-        (employer_id,), fetch=True
-    )
+    filters = get_application_filters(context)
+    ranked = filters['job_id'] and filters['sort'] == 'fit'
+    selected = context.user_data.get("app_selected")  # set of ids while selecting, else None
+    context.user_data["apps_page"] = (direction, cursor, offset)
+    if ranked:
+        ordered = await rank_applications(employer_id, filters)
+        if offset >= len(ordered):
+            offset = 0
+        applications = ordered[offset:offset + APPS_PAGE_SIZE]
+        has_prev, has_next = offset > 0, offset + APPS_PAGE_SIZE < len(ordered)
+    else:
+        applications, has_prev, has_next = await fetch_applications_page(employer_id, filters, direction, cursor)
+        if not applications and cursor:
+            applications, has_prev, has_next = await fetch_applications_page(employer_id, filters)
+    counts = await count_applications(employer_id, filters)
 
-    chat_id = get_chat_id(update.callback_query)
-    language = get_user_language(chat_id)
+    back_data = f"view_my_job:{filters['job_id']}" if filters['job_id'] else "back_to_main"
 
-    if not applications:
+    if not counts:
         text = get_text('no_applications', language)
-        keyboard = [[InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")]]
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
+        keyboard = [[InlineKeyboardButton(get_text('back', language), callback_data=back_data)]]
+        if filters['status'] or filters['days']:
+            keyboard.insert(0, [InlineKeyboardButton(get_text('clear_filters', language), callback_data="apps_f:clear")])
+        await show_screen(
+            update,
+            context,
             text=text,
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
         return
 
+    text = get_text('your_applications', language)
+    if filters['job_id'] and applications:
+        text += f"\n💼 {applications[0][2]}"
+    summary = " · ".join(f"{get_text(f'status_{status}', language)}: {count}" for status, count in counts.items())
+    text += f"\n\n{summary}\n{get_text('total', language)}: {sum(counts.values())}"
+
     keyboard = []
     for app_id, fullname, job_title, status, applied_at in applications:
         status_text = get_text(f'status_{status}', language)
-        button_text = f"{fullname} - {job_title} ({status_text})"
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"review_application:{app_id}")])
+        if filters['job_id']:
+            button_text = f"{fullname} - {status_text}"
+        else:
+            button_text = f"{fullname} - {job_title} ({status_text})"
+        if selected is not None and status == ApplicationStatus.PENDING.value:
+            # Selection mode: pending applications toggle instead of opening
+            mark = "☑️" if app_id in selected else "⬜"
+            keyboard.append([InlineKeyboardButton(f"{mark} {button_text}", callback_data=f"apps_sel:{app_id}")])
+        else:
+            keyboard.append([InlineKeyboardButton(button_text, callback_data=f"review_application:{app_id}")])
+
+    if ranked:
+        nav = []
+        if has_prev:
+            nav.append(InlineKeyboardButton(get_text('prev_page', language),
+                                            callback_data=f"apps_r:{max(offset - APPS_PAGE_SIZE, 0)}"))
+        if has_next:
+            nav.append(InlineKeyboardButton(get_text('next_page', language),
+                                            callback_data=f"apps_r:{offset + APPS_PAGE_SIZE}"))
+    else:
+        nav = build_page_nav("apps", applications, has_prev, has_next, language)
+    if nav:
+        keyboard.append(nav)
+
+    status_value = get_text(f"status_{filters['status']}", language) if filters['status'] else get_text('filter_all', language)
+    period_value = (get_text('period_days', language).format(days=filters['days']) if filters['days']
+                    else get_text('filter_all', language))
+    keyboard.append([
+        InlineKeyboardButton(get_text('filter_status', language).format(value=status_value),
+                             callback_data="apps_f:status"),
+        InlineKeyboardButton(get_text('filter_period', language).format(value=period_value),
+                             callback_data="apps_f:days"),
+    ])
+    if filters['job_id']:
+        keyboard.append([InlineKeyboardButton(
+            get_text('sort_order', language).format(value=get_text(f"sort_{filters['sort']}", language)),
+            callback_data="apps_f:sort"
+        )])
+    if filters['status'] or filters['days']:
+        keyboard.append([InlineKeyboardButton(get_text('clear_filters', language), callback_data="apps_f:clear")])
+
+    if selected is not None:
+        if selected:
+            keyboard.append([
+                InlineKeyboardButton(get_text('accept_selected', language).format(count=len(selected)),
+                                     callback_data="apps_bulk_ok:accept"),
+                InlineKeyboardButton(get_text('reject_selected', language).format(count=len(selected)),
+                                     callback_data="apps_bulk_ok:reject"),
+            ])
+        keyboard.append([InlineKeyboardButton(get_text('cancel_selection', language), callback_data="apps_sel:off")])
+    elif counts.get(ApplicationStatus.PENDING.value):
+        keyboard.append([InlineKeyboardButton(get_text('select_applications', language), callback_data="apps_sel:on")])
+        bulk = [InlineKeyboardButton(get_text('reject_older', language), callback_data="apps_bulk:old")]
+        if filters['job_id']:
+            bulk.insert(0, InlineKeyboardButton(get_text('reject_all_pending', language),
+                                                callback_data="apps_bulk:pending"))
+        keyboard.append(bulk)
 
     # Add back button
-    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
+    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data=back_data)])
 
-    text = get_text('your_applications', language)
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
+    await show_screen(
+        update,
+        context,
         text=text,
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
 
+async def callback_view_applications(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show applications to employer"""
+    if update.callback_query.data == "view_applications":
+        # Opened from the main menu: start without filters
+        context.user_data["app_filters"] = {'status': None, 'job_id': None, 'days': None, 'sort': 'recent'}
+    context.user_data.pop("app_selected", None)
+    await show_applications_page(update, context)
+
+
+async def callback_applications_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Next/previous page of the application list"""
+    query = update.callback_query
+    await query.answer()
+
+    if query.data.startswith("apps_r:"):
+        await show_applications_page(update, context, offset=int(query.data.split(":")[1]))
+        return
+    direction, cursor = parse_page_cursor(query.data)
+    await show_applications_page(update, context, direction, cursor)
+
+
+async def callback_applications_filter(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cycle the status/period filter, switch the order or clear all filters"""
+    query = update.callback_query
+    await query.answer()
+
+    action = query.data.split(":")[1]
+    filters = get_application_filters(context)
+    if action == 'status':
+        index = APPLICATION_STATUS_FILTERS.index(filters['status'])
+        filters['status'] = APPLICATION_STATUS_FILTERS[(index + 1) % len(APPLICATION_STATUS_FILTERS)]
+    elif action == 'days':
+        index = APPLICATION_PERIOD_FILTERS.index(filters['days'])
+        filters['days'] = APPLICATION_PERIOD_FILTERS[(index + 1) % len(APPLICATION_PERIOD_FILTERS)]
+    elif action == 'sort':
+        filters['sort'] = 'recent' if filters['sort'] == 'fit' else 'fit'
+    else:
+        # The job filter stays: it defines which list the employer is looking at
+        filters.update(status=None, days=None)
+
+    await show_applications_page(update, context)
+
+
 async def callback_review_application(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show application details to employer"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     application_id = int(query.data.split(":")[1])
 
-    application = db_execute(
+    application = await db.fetch(
         """SELECT a.id, s.fullname, s.course, s.major, s.about, s.phone, 
                   j.title, a.status, a.applied_at, a.student_id
            FROM applications a
            JOIN students s ON a.student_id = s.id
            JOIN jobs j ON a.job_id = j.id
            WHERE a.id = ?""",
-        (application_id,), fetch=True
+        (application_id,)
     )
 
     if application:
         (app_id, fullname, course, major, about, phone,
          job_title, status, applied_at, student_id) = application[0]
 
-        chat_id = get_chat_id(query)
-        language = get_user_language(chat_id)
+        language = ctx.language
 
         status_text = get_text(f'status_{status}', language)
         applied_date = datetime.fromisoformat(applied_at).strftime("%Y-%m-%d %H:%M")
@@ -1545,11 +4431,11 @@ async def callback_review_application(update: Update, context: ContextTypes.DEFA
             ])
 
         keyboard.append([InlineKeyboardButton(get_text('back', language),
-                                              callback_data="view_applications")])
+                                              callback_data="apps_back")])
 
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
+        await show_screen(
+            update,
+            context,
             text=text,
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
@@ -1567,58 +4453,151 @@ async def callback_reject_application(update: Update, context: ContextTypes.DEFA
 
 async def update_application_status(update: Update, context: ContextTypes.DEFAULT_TYPE, status: ApplicationStatus):
     """Update application status and notify student"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     application_id = int(query.data.split(":")[1])
 
-    # Update application status
-    db_execute(
-        "UPDATE applications SET status = ?, reviewed_at = ? WHERE id = ?",
-        (status.value, datetime.now().isoformat(), application_id)
-    )
-
-    # Get application details for notification
-    application = db_execute(
-        """SELECT s.user_id, j.title, e.company_name
-           FROM applications a
-           JOIN students s ON a.student_id = s.id
-           JOIN jobs j ON a.job_id = j.id
-           JOIN employers e ON j.employer_id = e.id
-           WHERE a.id = ?""",
-        (application_id,), fetch=True
-    )
+    # Update application status and queue the student's notification in the same transaction
+    updated = await db.transaction(lambda cur: set_pending_status(
+        cur, ctx.employer_id, status, "id = ?", [application_id]
+    ))
+    notification_outbox.wake()
 
     chat_id = get_chat_id(query)
-    language = get_user_language(chat_id)
+    language = ctx.language
 
-    if application:
-        student_user_id, job_title, company_name = application[0]
-        student_language = get_user_language(student_user_id)
-
-        # Notify employer
+    replies = []
+    if updated:
+        # Confirm to the employer; the student is notified by the outbox
         status_text = get_text(f'status_{status.value}', language)
         employer_text = get_text('application_updated', language).format(status=status_text)
-        await safe_send_message(context.bot, chat_id=chat_id, text=employer_text)
+        replies.append(safe_send_message(context.bot, chat_id=chat_id, text=employer_text))
+
+    await gather_bounded(*replies, callback_view_applications(update, context))
+
+
+def bulk_condition(context: ContextTypes.DEFAULT_TYPE, action: str) -> tuple:
+    """(SQL condition, params) picking the applications a bulk action applies to.
+
+    accept/reject: the selected ones; pending: all pending for the filtered job;
+    old:<days>: pending ones older than that, within the filtered job if there is one.
+    """
+    if action in ('accept', 'reject'):
+        return "id IN (SELECT value FROM json_each(?))", [json.dumps(sorted(context.user_data.get("app_selected") or ()))]
+    filters = get_application_filters(context)
+    conditions, params = [], []
+    if filters['job_id']:
+        conditions.append("job_id = ?")
+        params.append(filters['job_id'])
+    if action.startswith("old:"):
+        conditions.append("applied_at < ?")
+        params.append((datetime.now() - timedelta(days=int(action.split(":")[1]))).isoformat())
+    elif not filters['job_id']:
+        conditions.append("0")  # "all pending" only exists for a single job
+    return " AND ".join(conditions) or "1", params
+
+
+async def count_pending(employer_id: int, condition: str, params: list) -> int:
+    row = await db.fetchone(
+        f"SELECT COUNT(*) FROM applications WHERE employer_id = ? AND status = ? AND {condition}",
+        (employer_id, ApplicationStatus.PENDING.value, *params)
+    )
+    return row[0]
 
-        # Notify student
-        if status == ApplicationStatus.ACCEPTED:
-            student_text = get_text('application_accepted', student_language).format(
-                job=job_title, company=company_name
-            )
-        else:
-            student_text = get_text('application_rejected', student_language).format(
-                job=job_title, company=company_name
-            )
 
-        await safe_send_message(context.bot, chat_id=student_user_id, text=student_text)
+def set_pending_status(cur, employer_id: int, status: ApplicationStatus, condition: str, params: list) -> int:
+    """One UPDATE over the employer's matching pending applications and the students' notifications"""
+    updated = cur.execute(
+        f"""UPDATE applications SET status = ?, reviewed_at = ?
+            WHERE employer_id = ? AND status = ? AND {condition} RETURNING id""",
+        (status.value, datetime.now().isoformat(), employer_id, ApplicationStatus.PENDING.value, *params)
+    ).fetchall()
+    enqueue_notifications(cur, 'application_status', [application_id for application_id, in updated],
+                          {'status': status.value})
+    return len(updated)
+
 
-    await callback_view_applications(update, context)
+async def callback_applications_select(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """apps_sel:on / apps_sel:off toggle selection mode, apps_sel:<id> (un)selects an application"""
+    query = update.callback_query
+    await query.answer()
+
+    action = query.data.split(":")[1]
+    if action == 'on':
+        context.user_data["app_selected"] = set()
+    elif action == 'off':
+        context.user_data.pop("app_selected", None)
+    else:
+        selected = context.user_data.setdefault("app_selected", set())
+        selected.symmetric_difference_update({int(action)})
+    await show_applications_page(update, context, *context.user_data.get("apps_page", ()))
+
+
+async def callback_applications_bulk(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Confirmation for rejecting all pending applications of a job, or the pending ones older than N days"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+
+    chat_id = get_chat_id(query)
+    language = ctx.language
+    if not ctx.employer_id:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('no_employer_profile', language))
+        return
+
+    keyboard = []
+    if query.data == "apps_bulk:pending":
+        condition, params = bulk_condition(context, 'pending')
+        count = await count_pending(ctx.employer_id, condition, params)
+        text = get_text('bulk_reject_confirm', language).format(count=count)
+        if count:
+            keyboard.append([InlineKeyboardButton(get_text('confirm_yes', language), callback_data="apps_bulk_ok:pending")])
+    else:
+        text = get_text('reject_older_prompt', language)
+        for days in BULK_REJECT_AGE_DAYS:
+            condition, params = bulk_condition(context, f"old:{days}")
+            count = await count_pending(ctx.employer_id, condition, params)
+            if count:
+                keyboard.append([InlineKeyboardButton(
+                    get_text('reject_older_days', language).format(days=days, count=count),
+                    callback_data=f"apps_bulk_ok:old:{days}"
+                )])
+    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="apps_back")])
+    await show_screen(update, context, text=text, reply_markup=InlineKeyboardMarkup(keyboard))
+
+
+async def callback_applications_bulk_apply(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Run a bulk accept/reject as one set-based UPDATE; students are notified through the outbox"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+
+    chat_id = get_chat_id(query)
+    language = ctx.language
+    if not ctx.employer_id:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('no_employer_profile', language))
+        return
+
+    action = query.data.split(":", 1)[1]
+    status = ApplicationStatus.ACCEPTED if action == 'accept' else ApplicationStatus.REJECTED
+    condition, params = bulk_condition(context, action)
+    updated = await db.transaction(lambda cur: set_pending_status(cur, ctx.employer_id, status, condition, params))
+    notification_outbox.wake()
+    context.user_data.pop("app_selected", None)
+
+    await gather_bounded(
+        safe_send_message(context.bot, chat_id=chat_id, text=get_text('bulk_updated', language).format(count=updated)),
+        show_applications_page(update, context),
+    )
 
 
 # ------------------ My Jobs Handlers (Employer) ------------------
 async def callback_my_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show employer's jobs via callback (button click)"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     query = update.callback_query
     await query.answer()
 
@@ -1626,32 +4605,28 @@ async def callback_my_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = get_chat_id(query)
 
     if not is_employer(user_id):
-        language = get_user_language(user_id)
         text = get_text('admin_only', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    employer_id = get_employer_id(user_id)
+    employer_id = ctx.employer_id
     if not employer_id:
-        language = get_user_language(user_id)
         text = get_text('no_employer_profile', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    jobs = db_execute(
+    jobs = await db.fetch(
         """SELECT id, title, description, salary, requirements, created_at, is_active
            FROM jobs WHERE employer_id = ? ORDER BY created_at DESC""",
-        (employer_id,), fetch=True
+        (employer_id,)
     )
 
-    language = get_user_language(user_id)
-
     if not jobs:
         text = get_text('no_jobs', language)
         keyboard = [[InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")]]
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
+        await show_screen(
+            update,
+            context,
             text=text,
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
@@ -1675,9 +4650,9 @@ async def callback_my_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Добавляем кнопку "Назад"
     keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
 
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
+    await show_screen(
+        update,
+        context,
         text=text,
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode="Markdown"
@@ -1686,26 +4661,26 @@ async def callback_my_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def callback_view_my_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show details of employer's specific job"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     query = update.callback_query
     await query.answer()
 
     job_id = int(query.data.split(":")[1])
     user_id = query.from_user.id
 
-    job = db_execute(
+    job = await db.fetch(
         """SELECT title, description, salary, requirements, created_at, is_active
            FROM jobs WHERE id = ? AND employer_id = (SELECT id FROM employers WHERE user_id = ?)""",
-        (job_id, user_id), fetch=True
+        (job_id, user_id)
     )
 
     if not job:
-        language = get_user_language(user_id)
         await safe_send_message(context.bot, chat_id=get_chat_id(query),
                                 text="❌ Вакансия не найдена")
         return
 
     title, description, salary, requirements, created_at, is_active = job[0]
-    language = get_user_language(user_id)
     created = datetime.fromisoformat(created_at).strftime("%d.%m.%Y %H:%M")
     status = "✅ " + (
         "Активна" if language == 'ru' else "Active" if language == 'en' else "Белсенді") if is_active else "❌ " + (
@@ -1722,10 +4697,10 @@ async def callback_view_my_job(update: Update, context: ContextTypes.DEFAULT_TYP
         text += f"**{get_text('requirements', language)}:** {requirements}\n\n"
 
     # Получаем количество заявок на эту вакансию
-    applications_count = db_execute(
+    applications_count = (await db.fetch(
         "SELECT COUNT(*) FROM applications WHERE job_id = ?",
-        (job_id,), fetch=True
-    )[0][0]
+        (job_id,)
+    ))[0][0]
 
     text += f"📨 {get_text('application', language)}: {applications_count}"
 
@@ -1743,9 +4718,9 @@ async def callback_view_my_job(update: Update, context: ContextTypes.DEFAULT_TYP
         [InlineKeyboardButton(get_text('back', language), callback_data="my_jobs")]
     ]
 
-    await safe_send_message(
-        context.bot,
-        chat_id=get_chat_id(query),
+    await show_screen(
+        update,
+        context,
         text=text,
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode="Markdown"
@@ -1761,54 +4736,25 @@ async def callback_view_job_applications(update: Update, context: ContextTypes.D
     user_id = query.from_user.id
 
     # Проверяем, что вакансия принадлежит работодателю
-    job_owner = db_execute(
+    job_owner = await db.fetch(
         "SELECT employer_id FROM jobs WHERE id = ? AND employer_id = (SELECT id FROM employers WHERE user_id = ?)",
-        (job_id, user_id), fetch=True
+        (job_id, user_id)
     )
 
     if not job_owner:
-        language = get_user_language(user_id)
         await safe_send_message(context.bot, chat_id=get_chat_id(query),
                                 text="❌ Доступ запрещен")
         return
 
-    applications = db_execute(
-        """SELECT a.id, s.fullname, j.title, a.status, a.applied_at
-           FROM applications a
-           JOIN students s ON a.student_id = s.id
-           JOIN jobs j ON a.job_id = j.id
-           WHERE j.id = ?
-           ORDER BY a.applied_at DESC""",
-        (job_id,), fetch=True
-    )
-
-    chat_id = get_chat_id(query)
-    language = get_user_language(user_id)
-
-    if not applications:
-        text = get_text('no_applications', language)
-        await safe_send_message(context.bot, chat_id=chat_id, text=text)
-        return
-
-    keyboard = []
-    for app_id, fullname, job_title, status, applied_at in applications:
-        status_text = get_text(f'status_{status}', language)
-        button_text = f"{fullname} - {status_text}"
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"review_application:{app_id}")])
-
-    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data=f"view_my_job:{job_id}")])
-
-    text = get_text('your_applications', language) + f" ({len(applications)})"
-    await safe_send_message(
-        context.bot,
-        chat_id=chat_id,
-        text=text,
-        reply_markup=InlineKeyboardMarkup(keyboard)
-    )
+    context.user_data["app_filters"] = {'status': None, 'job_id': job_id, 'days': None, 'sort': 'recent'}
+    context.user_data.pop("app_selected", None)
+    await show_applications_page(update, context)
 
 
 async def callback_toggle_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Activate/deactivate job"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     query = update.callback_query
     await query.answer()
 
@@ -1819,59 +4765,126 @@ async def callback_toggle_job(update: Update, context: ContextTypes.DEFAULT_TYPE
     user_id = query.from_user.id
 
     # Проверяем владение вакансией
-    job_owner = db_execute(
+    job_owner = await db.fetch(
         "SELECT id FROM jobs WHERE id = ? AND employer_id = (SELECT id FROM employers WHERE user_id = ?)",
-        (job_id, user_id), fetch=True
+        (job_id, user_id)
     )
 
     if not job_owner:
-        language = get_user_language(user_id)
         await safe_send_message(context.bot, chat_id=get_chat_id(query),
                                 text="❌ Доступ запрещен")
         return
 
     is_active = 1 if action == 'activate' else 0
-    db_execute(
+    await db.execute(
         "UPDATE jobs SET is_active = ? WHERE id = ?",
         (is_active, job_id)
     )
+    job_catalog.invalidate()
+    invalidate_job_scores(job_id)
+    if is_active:
+        title, description, salary, requirements, company, phone = (await fetch_job_cards([job_id]))[job_id]
+        job_matcher.add(job_id, title, description, requirements)
+    else:
+        job_matcher.remove(job_id)
 
-    language = get_user_language(user_id)
     status_text = ("активирована" if action == 'activate' else "деактивирована") if language == 'ru' else \
         ("activated" if action == 'activate' else "deactivated") if language == 'en' else \
             ("белсендірілді" if action == 'activate' else "өшірілді")
 
-    await safe_send_message(
-        context.bot,
-        chat_id=get_chat_id(query),
-        text=f"✅ Вакансия {status_text}"
+    # Подтверждение и возврат к просмотру вакансии параллельно
+    await gather_bounded(
+        safe_send_message(context.bot, chat_id=get_chat_id(query), text=f"✅ Вакансия {status_text}"),
+        callback_view_my_job(update, context),
     )
 
-    # Возвращаемся к просмотру вакансии
-    await callback_view_my_job(update, context)
-
 
 async def callback_back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Return to main menu"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
-    user_id = query.from_user.id
-    user_type = get_user_type(user_id)
+    user_type = ctx.user_type
     await show_main_menu(update, context, user_type)
 
 
+def digest_interval_text(minutes: int, language: str) -> str:
+    if minutes % 60:
+        return get_text('digest_minutes', language).format(count=minutes)
+    return get_text('digest_hours', language).format(count=minutes // 60)
+
+
+async def show_digest_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Instant notifications or a digest: interval and size buttons, the current choice ticked"""
+    ctx = await get_user_context(update, context)
+    chat_id = get_chat_id(update.callback_query if update.callback_query else update)
+    language = ctx.language
+
+    if ctx.employer_id is None:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('no_employer_profile', language))
+        return
+
+    minutes, size = await db.fetchone("SELECT digest_minutes, digest_size FROM employers WHERE id = ?",
+                                      (ctx.employer_id,))
+    if minutes:
+        mode = get_text('digest_every', language).format(interval=digest_interval_text(minutes, language), size=size)
+    else:
+        mode = get_text('digest_instant', language)
+
+    def mark(label, selected):
+        return f"✅ {label}" if selected else label
+
+    keyboard = [
+        [InlineKeyboardButton(mark(get_text('digest_instant', language) if not option
+                                   else digest_interval_text(option, language), option == minutes),
+                              callback_data=f"digest_set:m:{option}") for option in DIGEST_INTERVALS],
+    ]
+    if minutes:
+        keyboard.append([InlineKeyboardButton(mark(get_text('digest_size_button', language).format(size=option),
+                                                   option == size),
+                                              callback_data=f"digest_set:n:{option}") for option in DIGEST_SIZES])
+    keyboard.append([InlineKeyboardButton(get_text('back', language), callback_data="back_to_main")])
+    await show_screen(update, context, text=get_text('digest_menu', language).format(mode=mode),
+                      reply_markup=InlineKeyboardMarkup(keyboard))
+
+
+async def cmd_digest(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_digest_settings(update, context)
+
+
+async def callback_digest_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.callback_query.answer()
+    await show_digest_settings(update, context)
+
+
+async def callback_digest_set(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """digest_set:m:<minutes> or digest_set:n:<size>"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+
+    _, field, value = query.data.split(":")
+    value = int(value)
+    if ctx.employer_id is not None and value in (DIGEST_INTERVALS if field == 'm' else DIGEST_SIZES):
+        column = 'digest_minutes' if field == 'm' else 'digest_size'
+        await db.execute(f"UPDATE employers SET {column} = ? WHERE id = ?", (value, ctx.employer_id))
+        # A shorter interval or smaller size may make the buffer due now
+        context.job_queue.run_once(flush_application_digests, 0)
+    await show_digest_settings(update, context)
+
+
 # ------------------ Mode Switching Handlers ------------------
 async def callback_switch_to_student(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Switch employer to student mode"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
-    user_id = query.from_user.id
     chat_id = get_chat_id(query)
-    language = get_user_language(user_id)
+    language = ctx.language
 
-    if has_student_profile(user_id):
+    if ctx.student_id is not None:
         await show_main_menu(update, context, 'student')
     else:
         text = "Для использования режима студента необходимо заполнить профиль студента."
@@ -1890,12 +4903,13 @@ async def callback_switch_to_student(update: Update, context: ContextTypes.DEFAU
 
 async def callback_switch_to_employer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Switch student to employer mode"""
+    ctx = await get_user_context(update, context)
     query = update.callback_query
     await query.answer()
 
     user_id = query.from_user.id
     chat_id = get_chat_id(query)
-    language = get_user_language(user_id)
+    language = ctx.language
 
     if is_employer(user_id):
         await show_main_menu(update, context, 'employer')
@@ -1907,16 +4921,16 @@ async def callback_switch_to_employer(update: Update, context: ContextTypes.DEFA
 # ------------------ Admin Commands ------------------
 async def cmd_help_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show admin help commands"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     user_id = update.effective_user.id
     chat_id = get_chat_id(update)
 
     if not is_employer(user_id):
-        language = get_user_language(user_id)
         text = get_text('admin_only', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    language = get_user_language(user_id)
     text = get_text('help_admin_text', language)
 
     await safe_send_message(
@@ -1929,30 +4943,28 @@ async def cmd_help_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cmd_my_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show employer's jobs"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     user_id = update.effective_user.id
     chat_id = get_chat_id(update)
 
     if not is_employer(user_id):
-        language = get_user_language(user_id)
         text = get_text('admin_only', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    employer_id = get_employer_id(user_id)
+    employer_id = ctx.employer_id
     if not employer_id:
-        language = get_user_language(user_id)
         text = get_text('no_employer_profile', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    jobs = db_execute(
+    jobs = await db.fetch(
         """SELECT id, title, description, salary, requirements, created_at, is_active
            FROM jobs WHERE employer_id = ? ORDER BY created_at DESC""",
-        (employer_id,), fetch=True
+        (employer_id,)
     )
 
-    language = get_user_language(user_id)
-
     if not jobs:
         text = get_text('no_jobs', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -1976,80 +4988,222 @@ async def cmd_my_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+async def fetch_students_page(direction: str = None, cursor: tuple = None,
+                              limit: int = STUDENTS_PAGE_SIZE) -> tuple:
+    """(rows, has_prev, has_next) of (id, fullname, phone, course, major, about, created_at), keyset on (created_at, id)"""
+    where, params, order = "", [], "DESC"
+    if direction == 'n':
+        where, params = "WHERE (created_at, id) < (?, ?)", list(cursor)
+    elif direction == 'p':
+        where, params, order = "WHERE (created_at, id) > (?, ?)", list(cursor), "ASC"
+
+    rows = await db.fetch(
+        f"""SELECT id, fullname, phone, course, major, about, created_at
+            FROM students {where}
+            ORDER BY created_at {order}, id {order}
+            LIMIT ?""",
+        (*params, limit + 1)
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == 'p':
+        return rows[::-1], more, True
+    return rows, direction == 'n', more
+
+
+async def iter_students(batch_size: int = STUDENTS_BATCH_SIZE):
+    """All students newest first, holding only one keyset batch in memory"""
+    direction, cursor = None, None
+    while True:
+        rows, _, has_next = await fetch_students_page(direction, cursor, batch_size)
+        for row in rows:
+            yield row
+        if not has_next:
+            return
+        direction, cursor = 'n', (rows[-1][6], rows[-1][0])
+
+
+def format_student_entry(row) -> str:
+    """One student as a self-contained Markdown block"""
+    student_id, fullname, phone, course, major, about, created_at = row
+    created = datetime.fromisoformat(created_at).strftime("%d.%m.%Y")
+    text = f"👤 {markdown_bold(fullname)}\n"
+    text += f"   📞 {escape_markdown(str(phone))}\n"
+    text += f"   🎓 {escape_markdown(str(course))} курс, {escape_markdown(str(major))}\n"
+    text += f"   📅 Зарегистрирован: {created}\n"
+    if about:
+        if len(about) > STUDENT_ABOUT_PREVIEW:
+            about = about[:STUDENT_ABOUT_PREVIEW].rstrip() + "…"
+        text += f"   📝 {escape_markdown(about)}\n"
+    return text + "\n"
+
+
+async def show_students_page(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                             direction: str = None, cursor: tuple = None):
+    """One page of students with prev/next buttons, trimmed to fit a single message"""
+    ctx = await get_user_context(update, context)
+    chat_id = get_chat_id(update)
+    language = ctx.language
+
+    rows, has_prev, has_next = await fetch_students_page(direction, cursor)
+    if not rows and cursor:
+        rows, has_prev, has_next = await fetch_students_page()
+    if not rows:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('no_students', language))
+        return
+
+    total = (await db.fetch("SELECT COUNT(*) FROM students"))[0][0]
+    text = f"{get_text('students_list', language)}\n{get_text('total', language)}: {total}\n\n"
+    size = utf16_len(text)
+    shown = 0
+    for row in rows:
+        entry = format_student_entry(row)
+        if shown and size + utf16_len(entry) > TELEGRAM_TEXT_LIMIT:
+            break
+        text += entry
+        size += utf16_len(entry)
+        shown += 1
+    if shown < len(rows):
+        rows, has_next = rows[:shown], True
+
+    nav = build_page_nav("students", rows, has_prev, has_next, language, key=lambda row: (row[6], row[0]))
+    await show_screen(
+        update,
+        context,
+        text=text,
+        reply_markup=InlineKeyboardMarkup([nav]) if nav else None,
+        parse_mode="Markdown"
+    )
+
+
 async def cmd_list_students(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """List all students"""
+    """List all students: streamed in chunks, or page by page with '/list_students page'"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     user_id = update.effective_user.id
     chat_id = get_chat_id(update)
 
     if not is_employer(user_id):
-        language = get_user_language(user_id)
         text = get_text('admin_only', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    students = db_execute(
-        """SELECT s.fullname, s.phone, s.course, s.major, s.about, s.created_at
-           FROM students s ORDER BY s.created_at DESC""",
-        fetch=True
+    if context.args and context.args[0].lower() == "page":
+        await show_students_page(update, context)
+        return
+
+    if not await db.fetch("SELECT 1 FROM students LIMIT 1"):
+        text = get_text('no_students', language)
+        await safe_send_message(context.bot, chat_id=chat_id, text=text)
+        return
+
+    header = f"{get_text('students_list', language)}\n{escape_markdown(get_text('students_page_hint', language))}\n\n"
+    entries = (format_student_entry(row) async for row in iter_students())
+    # Long lists take a while at the per-chat send rate, so don't hold up other updates
+    context.application.create_task(
+        send_stream(context.bot, chat_id, chunk_messages(entries, header), parse_mode="Markdown"),
+        update=update
     )
 
-    language = get_user_language(user_id)
 
-    if not students:
-        text = get_text('no_students', language)
+async def callback_students_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Next/previous page of the student list"""
+    query = update.callback_query
+    await query.answer()
+
+    if not is_employer(query.from_user.id):
+        return
+
+    direction, cursor = parse_page_cursor(query.data)
+    await show_students_page(update, context, direction, cursor)
+
+
+async def cmd_db_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show DB writer queue depth and wait times"""
+    ctx = await get_user_context(update, context)
+    user_id = update.effective_user.id
+    chat_id = get_chat_id(update)
+
+    if not is_employer(user_id):
+        language = ctx.language
+        text = get_text('admin_only', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    text = get_text('students_list', language) + "\n\n"
-    for fullname, phone, course, major, about, created_at in students:
-        created = datetime.fromisoformat(created_at).strftime("%d.%m.%Y")
-        text += f"👤 *{fullname}*\n"
-        text += f"   📞 {phone}\n"
-        text += f"   🎓 {course} курс, {major}\n"
-        text += f"   📅 Зарегистрирован: {created}\n"
-        if about:
-            text += f"   📝 {about}\n"
-        text += "\n"
-
-    # Split long messages
-    if len(text) > 4096:
-        parts = [text[i:i + 4096] for i in range(0, len(text), 4096)]
-        for part in parts:
-            await safe_send_message(
-                context.bot,
-                chat_id=chat_id,
-                text=part,
-                parse_mode="Markdown"
-            )
-    else:
-        await safe_send_message(
-            context.bot,
-            chat_id=chat_id,
-            text=text,
-            parse_mode="Markdown"
-        )
+    stats = db_writer.stats()
+    cache = user_profile_cache.stats()
+    catalog = job_catalog.stats()
+    inline = inline_results_cache.stats()
+    fit = fit_score_cache.stats()
+    searches = saved_search_index.stats()
+    sends = message_scheduler.stats()
+    outbox = notification_outbox.stats()
+    outbox_rows = dict(await db.fetch("SELECT status, COUNT(*) FROM notifications_outbox GROUP BY status"))
+    text = (
+        "🗄 DB writer\n\n"
+        f"queue_depth: {stats['queue_depth']}\n"
+        f"writes: {stats['writes']} (failed: {stats['failed']})\n"
+        f"groups: {stats['groups']}, avg size: {stats['avg_group_size']:.1f}\n"
+        f"wait: avg {stats['avg_wait_ms']:.2f} ms, max {stats['max_wait_ms']:.2f} ms\n"
+        f"readers: {db.readers}\n\n"
+        "👤 Profile cache\n\n"
+        f"size: {cache['size']} / {cache['maxsize']}\n"
+        f"hits: {cache['hits']}, misses: {cache['misses']} ({cache['hit_rate']:.0%} hit rate)\n"
+        f"evictions: {cache['evictions']}, expired: {cache['expirations']}\n\n"
+        "💼 Jobs catalog\n\n"
+        f"version: {catalog['version']}, cached pages: {catalog['cached_pages']} (hits: {catalog['hits']})\n"
+        f"page loads: {catalog['page_loads']}, last load: {catalog['last_load_ms']:.1f} ms\n\n"
+        "🔎 Inline results cache\n\n"
+        f"size: {inline['size']} / {inline['maxsize']}\n"
+        f"hits: {inline['hits']}, misses: {inline['misses']} ({inline['hit_rate']:.0%} hit rate)\n\n"
+        "🎯 Applicant fit scores\n\n"
+        f"size: {fit['size']} / {fit['maxsize']}\n"
+        f"hits: {fit['hits']}, misses: {fit['misses']} ({fit['hit_rate']:.0%} hit rate)\n\n"
+        "🔔 Saved searches\n\n"
+        f"searches: {searches['searches']} (salary only: {searches['salary_only']}), terms: {searches['terms']}\n\n"
+        "📤 Message scheduler\n\n"
+        f"queued: {', '.join(f'{lane} {depth}' for lane, depth in sends['queued'].items())}, "
+        f"in flight: {sends['in_flight']}\n"
+        f"sent: {sends['sent']}, retries: {sends['retries']}, failed: {sends['failed']}, chats: {sends['chats']}\n"
+        f"delay: avg {sends['avg_delay_ms']:.0f} ms, p95 {sends['p95_delay_ms']:.0f} ms, max {sends['max_delay_ms']:.0f} ms\n\n"
+        "📬 Notification outbox\n\n"
+        f"rows: {', '.join(f'{status} {n}' for status, n in outbox_rows.items()) or 'none'}\n"
+        f"workers: {outbox['workers']}, batches: {outbox['batches']}\n"
+        f"delivered: {outbox['delivered']} ({outbox['per_minute']}/min), retried: {outbox['retried']}, "
+        f"dead: {outbox['dead']}\n"
+        f"latency: avg {outbox['avg_latency_ms']:.0f} ms, p95 {outbox['p95_latency_ms']:.0f} ms"
+    )
+    await safe_send_message(context.bot, chat_id=chat_id, text=text)
+
+
+def build_xlsx(df: pd.DataFrame, sheet_name: str) -> io.BytesIO:
+    bio = io.BytesIO()
+    with pd.ExcelWriter(bio, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    bio.seek(0)
+    return bio
 
 
 async def cmd_export_applications(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Export applications to Excel file"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     user_id = update.effective_user.id
     chat_id = get_chat_id(update)
 
     if not is_employer(user_id):
-        language = get_user_language(user_id)
         text = get_text('admin_only', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
     # Get employer's applications
-    employer_id = get_employer_id(user_id)
+    employer_id = ctx.employer_id
     if not employer_id:
-        language = get_user_language(user_id)
         text = get_text('no_employer_profile', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
-    applications = db_execute(
+    applications = await db.fetch(
         """SELECT a.id, s.fullname, s.phone, s.course, s.major, s.about,
                   j.title, e.company_name, a.status, a.applied_at, a.reviewed_at
            FROM applications a
@@ -2058,11 +5212,9 @@ async def cmd_export_applications(update: Update, context: ContextTypes.DEFAULT_
            JOIN employers e ON j.employer_id = e.id
            WHERE j.employer_id = ?
            ORDER BY a.applied_at DESC""",
-        (employer_id,), fetch=True
+        (employer_id,)
     )
 
-    language = get_user_language(user_id)
-
     if not applications:
         text = get_text('no_applications', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
@@ -2094,11 +5246,8 @@ async def cmd_export_applications(update: Update, context: ContextTypes.DEFAULT_
 
     df = pd.DataFrame(data)
 
-    # Create Excel file
-    bio = io.BytesIO()
-    with pd.ExcelWriter(bio, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Applications")
-    bio.seek(0)
+    # Create Excel file off the event loop: openpyxl is slow on large exports
+    bio = await asyncio.to_thread(build_xlsx, df, "Applications")
 
     filename = f"applications_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
@@ -2110,36 +5259,41 @@ async def cmd_export_applications(update: Update, context: ContextTypes.DEFAULT_
         )
     except Exception as e:
         logger.error(f"Error sending export file: {e}")
-        language = get_user_language(user_id)
         text = get_text('error_export', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
 
 
 async def handle_quick_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle quick delete commands"""
+    ctx = await get_user_context(update, context)
+    language = ctx.language
     user_id = update.effective_user.id
     chat_id = get_chat_id(update)
 
     if not is_employer(user_id):
-        language = get_user_language(user_id)
         text = get_text('admin_only', language)
         await safe_send_message(context.bot, chat_id=chat_id, text=text)
         return
 
     command = update.message.text
-    language = get_user_language(user_id)
 
     try:
         if command.startswith('/delete_job_'):
             job_id = int(command.split('_')[-1])
-            # Delete job and related applications
-            db_execute("DELETE FROM applications WHERE job_id = ?", (job_id,))
-            db_execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            # Delete job and related applications atomically
+            def delete_job(cur):
+                cur.execute("DELETE FROM applications WHERE job_id = ?", (job_id,))
+                cur.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+            await db.transaction(delete_job)
+            job_catalog.invalidate()
+            job_matcher.remove(job_id)
+            forget_job_scores(job_id)
             text = f"✅ Вакансия #{job_id} удалена"
 
         elif command.startswith('/delete_application_'):
             app_id = int(command.split('_')[-1])
-            db_execute("DELETE FROM applications WHERE id = ?", (app_id,))
+            await db.execute("DELETE FROM applications WHERE id = ?", (app_id,))
             text = f"✅ Заявка #{app_id} удалена"
 
         else:
@@ -2152,35 +5306,546 @@ async def handle_quick_delete(update: Update, context: ContextTypes.DEFAULT_TYPE
         await safe_send_message(context.bot, chat_id=chat_id, text="❌ Ошибка при удалении")
 
 
+# ------------------ Admin Broadcast ------------------
+BROADCAST_FILTER = re.compile(r'(course|major|lang)=("[^"]*"|\S+)\s*')
+
+# broadcast id -> sending task; ids asked to stop; tasks recording a crashed broadcast
+broadcast_tasks = {}
+broadcast_stopping = set()
+broadcast_cleanup = set()
+
+
+def parse_broadcast_args(text: str) -> tuple:
+    """'course=3 major="Computer science" Text' -> ({'course': '3', 'major': 'Computer science'}, 'Text')"""
+    filters = {}
+    position = 0
+    while match := BROADCAST_FILTER.match(text, position):
+        filters[match.group(1)] = match.group(2).strip('"')
+        position = match.end()
+    return filters, text[position:].strip()
+
+
+async def iter_broadcast_recipients(filters: dict, after_id: int = 0, batch_size: int = BROADCAST_BATCH_SIZE):
+    """Batches of (last scanned students.id, [user_id]) matching the audience, keyset on students.id.
+
+    Major is matched case-insensitively as a substring in Python: SQLite's lower() only folds ASCII.
+    """
+    where, params = ["s.id > ?"], []
+    if filters.get('course'):
+        where.append("s.course = ?")
+        params.append(filters['course'])
+    if filters.get('lang'):
+        where.append("u.language = ?")
+        params.append(filters['lang'])
+    major = filters.get('major', "").casefold()
+
+    while True:
+        rows = await db.fetch(
+            f"""SELECT s.id, s.user_id, s.major FROM students s JOIN users u ON u.user_id = s.user_id
+                WHERE {" AND ".join(where)} ORDER BY s.id LIMIT ?""",
+            (after_id, *params, batch_size)
+        )
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        yield after_id, [user_id for _, user_id, student_major in rows if major in student_major.casefold()]
+
+
+def broadcast_audience_text(filters: dict, language: str) -> str:
+    if not filters:
+        return get_text('broadcast_all_students', language)
+    return ", ".join(f"{key}={value}" for key, value in filters.items())
+
+
+async def edit_broadcast_progress(bot, broadcast_id: int, language: str, status: str, sent: int, failed: int,
+                                  total: int, rate: float, chat_id: int, message_id: int):
+    """Edit the admin's progress message in place; a Stop button while it runs"""
+    text = get_text('broadcast_progress', language).format(
+        id=broadcast_id, status=get_text(f'broadcast_{status}', language), sent=sent, failed=failed, total=total,
+        rate=rate
+    )
+    reply_markup = None
+    if status == 'running':
+        reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton(get_text('broadcast_stop', language),
+                                                                   callback_data=f"bcast_stop:{broadcast_id}")]])
+    await message_scheduler.submit(chat_id, lambda: bot.edit_message_text(
+        chat_id=chat_id, message_id=message_id, text=text, reply_markup=reply_markup
+    ))
+
+
+async def run_broadcast(bot, broadcast_id: int):
+    """Send a broadcast from its saved cursor.
+
+    The next batch of recipients is read while the current one is sent, up to BROADCAST_CONCURRENCY
+    messages in flight; the scheduler keeps the bulk lane within Telegram's limits. The cursor and
+    counters are saved after every batch, so after a restart at most one batch is sent again.
+    """
+    row = await db.fetchone(
+        "SELECT chat_id, message_id, text, filters, cursor, total, sent, failed FROM broadcasts WHERE id = ?",
+        (broadcast_id,)
+    )
+    chat_id, message_id, text, filters, cursor, total, sent, failed = row
+    language = (await load_user_context(chat_id)).language
+    limiter = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    batches = asyncio.Queue(maxsize=2)
+    started, handled, last_report = monotonic(), 0, 0.0
+
+    async def produce():
+        try:
+            async for batch in iter_broadcast_recipients(json.loads(filters), cursor):
+                await batches.put(batch)
+        except Exception:
+            await batches.put(None)
+            raise
+        await batches.put(None)
+
+    async def deliver(user_id: int):
+        """True if sent, False if failed, None if skipped because the broadcast was stopped"""
+        async with limiter:
+            if broadcast_id in broadcast_stopping:
+                return None
+            return await safe_send_message(bot, chat_id=user_id, text=text, priority=PRIORITY_BULK) is not None
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (batch := await batches.get()) is not None:
+            if broadcast_id in broadcast_stopping:
+                break
+            cursor, user_ids = batch
+            results = await asyncio.gather(*(deliver(user_id) for user_id in user_ids))
+            sent += results.count(True)
+            failed += results.count(False)
+            handled += results.count(True) + results.count(False)
+            if broadcast_id in broadcast_stopping:
+                await db.execute("UPDATE broadcasts SET sent = ?, failed = ? WHERE id = ?", (sent, failed, broadcast_id))
+                break
+            await db.execute("UPDATE broadcasts SET cursor = ?, sent = ?, failed = ? WHERE id = ?",
+                             (cursor, sent, failed, broadcast_id))
+            if monotonic() - last_report >= BROADCAST_PROGRESS_INTERVAL:
+                last_report = monotonic()
+                await edit_broadcast_progress(bot, broadcast_id, language, 'running', sent, failed, total,
+                                              handled / (last_report - started), chat_id, message_id)
+        else:
+            await producer  # re-raises a failed recipient query instead of reporting the broadcast as done
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+    status = 'cancelled' if broadcast_id in broadcast_stopping else 'done'
+    broadcast_stopping.discard(broadcast_id)
+    await db.execute("UPDATE broadcasts SET status = ?, finished_at = ? WHERE id = ?",
+                     (status, datetime.now().isoformat(), broadcast_id))
+    await edit_broadcast_progress(bot, broadcast_id, language, status, sent, failed, total,
+                                  handled / max(monotonic() - started, 1e-3), chat_id, message_id)
+    logger.info("Broadcast %s %s: %s sent, %s failed", broadcast_id, status, sent, failed)
+
+
+def start_broadcast(bot, broadcast_id: int):
+    task = asyncio.create_task(run_broadcast(bot, broadcast_id))
+    broadcast_tasks[broadcast_id] = task
+    task.add_done_callback(lambda task: broadcast_finished(bot, broadcast_id, task))
+
+
+def broadcast_finished(bot, broadcast_id: int, task: asyncio.Task):
+    """Done callback of a broadcast task: a crash is logged and the broadcast marked failed"""
+    broadcast_tasks.pop(broadcast_id, None)
+    if task.cancelled():
+        return  # bot stopping: the broadcast stays 'running' and resumes on the next start
+    error = task.exception()
+    if error is None:
+        return
+    logger.error("Broadcast %s failed", broadcast_id, exc_info=error)
+    broadcast_stopping.discard(broadcast_id)
+    cleanup = asyncio.create_task(fail_broadcast(bot, broadcast_id))
+    broadcast_cleanup.add(cleanup)
+    cleanup.add_done_callback(broadcast_cleanup.discard)
+
+
+async def fail_broadcast(bot, broadcast_id: int):
+    """Mark a crashed broadcast as failed and show that in the admin's progress message"""
+    try:
+        await db.execute("UPDATE broadcasts SET status = 'failed', finished_at = ? WHERE id = ? AND status = 'running'",
+                         (datetime.now().isoformat(), broadcast_id))
+        row = await db.fetchone("SELECT chat_id, message_id, total, sent, failed FROM broadcasts WHERE id = ?",
+                                (broadcast_id,))
+        if row is None or row[1] is None:
+            return
+        chat_id, message_id, total, sent, failed = row
+        language = (await load_user_context(chat_id)).language
+        await edit_broadcast_progress(bot, broadcast_id, language, 'failed', sent, failed, total, 0.0, chat_id,
+                                      message_id)
+    except Exception:
+        logger.exception("Could not mark broadcast %s as failed", broadcast_id)
+
+
+async def resume_broadcasts(bot):
+    """Restart broadcasts that were running when the bot stopped"""
+    for (broadcast_id,) in await db.fetch("SELECT id FROM broadcasts WHERE status = 'running'"):
+        logger.info("Resuming broadcast %s", broadcast_id)
+        start_broadcast(bot, broadcast_id)
+
+
+async def cmd_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/broadcast [course=..] [major=..] [lang=..] text: preview with the audience size and a Send button"""
+    ctx = await get_user_context(update, context)
+    user_id = update.effective_user.id
+    chat_id = get_chat_id(update)
+    language = ctx.language
+
+    if not is_employer(user_id):
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('admin_only', language))
+        return
+
+    parts = update.message.text.split(maxsplit=1)
+    filters, text = parse_broadcast_args(parts[1] if len(parts) > 1 else "")
+    if not text:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('broadcast_usage', language))
+        return
+
+    total = 0
+    async for _, user_ids in iter_broadcast_recipients(filters, batch_size=STUDENTS_BATCH_SIZE):
+        total += len(user_ids)
+    if not total:
+        await safe_send_message(context.bot, chat_id=chat_id, text=get_text('broadcast_no_recipients', language))
+        return
+
+    broadcast_id = await db.execute(
+        "INSERT INTO broadcasts (admin_id, chat_id, text, filters, total, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (user_id, chat_id, text, json.dumps(filters, ensure_ascii=False), total, datetime.now().isoformat())
+    )
+    keyboard = [[
+        InlineKeyboardButton(get_text('broadcast_send', language), callback_data=f"bcast_go:{broadcast_id}"),
+        InlineKeyboardButton(get_text('cancel', language), callback_data=f"bcast_stop:{broadcast_id}"),
+    ]]
+    preview = get_text('broadcast_preview', language).format(
+        id=broadcast_id, audience=broadcast_audience_text(filters, language), total=total, text=text
+    )
+    await safe_send_message(context.bot, chat_id=chat_id, text=preview, reply_markup=InlineKeyboardMarkup(keyboard))
+
+
+async def callback_broadcast_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Send button: the preview message becomes the progress message"""
+    query = update.callback_query
+    await query.answer()
+    if not is_employer(query.from_user.id):
+        return
+
+    broadcast_id = int(query.data.split(":")[1])
+    started = await db.transaction(lambda cur: cur.execute(
+        "UPDATE broadcasts SET status = 'running', message_id = ? WHERE id = ? AND admin_id = ? AND status = 'draft'",
+        (query.message.message_id, broadcast_id, query.from_user.id)
+    ).rowcount)
+    if started:
+        start_broadcast(context.bot, broadcast_id)
+
+
+async def callback_broadcast_stop(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cancel a draft or stop a running broadcast after the messages already in flight"""
+    ctx = await get_user_context(update, context)
+    query = update.callback_query
+    await query.answer()
+    if not is_employer(query.from_user.id):
+        return
+
+    broadcast_id = int(query.data.split(":")[1])
+    row = await db.fetchone("SELECT status, total FROM broadcasts WHERE id = ? AND admin_id = ?",
+                            (broadcast_id, query.from_user.id))
+    if row is None or row[0] not in ('draft', 'running'):
+        return
+    if row[0] == 'running' and broadcast_id in broadcast_tasks:
+        broadcast_stopping.add(broadcast_id)  # run_broadcast records the final state
+        return
+
+    await db.execute("UPDATE broadcasts SET status = 'cancelled', finished_at = ? WHERE id = ?",
+                     (datetime.now().isoformat(), broadcast_id))
+    await edit_broadcast_progress(context.bot, broadcast_id, ctx.language, 'cancelled', 0, 0, row[1], 0.0,
+                                  get_chat_id(query), query.message.message_id)
+
+
 # ------------------ Cancel Handler ------------------
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancel any conversation"""
-    user_id = update.effective_user.id
-    user_type = get_user_type(user_id)
+    ctx = await get_user_context(update, context)
+    user_type = ctx.user_type
 
     await show_main_menu(update, context, user_type)
-    context.user_data.clear()
+    clear_flow_data(context)
     return ConversationHandler.END
 
 
-# ------------------ Main ------------------
-def main():
-    init_db()
-    if not BOT_TOKEN:
-        logger.error("BOT_TOKEN not set")
-        return
+# ------------------ Update Processing ------------------
+def update_serial_key(update: object):
+    """Updates with the same key are handled in order: the user, else the chat, else no ordering"""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_user:
+        return 'user', update.effective_user.id
+    if update.effective_chat:
+        return 'chat', update.effective_chat.id
+    return None
 
-    # Fix for Event loop is closed error
-    if sys.platform == 'win32':
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-    app = (
-        ApplicationBuilder()
-        .token(BOT_TOKEN)
-        .connection_pool_size(8)
-        .read_timeout(60.0)
-        .build()
-    )
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Runs up to max_concurrent_updates updates at once, but one user's updates one at a time.
+
+    PTB's own semaphore is taken before do_process_update, so it gets a limit no update ever waits on and
+    the real limit is a second semaphore taken after the user's lock: a user who floods the bot queues
+    behind their own updates without holding slots other users need. Locks are refcounted and dropped as
+    soon as a user has nothing in flight, so memory grows with active users, not with all users seen.
+    """
+
+    UNBOUNDED = 2 ** 31
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(self.UNBOUNDED)
+        self.limit = max_concurrent_updates
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._locks = {}  # key -> [asyncio.Lock, updates holding or waiting for it]
+
+    @property
+    def active_keys(self) -> int:
+        return len(self._locks)
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        key = update_serial_key(update)
+        if key is None:
+            async with self._slots:
+                await coroutine
+            return
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            # asyncio.Lock wakes waiters FIFO and PTB starts update tasks in arrival order
+            async with entry[0]:
+                async with self._slots:
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+
+# ------------------ Webhook Server ------------------
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+                411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+                503: "Service Unavailable"}
+
+
+class WebhookServer:
+    """Minimal HTTP/1.1 server on asyncio streams that feeds Telegram webhook updates to the application.
+
+    POST <path> with the right secret token header puts the update on app.update_queue; GET /healthz
+    reports liveness and the backlog. Bodies over max_body get 413 without being read, connections over
+    max_connections get 503. Connections are kept alive, as Telegram reuses them.
+    """
+
+    def __init__(self, app: Application, listen: str, port: int, path: str, secret: str,
+                 max_connections: int, max_body: int):
+        self.app = app
+        self.listen = listen
+        self.port = port
+        self.path = path
+        self.secret = secret
+        self.max_connections = max_connections
+        self.max_body = max_body
+        self.connections = 0
+        self.updates = self.rejected = 0
+        self._server = None
+        self._started = monotonic()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.listen, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # port 0 = any free port
+        self._started = monotonic()
+        logger.info("Webhook server listening on %s:%s%s", self.listen, self.port, self.path)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.connections >= self.max_connections:
+            self.rejected += 1
+            await self._respond(writer, 503, keep_alive=False)
+            writer.close()
+            return
+        self.connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                keep_alive = await asyncio.wait_for(self._serve_request(reader, writer), WEBHOOK_READ_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _serve_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Answer one request; False when the connection should be closed"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise
+            return False  # client closed an idle keep-alive connection
+        except asyncio.LimitOverrunError:
+            await self._respond(writer, 431, keep_alive=False)
+            return False
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            await self._respond(writer, 400, keep_alive=False)
+            return False
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = (headers.get("connection", "").lower() != "close"
+                      if version == "HTTP/1.1" else headers.get("connection", "").lower() == "keep-alive")
+        path = target.split("?", 1)[0]
+
+        if path == "/healthz" and method in ("GET", "HEAD"):
+            body = json.dumps({
+                'ok': True,
+                'uptime': round(monotonic() - self._started),
+                'pending_updates': self.app.update_queue.qsize(),
+                'busy_users': getattr(self.app.update_processor, 'active_keys', 0),
+                'connections': self.connections,
+            }).encode()
+            await self._respond(writer, 200, body if method == "GET" else b"", keep_alive, "application/json")
+            return keep_alive
+        if path != self.path:
+            await self._respond(writer, 404, keep_alive=False)
+            return False
+        if method != "POST":
+            await self._respond(writer, 405, keep_alive=False)
+            return False
+        # An empty secret never matches: without it anyone reaching the port could forge updates
+        if not self.secret or not hmac.compare_digest(
+                headers.get("x-telegram-bot-api-secret-token", "").encode(), self.secret.encode()):
+            self.rejected += 1
+            await self._respond(writer, 403, keep_alive=False)
+            return False
+        try:
+            length = int(headers["content-length"])
+        except (KeyError, ValueError):
+            await self._respond(writer, 411, keep_alive=False)
+            return False
+        if length > self.max_body:
+            self.rejected += 1
+            await self._respond(writer, 413, keep_alive=False)
+            return False
+
+        body = await reader.readexactly(length)
+        try:
+            data = json.loads(body)
+            if not isinstance(data, dict):
+                raise ValueError("update is not a JSON object")
+            update = Update.de_json(data, self.app.bot)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            await self._respond(writer, 400, keep_alive=keep_alive)
+            return keep_alive
+        await self.app.update_queue.put(update)
+        self.updates += 1
+        await self._respond(writer, 200, keep_alive=keep_alive)
+        return keep_alive
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes = b"", keep_alive: bool = True,
+                       content_type: str = "text/plain"):
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+
+async def run_webhook(app: Application):
+    """Webhook counterpart of app.run_polling(): register the webhook, serve until SIGINT/SIGTERM"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+
+    secret = WEBHOOK_SECRET
+    if not secret:
+        secret = secrets.token_urlsafe(32)
+        logger.warning("WEBHOOK_SECRET is not set, registering a random secret for this run")
+    server = WebhookServer(app, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, secret,
+                           WEBHOOK_MAX_CONNECTIONS, WEBHOOK_MAX_BODY)
+    await app.initialize()
+    try:
+        if app.post_init:
+            await app.post_init(app)
+        await server.start()
+        await app.bot.set_webhook(
+            url=WEBHOOK_URL + WEBHOOK_PATH, secret_token=secret,
+            max_connections=WEBHOOK_MAX_CONNECTIONS, allowed_updates=Update.ALL_TYPES
+        )
+        await app.start()
+        try:
+            await stop.wait()
+        finally:
+            await server.stop()
+            await app.stop()
+            if app.post_stop:
+                await app.post_stop(app)
+    finally:
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+
+
+# ------------------ Main ------------------
+async def start_workers(app: Application):
+    """Background tasks that live as long as the bot"""
+    await notification_outbox.start(app.bot)
+    await resume_broadcasts(app.bot)
+
+
+async def stop_workers(app: Application):
+    """Runs while the bot can still send: stop the workers, then flush the message scheduler"""
+    # Broadcasts stay 'running' in the DB and resume from their last checkpoint on the next start
+    workers = list(broadcast_tasks.values())
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    await asyncio.gather(*broadcast_cleanup, return_exceptions=True)
+    await notification_outbox.stop()
+    await message_scheduler.close()
+
+
+def build_application(request=None) -> Application:
+    """The bot with all handlers; `request` replaces the HTTP client (bench_webhook.py uses a fake Bot API)"""
+    builder = (ApplicationBuilder().token(BOT_TOKEN).post_init(start_workers).post_stop(stop_workers)
+               .concurrent_updates(PerUserUpdateProcessor(UPDATE_CONCURRENCY)))
+    if request is None:
+        builder = builder.connection_pool_size(8).read_timeout(60.0)
+    else:
+        builder = builder.request(request).get_updates_request(request)
+    app = builder.build()
+    app.job_queue.run_repeating(flush_application_digests, interval=DIGEST_CHECK_INTERVAL,
+                                first=DIGEST_CHECK_INTERVAL, name="application_digests")
+
+    # Resolve the user's language/type/profile once per update, before any other handler
+    app.add_handler(TypeHandler(Update, preload_user_context), group=-1)
 
     # Add command handlers
     app.add_handler(CommandHandler("start", cmd_start))
@@ -2188,6 +5853,11 @@ def main():
     app.add_handler(CommandHandler("my_jobs", cmd_my_jobs))
     app.add_handler(CommandHandler("list_students", cmd_list_students))
     app.add_handler(CommandHandler("export_applications", cmd_export_applications))
+    app.add_handler(CommandHandler("db_stats", cmd_db_stats))
+    app.add_handler(CommandHandler("broadcast", cmd_broadcast))
+    app.add_handler(CommandHandler("digest", cmd_digest))
+    app.add_handler(CommandHandler("save_search", cmd_save_search))
+    app.add_handler(CommandHandler("my_searches", cmd_my_searches))
 
     # Quick delete handlers
     app.add_handler(MessageHandler(filters.Regex(r'^/delete_job_\d+$'), handle_quick_delete))
@@ -2226,15 +5896,47 @@ def main():
         per_user=True,
     )
 
+    search_conv_handler = ConversationHandler(
+        entry_points=[
+            CommandHandler("search", cmd_search),
+            CallbackQueryHandler(callback_search_jobs, pattern=r"^search_jobs$")
+        ],
+        states={
+            SEARCH_QUERY: [MessageHandler(filters.TEXT & ~filters.COMMAND, search_query_received)],
+        },
+        fallbacks=[CommandHandler("cancel", cancel)],
+        per_chat=True,
+        per_user=True,
+    )
+
     app.add_handler(student_conv_handler)
     app.add_handler(employer_conv_handler)
+    app.add_handler(search_conv_handler)
 
     # Callback query handlers
-    app.add_handler(CallbackQueryHandler(callback_browse_jobs, pattern=r"^browse_jobs$"))
+    app.add_handler(CallbackQueryHandler(callback_browse_jobs, pattern=r"^(browse_jobs$|jobs_s:|jobs_s_f:)"))
     app.add_handler(CallbackQueryHandler(callback_view_job, pattern=r"^view_job:"))
+    app.add_handler(CallbackQueryHandler(callback_search_page, pattern=r"^search:"))
+    app.add_handler(CallbackQueryHandler(callback_recommended_jobs, pattern=r"^recommended_jobs$"))
+    app.add_handler(CallbackQueryHandler(callback_save_search, pattern=r"^save_search:"))
+    app.add_handler(CallbackQueryHandler(callback_saved_search_floor, pattern=r"^saved_\d+_f:"))
+    app.add_handler(CallbackQueryHandler(callback_my_searches, pattern=r"^my_searches$"))
+    app.add_handler(CallbackQueryHandler(callback_digest_settings, pattern=r"^digest_settings$"))
+    app.add_handler(CallbackQueryHandler(callback_digest_set, pattern=r"^digest_set:"))
+    app.add_handler(CallbackQueryHandler(callback_delete_search, pattern=r"^del_search:"))
+    # Not blocking: the debounce sleep must not hold up other updates
+    app.add_handler(InlineQueryHandler(inline_query_jobs, block=False))
     app.add_handler(CallbackQueryHandler(callback_apply_job, pattern=r"^apply_job:"))
-    app.add_handler(CallbackQueryHandler(callback_view_applications, pattern=r"^view_applications$"))
+    app.add_handler(CallbackQueryHandler(callback_view_applications, pattern=r"^(view_applications|apps_back)$"))
+    app.add_handler(CallbackQueryHandler(callback_applications_page, pattern=r"^apps(_r)?:"))
+    app.add_handler(CallbackQueryHandler(callback_students_page, pattern=r"^students:"))
+    app.add_handler(CallbackQueryHandler(callback_applications_filter, pattern=r"^apps_f:"))
+    app.add_handler(CallbackQueryHandler(callback_applications_select, pattern=r"^apps_sel:"))
+    app.add_handler(CallbackQueryHandler(callback_applications_bulk, pattern=r"^apps_bulk:"))
+    app.add_handler(CallbackQueryHandler(callback_applications_bulk_apply, pattern=r"^apps_bulk_ok:"))
     app.add_handler(CallbackQueryHandler(callback_review_application, pattern=r"^review_application:"))
+    app.add_handler(CallbackQueryHandler(callback_broadcast_start, pattern=r"^bcast_go:"))
+    app.add_handler(CallbackQueryHandler(callback_broadcast_stop, pattern=r"^bcast_stop:"))
     app.add_handler(CallbackQueryHandler(callback_accept_application, pattern=r"^accept_application:"))
     app.add_handler(CallbackQueryHandler(callback_reject_application, pattern=r"^reject_application:"))
 
@@ -2255,7 +5957,7 @@ def main():
     app.add_handler(CallbackQueryHandler(callback_switch_to_employer, pattern=r"^switch_to_employer$"))
 
     # Employer browsing jobs handlers
-    app.add_handler(CallbackQueryHandler(callback_browse_jobs_as_employer, pattern=r"^browse_jobs_as_employer$"))
+    app.add_handler(CallbackQueryHandler(callback_browse_jobs_as_employer, pattern=r"^(browse_jobs_as_employer$|jobs_e:|jobs_e_f:)"))
     app.add_handler(CallbackQueryHandler(callback_view_job_info, pattern=r"^view_job_info:"))
 
     # Language change handlers
@@ -2265,18 +5967,40 @@ def main():
 
     # Initial language selection handler
     app.add_handler(CallbackQueryHandler(callback_set_language, pattern=r"^set_lang:"))
+    return app
 
-    logger.info("Job search bot started")
+
+def main():
+    init_db()
+    if not BOT_TOKEN:
+        logger.error("BOT_TOKEN not set")
+        return
+    job_matcher.load()
+    saved_search_index.load()
+
+    # Fix for Event loop is closed error
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    app = build_application()
+    logger.info("Job search bot started (%s)", "webhook" if WEBHOOK_URL else "polling")
 
     try:
-        app.run_polling()
+        if WEBHOOK_URL:
+            asyncio.run(run_webhook(app))
+        else:
+            app.run_polling()
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
         logger.error(f"Error running bot: {e}")
     finally:
+        db.close()
+        db_pool.close_all()
         logger.info("Bot shutdown complete")
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        sys.exit(cli_migrate(sys.argv[2:]))
     main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime
+
+from telegram import Chat, Message, Update, User
+
+import main
+
+
+def message_update(update_id: int, user_id: int) -> Update:
+    return Update(update_id, message=Message(update_id, datetime.now(), Chat(user_id, "private"),
+                                             from_user=User(user_id, "user", False), text="x"))
+
+
+async def process(processor, updates: list, delay: float) -> list:
+    """Feed updates in order, as Application does with concurrent updates; returns tags in finishing order"""
+    finished = []
+
+    async def handler(tag):
+        await asyncio.sleep(delay)
+        finished.append(tag)
+
+    await asyncio.gather(*(processor.process_update(update, handler(tag)) for tag, update in updates))
+    return finished
+
+
+def test_busy_user_does_not_starve_others():
+    processor = main.PerUserUpdateProcessor(2)
+    updates = [(f"a{i}", message_update(i, 1)) for i in range(10)] + [("b", message_update(100, 2))]
+    finished = asyncio.run(process(processor, updates, 0.01))
+    # b runs alongside a0 instead of waiting behind the slots held by a1..a9
+    assert finished.index("b") <= 1
+    assert processor.active_keys == 0
+
+
+def test_user_updates_keep_arrival_order():
+    processor = main.PerUserUpdateProcessor(8)
+    updates = [(f"a{i}", message_update(i, 1)) for i in range(5)] + [(f"b{i}", message_update(10 + i, 2)) for i in range(5)]
+    finished = asyncio.run(process(processor, updates, 0.005))
+    assert [tag for tag in finished if tag[0] == "a"] == [f"a{i}" for i in range(5)]
+    assert [tag for tag in finished if tag[0] == "b"] == [f"b{i}" for i in range(5)]
+
+
+def test_concurrency_limit_holds():
+    processor = main.PerUserUpdateProcessor(3)
+    running = peak = 0
+
+    async def handler():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run():
+        await asyncio.gather(*(processor.process_update(message_update(i, i), handler()) for i in range(10)))
+
+    asyncio.run(run())
+    assert peak == 3